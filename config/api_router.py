@@ -1,11 +1,22 @@
 from django.conf import settings
 from rest_framework.routers import DefaultRouter, SimpleRouter
 
-from scoap3.articles.api.views import ArticleIdentifierViewSet, ArticleViewSet
+from scoap3.articles.api.views import (
+    ArticleChangeViewSet,
+    ArticleCountryShareViewSet,
+    ArticleExportViewSet,
+    ArticleIdentifierViewSet,
+    ArticleSearchViewSet,
+    ArticleViewSet,
+    ArxivCategoryRollupViewSet,
+    CountryRollupViewSet,
+    PublicationRollupViewSet,
+)
 from scoap3.authors.api.views import AuthorIdentifierViewSet, AuthorViewSet
 from scoap3.misc.api.views import (
     AffiliationViewSet,
     ArticleArxivCategoryViewSet,
+    CacheStatsViewSet,
     CopyrightViewSet,
     CountryViewSet,
     ExperimentalCollaborationViewSet,
@@ -28,6 +39,21 @@ router.register("users", UserViewSet)
 # Articles
 router.register("articles", ArticleViewSet)
 router.register("article-identifier", ArticleIdentifierViewSet)
+router.register("changes", ArticleChangeViewSet, basename="change")
+router.register("search", ArticleSearchViewSet, basename="search")
+router.register("export", ArticleExportViewSet, basename="export")
+router.register("country-shares", ArticleCountryShareViewSet, basename="country-share")
+
+# Dashboards
+router.register(
+    "dashboard/publications", PublicationRollupViewSet, basename="dashboard-publication"
+)
+router.register(
+    "dashboard/categories", ArxivCategoryRollupViewSet, basename="dashboard-category"
+)
+router.register(
+    "dashboard/countries", CountryRollupViewSet, basename="dashboard-country"
+)
 
 # Authors
 router.register("author", AuthorViewSet)
@@ -36,8 +62,8 @@ router.register("author-identifier", AuthorIdentifierViewSet)
 # Misc
 router.register("country", CountryViewSet)
 router.register("affiliation", AffiliationViewSet)
-router.register("author", InstitutionIdentifierViewSet)
-router.register("institution-identifier", PublisherViewSet)
+router.register("institution-identifier", InstitutionIdentifierViewSet)
+router.register("publisher", PublisherViewSet)
 router.register("publication-info", PublicationInfoViewSet)
 router.register("license", LicenseViewSet)
 router.register("copyright", CopyrightViewSet)
@@ -45,6 +71,7 @@ router.register("article-arxiv-category", ArticleArxivCategoryViewSet)
 router.register("experimental-collaboration", ExperimentalCollaborationViewSet)
 router.register("funder", FunderViewSet)
 router.register("related-material", RelatedMaterialViewSet)
+router.register("cache-stats", CacheStatsViewSet, basename="cache-stats")
 
 
 app_name = "api"
@@ -5,6 +5,7 @@ import platform
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent.parent
 # scoap3/
@@ -78,6 +79,7 @@ DJANGO_APPS = [
     "django.contrib.staticfiles",
     # "django.contrib.humanize", # Handy template tags
     "django.contrib.admin",
+    "django.contrib.postgres",
     "django.forms",
 ]
 THIRD_PARTY_APPS = [
@@ -275,36 +277,44 @@ LOGGING = {
 # ------------------------------------------------------------------------------
 if USE_TZ:
     # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-timezone
-    timezone = TIME_ZONE
+    CELERY_TIMEZONE = TIME_ZONE
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-broker_url
-broker_url = env("CELERY_BROKER_URL")
+CELERY_BROKER_URL = env("CELERY_BROKER_URL")
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-result_backend
-result_backend = env("CELERY_RESULT_BACKEND")
+CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND")
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#result-extended
-result_extended = True
+CELERY_RESULT_EXTENDED = True
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#result-backend-always-retry
 # https://github.com/celery/celery/pull/6122
-result_backend_always_retry = True
+CELERY_RESULT_BACKEND_ALWAYS_RETRY = True
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#result-backend-max-retries
-result_backend_max_retries = 10
+CELERY_RESULT_BACKEND_MAX_RETRIES = 10
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-accept_content
-accept_content = ["json"]
+CELERY_ACCEPT_CONTENT = ["json"]
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-task_serializer
-task_serializer = "json"
+CELERY_TASK_SERIALIZER = "json"
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std:setting-result_serializer
-result_serializer = "json"
+CELERY_RESULT_SERIALIZER = "json"
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-time-limit
 # TODO: set to whatever value is adequate in your circumstances
-task_time_limit = 5 * 60
+CELERY_TASK_TIME_LIMIT = 5 * 60
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-soft-time-limit
 # TODO: set to whatever value is adequate in your circumstances
-task_soft_time_limit = 60
+CELERY_TASK_SOFT_TIME_LIMIT = 60
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-scheduler
-beat_scheduler = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-send-task-events
-worker_send_task_events = True
+CELERY_WORKER_SEND_TASK_EVENTS = True
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std-setting-task_send_sent_event
-task_send_sent_event = True
+CELERY_TASK_SEND_SENT_EVENT = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-schedule
+CELERY_BEAT_SCHEDULE = {
+    # Catches up with changes whose flush could not be scheduled
+    "flush-article-index-queue": {
+        "task": "scoap3.articles.tasks.flush_index_queue",
+        "schedule": 60,
+    },
+}
 # django-allauth
 # ------------------------------------------------------------------------------
 ACCOUNT_ALLOW_REGISTRATION = env.bool("DJANGO_ACCOUNT_ALLOW_REGISTRATION", True)
@@ -328,13 +338,110 @@ SOCIALACCOUNT_FORMS = {"signup": "scoap3.users.forms.UserSocialSignupForm"}
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "scoap3.users.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_FILTER_BACKENDS": ("scoap3.utils.fieldsets.SparseFieldsetFilter",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
 }
+# Upper bound for the ``page_size`` query parameter of the cursor paginators
+API_MAX_PAGE_SIZE = env.int("DJANGO_API_MAX_PAGE_SIZE", default=1000)
+# Seconds a change must be old before the change feed lists it. Changes are
+# stamped again as their transaction commits, in statements of their own, so
+# that rows committing meanwhile are not skipped by a cursor
+API_CHANGE_FEED_DELAY = env.int("DJANGO_API_CHANGE_FEED_DELAY", default=5)
+# Largest number of article documents accepted by one bulk ingest request
+API_INGEST_MAX_BATCH_SIZE = env.int("DJANGO_API_INGEST_MAX_BATCH_SIZE", default=500)
+# Seconds an API token and its user are cached, see
+# scoap3.users.authentication
+API_TOKEN_CACHE_TIMEOUT = env.int("DJANGO_API_TOKEN_CACHE_TIMEOUT", default=60)
+# Seconds the responses of the model endpoints are kept in the cache, see
+# scoap3.utils.cache
+API_CACHE_TIMEOUT = env.int("DJANGO_API_CACHE_TIMEOUT", default=3600)
+
+# OAI-PMH
+# ------------------------------------------------------------------------------
+OAI_PMH_REPOSITORY_NAME = "SCOAP3"
+# Namespace part of the ``oai:<namespace>:<id>`` record identifiers
+OAI_PMH_REPOSITORY_IDENTIFIER = env(
+    "OAI_PMH_REPOSITORY_IDENTIFIER", default="scoap3.org"
+)
+# Records per ListRecords/ListIdentifiers response before a resumption token
+OAI_PMH_PAGE_SIZE = env.int("OAI_PMH_PAGE_SIZE", default=500)
+
+# OpenSearch
+# ------------------------------------------------------------------------------
+OPENSEARCH_HOSTS = env.list("OPENSEARCH_HOSTS", default=["http://localhost:9200"])
+OPENSEARCH_TIMEOUT = env.int("OPENSEARCH_TIMEOUT", default=30)
+OPENSEARCH_NUMBER_OF_REPLICAS = env.int("OPENSEARCH_NUMBER_OF_REPLICAS", default=1)
+# Prefix of the index names, so that several deployments can share a cluster
+OPENSEARCH_INDEX_PREFIX = env("OPENSEARCH_INDEX_PREFIX", default="scoap3")
+# Deepest result reachable by paging through /api/search/, OpenSearch's
+# index.max_result_window
+SEARCH_MAX_RESULT_WINDOW = 10000
+# Changed articles are reindexed by batches of at most this many documents,
+# at most this many seconds after the change was committed
+SEARCH_INDEX_BATCH_SIZE = env.int("SEARCH_INDEX_BATCH_SIZE", default=500)
+SEARCH_INDEX_LATENCY = env.int("SEARCH_INDEX_LATENCY", default=2)
+# Articles ids loaded by one worker task during a full reindex
+SEARCH_REINDEX_PARTITION_SIZE = env.int("SEARCH_REINDEX_PARTITION_SIZE", default=20000)
+
+# Two-tier cache
+# ------------------------------------------------------------------------------
+# Seconds values are kept in each process, and in the shared cache, see
+# scoap3.utils.two_tier
+TWO_TIER_CACHE_LOCAL_TIMEOUT = env.int("TWO_TIER_CACHE_LOCAL_TIMEOUT", default=60)
+TWO_TIER_CACHE_TIMEOUT = env.int("TWO_TIER_CACHE_TIMEOUT", default=3600)
+# Redis channel the invalidated keys are published on
+TWO_TIER_CACHE_CHANNEL = env("TWO_TIER_CACHE_CHANNEL", default="scoap3:two-tier-cache")
+
+# Statistics
+# ------------------------------------------------------------------------------
+# Articles loaded per round by the vectorized statistics, see
+# scoap3.articles.statistics
+STATISTICS_CHUNK_SIZE = env.int("STATISTICS_CHUNK_SIZE", default=5000)
+# Seconds between refreshes of the dashboard rollups, also their max-age
+ROLLUPS_REFRESH_INTERVAL = env.int("ROLLUPS_REFRESH_INTERVAL", default=300)
+CELERY_BEAT_SCHEDULE["refresh-dashboard-rollups"] = {
+    "task": "scoap3.articles.tasks.refresh_dashboard_rollups",
+    "schedule": ROLLUPS_REFRESH_INTERVAL,
+}
+
+# Snapshots
+# ------------------------------------------------------------------------------
+# Folder of the default storage the Parquet snapshots are written to, see
+# scoap3.articles.snapshots
+SNAPSHOT_LOCATION = env("SNAPSHOT_LOCATION", default="snapshots")
+# Article ids per snapshot partition, changing it rewrites all partitions
+SNAPSHOT_PARTITION_SIZE = env.int("SNAPSHOT_PARTITION_SIZE", default=10000)
+CELERY_BEAT_SCHEDULE["write-article-snapshot"] = {
+    "task": "scoap3.articles.tasks.write_article_snapshot",
+    "schedule": crontab(hour=2, minute=0),
+}
+
+# Affiliations
+# ------------------------------------------------------------------------------
+# Affiliations fingerprinted, or merged into their canonical row, per task run,
+# see scoap3.misc.affiliations
+AFFILIATION_MERGE_BATCH_SIZE = env.int("AFFILIATION_MERGE_BATCH_SIZE", default=1000)
+CELERY_BEAT_SCHEDULE["merge-duplicate-affiliations"] = {
+    "task": "scoap3.misc.tasks.merge_duplicate_affiliations",
+    "schedule": crontab(minute=30),
+}
+# ROR index compiled by the compile_ror_index command, ROR identifiers are not
+# assigned without it, see scoap3.misc.ror
+ROR_INDEX_PATH = env("ROR_INDEX_PATH", default=None)
+# Affiliations whose ROR match is kept in each process
+ROR_MATCH_CACHE_SIZE = env.int("ROR_MATCH_CACHE_SIZE", default=100000)
+# Affiliations matched per task of the ROR backfill
+ROR_BACKFILL_CHUNK_SIZE = env.int("ROR_BACKFILL_CHUNK_SIZE", default=5000)
+# Share of the matches an affiliation ingested without a country must have for
+# its inferred one to be used, see scoap3.misc.countries
+COUNTRY_INFERENCE_MIN_CONFIDENCE = env.float(
+    "COUNTRY_INFERENCE_MIN_CONFIDENCE", default=0.6
+)
 
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
 CORS_URLS_REGEX = r"^/api/.*$"
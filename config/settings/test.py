@@ -15,6 +15,10 @@ SECRET_KEY = env(
 # https://docs.djangoproject.com/en/dev/ref/settings/#test-runner
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# OPENSEARCH
+# ------------------------------------------------------------------------------
+OPENSEARCH_INDEX_PREFIX = "scoap3-test"
+
 # PASSWORDS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
@@ -7,6 +7,8 @@ from django.views.generic import TemplateView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework.authtoken.views import obtain_auth_token
 
+from scoap3.articles.views import oai_pmh_view
+
 urlpatterns = [
     path("", TemplateView.as_view(template_name="pages/home.html"), name="home"),
     path(
@@ -17,6 +19,8 @@ urlpatterns = [
     # User management
     path("users/", include("scoap3.users.urls", namespace="users")),
     path("accounts/", include("allauth.urls")),
+    # OAI-PMH data provider
+    path("oai2d", oai_pmh_view, name="oai-pmh"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 # API URLS
@@ -6,6 +6,8 @@ from scoap3.articles.models import Article, ArticleIdentifier
 class ArticleAdmin(admin.ModelAdmin):
     list_display = ["id", "title", "subtitle", "created_at"]
     search_fields = ["title"]
+    # Counting the whole table on every search is as slow as the search.
+    show_full_result_count = False
 
 
 class ArticleIdentifierAdmin(admin.ModelAdmin):
@@ -0,0 +1,40 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from rest_framework.filters import BaseFilterBackend
+
+from scoap3.articles.models import SEARCH_CONFIG
+
+
+class ArticleFullTextFilter(BaseFilterBackend):
+    """
+    PostgreSQL full-text search over the title, subtitle and abstract.
+
+    ``?search=`` takes the web search syntax (quoted phrases, ``or``, ``-``).
+    Matching articles are annotated with their ``rank``, which
+    ``RankCursorPagination`` orders by. Deployments with OpenSearch have
+    ``/api/search/`` as well.
+    """
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+        # ``ts_rank`` returns a ``real``; as a double it survives the round
+        # trip through a pagination cursor.
+        rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+        return queryset.filter(search_vector=query).annotate(rank=rank)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full-text search in the title, subtitle and abstract.",
+                "schema": {"type": "string"},
+            }
+        ]
@@ -1,15 +1,301 @@
+from django.conf import settings
+from django.db.models import Prefetch
 from rest_framework import serializers
 
-from scoap3.articles.models import Article, ArticleIdentifier
+from scoap3.articles.models import Article, ArticleIdentifier, ArticleTombstone
+from scoap3.articles.shares import SHARE_DIMENSIONS
+from scoap3.authors.api.serializers import AuthorIngestSerializer, PackedAuthorsField
+from scoap3.authors.author_lists import attach_author_lists
+from scoap3.authors.models import Author
+from scoap3.misc.api.serializers import (
+    ArticleArxivCategoryNestedSerializer,
+    CopyrightNestedSerializer,
+    ExperimentalCollaborationNestedSerializer,
+    FunderNestedSerializer,
+    LicenseIngestSerializer,
+    LicenseSerializer,
+    PublicationInfoIngestSerializer,
+    PublicationInfoNestedSerializer,
+    RelatedMaterialIngestSerializer,
+    RelatedMaterialSerializer,
+)
+from scoap3.misc.models import Affiliation, PublicationInfo
+from scoap3.utils.fieldsets import SparseFieldsetMixin
 
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "related_licenses": LicenseSerializer,
+        "related_materials": RelatedMaterialSerializer,
+    }
+
     class Meta:
         model = Article
-        fields = "__all__"
+        exclude = ["search_vector"]
 
 
-class ArticleIdentifierSerializer(serializers.ModelSerializer):
+class ArticleIdentifierSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {"article_id": ArticleSerializer}
+
     class Meta:
         model = ArticleIdentifier
         fields = "__all__"
+
+
+class ArticleTombstoneSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ArticleTombstone
+        fields = "__all__"
+
+
+class ArticleIdentifierNestedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArticleIdentifier
+        fields = ["identifier_type", "identifier_value"]
+
+
+#: The author rows of articles, with what ``AuthorNestedSerializer`` renders.
+AUTHOR_ROWS = Prefetch(
+    "author_set",
+    queryset=Author.objects.order_by("author_order", "id").prefetch_related(
+        "authoridentifier_set",
+        Prefetch(
+            "affiliation_set",
+            queryset=Affiliation.objects.select_related("country").prefetch_related(
+                "institutionidentifier_set"
+            ),
+        ),
+    ),
+)
+
+
+class ArticleNestedListSerializer(serializers.ListSerializer):
+    """Packs the author lists the articles lack together, not one by one."""
+
+    def to_representation(self, data):
+        articles = list(data)
+        if "authors" in self.child.fields:
+            attach_author_lists(articles)
+        return super().to_representation(articles)
+
+
+class ArticleNestedSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Full article record with every related object inlined.
+
+    The related objects are loaded through ``prefetch_plan``, one query per
+    relation, so the number of queries does not depend on the page size.
+    Authors are read from the packed author lists.
+    """
+
+    identifiers = ArticleIdentifierNestedSerializer(
+        source="articleidentifier_set", many=True
+    )
+    authors = PackedAuthorsField()
+    publication_info = PublicationInfoNestedSerializer(
+        source="publicationinfo_set", many=True
+    )
+    related_licenses = LicenseSerializer(many=True)
+    related_materials = RelatedMaterialSerializer(many=True)
+    copyrights = CopyrightNestedSerializer(source="copyright_set", many=True)
+    arxiv_categories = ArticleArxivCategoryNestedSerializer(
+        source="articlearxivcategory_set", many=True
+    )
+    funders = FunderNestedSerializer(source="funder_set", many=True)
+    collaborations = ExperimentalCollaborationNestedSerializer(
+        source="experimentalcollaboration_set", many=True
+    )
+
+    #: Lookups needed to render each nested field without extra queries.
+    prefetch_plan = {
+        "identifiers": ["articleidentifier_set"],
+        "authors": ["author_list"],
+        "publication_info": [
+            Prefetch(
+                "publicationinfo_set",
+                queryset=PublicationInfo.objects.select_related("publisher"),
+            )
+        ],
+        "related_licenses": ["related_licenses"],
+        "related_materials": ["related_materials"],
+        "copyrights": ["copyright_set"],
+        "arxiv_categories": ["articlearxivcategory_set"],
+        "funders": ["funder_set"],
+        "collaborations": ["experimentalcollaboration_set"],
+    }
+
+    class Meta:
+        model = Article
+        list_serializer_class = ArticleNestedListSerializer
+        fields = [
+            "id",
+            "title",
+            "subtitle",
+            "abstract",
+            "reception_date",
+            "acceptance_date",
+            "publication_date",
+            "first_online_date",
+            "identifiers",
+            "authors",
+            "publication_info",
+            "related_licenses",
+            "related_materials",
+            "copyrights",
+            "arxiv_categories",
+            "funders",
+            "collaborations",
+            "created_at",
+            "updated_at",
+        ]
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        lookups = []
+        for field_lookups in cls.prefetch_plan.values():
+            lookups.extend(field_lookups)
+        return queryset.prefetch_related(*lookups)
+
+
+class ArticleIngestSerializer(serializers.ModelSerializer):
+    """
+    Complete article document accepted by the bulk ingest endpoint.
+
+    Mirrors ``ArticleNestedSerializer``, except that countries are given by
+    code and publishers by name. Only used for validation, the documents are
+    written by ``scoap3.articles.ingest``.
+    """
+
+    identifiers = ArticleIdentifierNestedSerializer(many=True, required=False)
+    authors = AuthorIngestSerializer(many=True, required=False)
+    publication_info = PublicationInfoIngestSerializer(many=True, required=False)
+    related_licenses = LicenseIngestSerializer(many=True, required=False)
+    related_materials = RelatedMaterialIngestSerializer(many=True, required=False)
+    copyrights = CopyrightNestedSerializer(many=True, required=False)
+    arxiv_categories = ArticleArxivCategoryNestedSerializer(many=True, required=False)
+    funders = FunderNestedSerializer(many=True, required=False)
+    collaborations = ExperimentalCollaborationNestedSerializer(
+        many=True, required=False
+    )
+
+    class Meta:
+        model = Article
+        fields = [
+            "title",
+            "subtitle",
+            "abstract",
+            "reception_date",
+            "acceptance_date",
+            "publication_date",
+            "first_online_date",
+            "identifiers",
+            "authors",
+            "publication_info",
+            "related_licenses",
+            "related_materials",
+            "copyrights",
+            "arxiv_categories",
+            "funders",
+            "collaborations",
+        ]
+        extra_kwargs = {
+            "reception_date": {"required": True},
+            "acceptance_date": {"required": True},
+            "publication_date": {"required": True},
+        }
+
+
+class ArticleSearchQuerySerializer(serializers.Serializer):
+    """Query parameters of the article search endpoint."""
+
+    q = serializers.CharField(required=False, default="", allow_blank=True)
+    country = serializers.ListField(child=serializers.CharField(), required=False)
+    journal = serializers.ListField(child=serializers.CharField(), required=False)
+    publisher = serializers.ListField(child=serializers.CharField(), required=False)
+    year = serializers.ListField(child=serializers.IntegerField(), required=False)
+    category = serializers.ListField(child=serializers.CharField(), required=False)
+    collaboration = serializers.ListField(child=serializers.CharField(), required=False)
+    doi = serializers.ListField(child=serializers.CharField(), required=False)
+    arxiv_id = serializers.ListField(child=serializers.CharField(), required=False)
+    orcid = serializers.ListField(child=serializers.CharField(), required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    sort = serializers.ChoiceField(
+        choices=["relevance", "date", "-date"], required=False
+    )
+    page = serializers.IntegerField(min_value=1, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+    def validate(self, attrs):
+        if attrs["page"] * attrs["page_size"] > settings.SEARCH_MAX_RESULT_WINDOW:
+            raise serializers.ValidationError(
+                {
+                    "page": [
+                        "Only the first "
+                        f"{settings.SEARCH_MAX_RESULT_WINDOW} results can be paged "
+                        "through, narrow down the search."
+                    ]
+                }
+            )
+        return attrs
+
+
+class ArticleExportQuerySerializer(serializers.Serializer):
+    """Query parameters of the article export."""
+
+    output = serializers.ChoiceField(
+        choices=["ndjson", "csv", "jsonld"], default="ndjson"
+    )
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    journal = serializers.ListField(child=serializers.CharField(), required=False)
+
+
+class AggregateQuerySerializer(serializers.Serializer):
+    """
+    Query parameters shared by the aggregate endpoints.
+
+    Subclasses add a ``group_by`` field and a filter per dimension.
+    """
+
+    year = serializers.ListField(child=serializers.IntegerField(), required=False)
+    year_from = serializers.IntegerField(required=False)
+    year_to = serializers.IntegerField(required=False)
+
+    def validate_group_by(self, value):
+        if not value:
+            raise serializers.ValidationError("Group by at least one dimension.")
+        # Repeated dimensions would only repeat the columns.
+        return list(dict.fromkeys(value))
+
+
+class ArticleCountryShareQuerySerializer(AggregateQuerySerializer):
+    """Query parameters of the country share aggregates."""
+
+    group_by = serializers.ListField(
+        child=serializers.ChoiceField(choices=list(SHARE_DIMENSIONS)),
+        required=False,
+        default=["country", "year"],
+    )
+    country = serializers.ListField(child=serializers.CharField(), required=False)
+    journal = serializers.ListField(child=serializers.CharField(), required=False)
+    publisher = serializers.ListField(child=serializers.CharField(), required=False)
+
+
+class PublicationRollupQuerySerializer(AggregateQuerySerializer):
+    group_by = serializers.ListField(
+        child=serializers.ChoiceField(choices=["year", "journal", "publisher"]),
+        required=False,
+        default=["year"],
+    )
+    journal = serializers.ListField(child=serializers.CharField(), required=False)
+    publisher = serializers.ListField(child=serializers.CharField(), required=False)
+
+
+class ArxivCategoryRollupQuerySerializer(AggregateQuerySerializer):
+    group_by = serializers.ListField(
+        child=serializers.ChoiceField(choices=["year", "category"]),
+        required=False,
+        default=["year", "category"],
+    )
+    category = serializers.ListField(child=serializers.CharField(), required=False)
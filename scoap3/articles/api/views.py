@@ -1,3 +1,17 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import (
     CreateModelMixin,
     DestroyModelMixin,
@@ -5,16 +19,74 @@ from rest_framework.mixins import (
     RetrieveModelMixin,
     UpdateModelMixin,
 )
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from scoap3.articles.api.filters import ArticleFullTextFilter
 from scoap3.articles.api.serializers import (
+    ArticleCountryShareQuerySerializer,
+    ArticleExportQuerySerializer,
     ArticleIdentifierSerializer,
+    ArticleIngestSerializer,
+    ArticleNestedSerializer,
+    ArticleSearchQuerySerializer,
     ArticleSerializer,
+    ArticleTombstoneSerializer,
+    ArxivCategoryRollupQuerySerializer,
+    PublicationRollupQuerySerializer,
+)
+from scoap3.articles.export import (
+    EXPORT_FORMATS,
+    export_articles,
+    export_queryset,
+    gzip_chunks,
+)
+from scoap3.articles.ingest import ingest_batch, replace_author_list
+from scoap3.articles.models import (
+    Article,
+    ArticleIdentifier,
+    ArticleTombstone,
+    ArxivCategoryRollup,
+    CountryRollup,
+    PublicationRollup,
+)
+from scoap3.articles.rollups import aggregate_rollup, last_refreshed
+from scoap3.articles.search import FILTERS, search_articles
+from scoap3.articles.shares import SHARE_DIMENSIONS, aggregate_shares
+from scoap3.authors.api.serializers import (
+    AuthorIngestSerializer,
+    AuthorListReplaceSerializer,
+    AuthorNestedSerializer,
 )
-from scoap3.articles.models import Article, ArticleIdentifier
+from scoap3.authors.author_lists import packed_author_list, unpack_authors
+from scoap3.misc.models import (
+    Country,
+    InstitutionIdentifier,
+    License,
+    Publisher,
+    RelatedMaterial,
+)
+from scoap3.utils.cache import (
+    CachedResponseMixin,
+    conditional_response,
+    model_scope,
+    scope_validators,
+    served_validators,
+)
+from scoap3.utils.fieldsets import SparseFieldsetFilter
+from scoap3.utils.pagination import (
+    AuthorListPagination,
+    DeletedAtFeedPagination,
+    IdCursorPagination,
+    RankCursorPagination,
+    UpdatedAtFeedPagination,
+)
+from scoap3.utils.transactions import ClockTimestamp
 
 
 class ArticleViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -24,9 +96,88 @@ class ArticleViewSet(
 ):
     queryset = Article.objects.all()
     serializer_class = ArticleSerializer
+    pagination_class = RankCursorPagination
+    filter_backends = [ArticleFullTextFilter, SparseFieldsetFilter]
+    # Rows of these are nested in the articles without touching them.
+    cache_models = (Country, Publisher, License, RelatedMaterial, InstitutionIdentifier)
+    cache_article_scoped = True
+    validators_field = "updated_at"
+
+    def get_serializer_class(self):
+        if self.action in ("list", "retrieve"):
+            return ArticleNestedSerializer
+        if self.action == "bulk":
+            return ArticleIngestSerializer
+        return super().get_serializer_class()
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create a batch of complete article documents in one transaction.
+
+        With ``?mode=upsert``, documents whose identifiers belong to an
+        existing article update it instead. Invalid documents are skipped and
+        reported; the response holds one result per document, in input order.
+        """
+        mode = request.query_params.get("mode", "create")
+        if mode not in ("create", "upsert"):
+            raise ValidationError({"mode": [f"Unknown mode: {mode}"]})
+        documents = request.data
+        if not isinstance(documents, list):
+            raise ValidationError({"non_field_errors": ["Expected a list."]})
+        if len(documents) > settings.API_INGEST_MAX_BATCH_SIZE:
+            raise ValidationError(
+                {
+                    "non_field_errors": [
+                        "At most "
+                        f"{settings.API_INGEST_MAX_BATCH_SIZE} articles per batch."
+                    ]
+                }
+            )
+        return Response({"results": ingest_batch(documents, upsert=mode == "upsert")})
+
+    @action(
+        detail=True,
+        serializer_class=AuthorNestedSerializer,
+        pagination_class=AuthorListPagination,
+    )
+    def authors(self, request, pk=None):
+        """
+        The authors of the article in ``author_order``, ``?limit=`` at a time
+        from ``?offset=``, read from its packed author list.
+        """
+        return self.cached_response(self.author_page, request)
+
+    @extend_schema(
+        request=AuthorIngestSerializer(many=True),
+        responses=AuthorListReplaceSerializer,
+    )
+    @authors.mapping.put
+    def replace_authors(self, request, pk=None):
+        """
+        Replace the author list of the article, given as author documents of
+        the bulk ingest endpoint.
+
+        Incoming authors are matched to the existing ones by ORCID, or by
+        normalized name and order, and only the differences are written:
+        correcting a few authors of a large collaboration rewrites those
+        only. The response counts the authors created, updated and deleted.
+        """
+        return Response(replace_author_list(self.lookup_value(), request.data))
+
+    def author_page(self, request):
+        article = get_object_or_404(
+            Article.objects.select_related("author_list").only("id", "updated_at"),
+            pk=self.lookup_value(),
+        )
+        packed = packed_author_list(article)
+        page = self.paginate_queryset(packed["authors"])
+        self.served = [article]
+        return self.get_paginated_response(unpack_authors({**packed, "authors": page}))
 
 
 class ArticleIdentifierViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -36,3 +187,257 @@ class ArticleIdentifierViewSet(
 ):
     queryset = ArticleIdentifier.objects.all()
     serializer_class = ArticleIdentifierSerializer
+    pagination_class = IdCursorPagination
+
+
+class ArticleChangeViewSet(ListModelMixin, GenericViewSet):
+    """
+    Feed of the articles changed after ``?since=``, oldest change first.
+
+    Changes to authors, identifiers and other rows of an article move the
+    article itself to the head of the feed. Deleted articles and rows are
+    listed by the ``deletions`` action. Polls of a feed without new changes
+    are answered ``304 Not Modified`` given its ETag or Last-Modified.
+    """
+
+    queryset = Article.objects.all()
+    serializer_class = ArticleNestedSerializer
+    pagination_class = UpdatedAtFeedPagination
+
+    def get_queryset(self):
+        return self.filter_changes(super().get_queryset(), "updated_at")
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        # Polls finding the same page of changes are not modified.
+        validators = served_validators(page, "updated_at")
+        not_modified = conditional_response(request, validators=validators)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        return conditional_response(request, response, validators)
+
+    def filter_changes(self, queryset, field):
+        since = self.request.query_params.get("since")
+        if since is not None:
+            parsed = parse_datetime(since)
+            if parsed is None:
+                raise ValidationError({"since": ["Must be an ISO 8601 datetime."]})
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed, datetime.timezone.utc)
+            queryset = queryset.filter(**{f"{field}__gt": parsed})
+        # By the clock of the database, which stamps the changes on commit.
+        settled = ClockTimestamp() - datetime.timedelta(
+            seconds=settings.API_CHANGE_FEED_DELAY
+        )
+        return queryset.filter(**{f"{field}__lte": settled})
+
+    @action(
+        detail=False,
+        serializer_class=ArticleTombstoneSerializer,
+        pagination_class=DeletedAtFeedPagination,
+    )
+    def deletions(self, request):
+        queryset = self.filter_changes(ArticleTombstone.objects.all(), "deleted_at")
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ArticleExportViewSet(GenericViewSet):
+    """
+    Download of all the articles published from ``?date_from=`` to
+    ``?date_to=``, in any of the ``?journal=`` (repeatable).
+
+    ``?output=`` picks nested records as NDJSON, a flat CSV or a JSON-LD
+    graph of schema.org articles. The export is streamed, gzipped on the
+    fly for clients that accept it, unless the client's copy is current.
+    """
+
+    serializer_class = ArticleExportQuerySerializer
+    pagination_class = None
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        # Rows are streamed after the view returns, from a cursor of its own.
+        return transaction.non_atomic_requests(super().as_view(*args, **kwargs))
+
+    def cache_scopes(self):
+        # The records are those of the article API, with every relation.
+        models = (Article, *ArticleViewSet.cache_models)
+        return sorted(model_scope(model) for model in models)
+
+    @extend_schema(
+        parameters=[ArticleExportQuerySerializer], responses=OpenApiTypes.BINARY
+    )
+    def list(self, request):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        export_format = params["output"]
+        _, content_type, extension = EXPORT_FORMATS[export_format]
+        queryset = export_queryset(
+            date_from=params.get("date_from"),
+            date_to=params.get("date_to"),
+            journals=params.get("journal"),
+        )
+        gzipped = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        # The gzipped and plain exports are different representations.
+        validators = scope_validators(
+            self.cache_scopes(), salt=f"{request.get_full_path()}:{gzipped}"
+        )
+        not_modified = conditional_response(request, validators=validators)
+        if not_modified is not None:
+            return not_modified
+        chunks = export_articles(export_format, queryset)
+        response = StreamingHttpResponse(
+            gzip_chunks(chunks) if gzipped else chunks,
+            content_type=f"{content_type}; charset=utf-8",
+        )
+        if gzipped:
+            response["Content-Encoding"] = "gzip"
+        response["Vary"] = "Accept-Encoding"
+        response["Content-Disposition"] = f'attachment; filename="articles.{extension}"'
+        return conditional_response(request, response, validators)
+
+
+class ArticleSearchViewSet(GenericViewSet):
+    """
+    Full-text article search with facets, served from OpenSearch.
+
+    Repeating a filter parameter (``?country=CH&country=FR``) matches any of
+    the values. Facets are counted over the results of the query, each with
+    the filters of the other facets applied.
+    """
+
+    serializer_class = ArticleSearchQuerySerializer
+    pagination_class = None
+
+    @extend_schema(
+        parameters=[ArticleSearchQuerySerializer], responses=OpenApiTypes.OBJECT
+    )
+    def list(self, request):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return Response(
+            search_articles(
+                query=params["q"],
+                filters={name: params.get(name) for name in FILTERS},
+                date_from=params.get("date_from"),
+                date_to=params.get("date_to"),
+                sort=params.get("sort"),
+                offset=(params["page"] - 1) * params["page_size"],
+                size=params["page_size"],
+            )
+        )
+
+
+class ArticleCountryShareViewSet(GenericViewSet):
+    """
+    Fractional article counts by country, year, journal or publisher.
+
+    Read from the precomputed ``ArticleCountryShare`` table. ``?group_by=``
+    is repeatable and defaults to country and year; repeating a filter
+    parameter (``?country=CH&country=FR``) matches any of the values.
+    """
+
+    serializer_class = ArticleCountryShareQuerySerializer
+    pagination_class = None
+
+    @extend_schema(
+        parameters=[ArticleCountryShareQuerySerializer],
+        responses=OpenApiTypes.OBJECT,
+    )
+    def list(self, request):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return Response(
+            {
+                "results": aggregate_shares(
+                    params["group_by"],
+                    filters={name: params.get(name) for name in SHARE_DIMENSIONS},
+                    year_from=params.get("year_from"),
+                    year_to=params.get("year_to"),
+                )
+            }
+        )
+
+
+class RollupViewSet(GenericViewSet):
+    """
+    Base of the public dashboard endpoints, served from the ``rollup`` model.
+
+    ``?group_by=`` is repeatable; repeating a filter parameter
+    (``?year=2022&year=2023``) matches any of the values. Responses can be
+    cached until the next refresh of the rollups.
+    """
+
+    rollup = None
+    permission_classes = [AllowAny]
+    pagination_class = None
+
+    def list(self, request):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        dimensions = serializer.fields["group_by"].child.choices
+        response = Response(
+            {
+                "results": aggregate_rollup(
+                    self.rollup,
+                    params["group_by"],
+                    filters={name: params.get(name) for name in dimensions},
+                    year_from=params.get("year_from"),
+                    year_to=params.get("year_to"),
+                )
+            }
+        )
+        patch_cache_control(
+            response, public=True, max_age=settings.ROLLUPS_REFRESH_INTERVAL
+        )
+        refreshed_at = last_refreshed()
+        if refreshed_at is not None:
+            response["Last-Modified"] = http_date(refreshed_at.timestamp())
+        return response
+
+
+class PublicationRollupViewSet(RollupViewSet):
+    """Articles by year, journal and publisher; each counts for its first journal."""
+
+    rollup = PublicationRollup
+    serializer_class = PublicationRollupQuerySerializer
+
+    @extend_schema(
+        parameters=[PublicationRollupQuerySerializer], responses=OpenApiTypes.OBJECT
+    )
+    def list(self, request):
+        return super().list(request)
+
+
+class ArxivCategoryRollupViewSet(RollupViewSet):
+    """Articles by year and arXiv category; each counts once per category."""
+
+    rollup = ArxivCategoryRollup
+    serializer_class = ArxivCategoryRollupQuerySerializer
+
+    @extend_schema(
+        parameters=[ArxivCategoryRollupQuerySerializer], responses=OpenApiTypes.OBJECT
+    )
+    def list(self, request):
+        return super().list(request)
+
+
+class CountryRollupViewSet(RollupViewSet):
+    """Fractional and whole article counts by year, country, journal and publisher."""
+
+    rollup = CountryRollup
+    serializer_class = ArticleCountryShareQuerySerializer
+
+    @extend_schema(
+        parameters=[ArticleCountryShareQuerySerializer], responses=OpenApiTypes.OBJECT
+    )
+    def list(self, request):
+        return super().list(request)
@@ -0,0 +1,137 @@
+"""
+Search documents of articles.
+
+An article is indexed as a single denormalized document: the authors,
+affiliations, journals... are flattened into the article so that a search
+and its facets are answered by one OpenSearch request, without joins.
+"""
+from django.conf import settings
+
+from scoap3.articles.api.serializers import AUTHOR_ROWS, ArticleNestedSerializer
+from scoap3.articles.models import Article, ArticleIdentifierType
+
+#: Relations of ``ArticleNestedSerializer.prefetch_plan`` read by
+#: ``article_document``, which reads the author rows too.
+DOCUMENT_RELATIONS = (
+    "identifiers",
+    "publication_info",
+    "arxiv_categories",
+    "collaborations",
+)
+
+TEXT = {"type": "text", "analyzer": "folding"}
+KEYWORD = {"type": "keyword"}
+TEXT_AND_KEYWORD = {**TEXT, "fields": {"raw": KEYWORD}}
+
+ARTICLE_INDEX = {
+    "settings": {
+        "analysis": {
+            "analyzer": {
+                # Case and accent insensitive, with Unicode word segmentation.
+                "folding": {
+                    "type": "custom",
+                    "tokenizer": "icu_tokenizer",
+                    "filter": ["icu_folding"],
+                }
+            }
+        },
+    },
+    "mappings": {
+        "dynamic": "strict",
+        "properties": {
+            "id": {"type": "long"},
+            "title": TEXT_AND_KEYWORD,
+            "subtitle": TEXT,
+            "abstract": TEXT,
+            "dois": KEYWORD,
+            "arxiv_ids": KEYWORD,
+            "authors": TEXT,
+            "orcids": KEYWORD,
+            "author_count": {"type": "integer"},
+            "affiliations": TEXT,
+            "organizations": TEXT_AND_KEYWORD,
+            "countries": KEYWORD,
+            "journals": TEXT_AND_KEYWORD,
+            "publishers": KEYWORD,
+            "categories": KEYWORD,
+            "collaborations": TEXT_AND_KEYWORD,
+            "reception_date": {"type": "date"},
+            "acceptance_date": {"type": "date"},
+            "publication_date": {"type": "date"},
+            "first_online_date": {"type": "date"},
+            "year": {"type": "integer"},
+            "created_at": {"type": "date"},
+            "updated_at": {"type": "date"},
+        },
+    },
+}
+
+
+def article_index_name():
+    return f"{settings.OPENSEARCH_INDEX_PREFIX}-articles"
+
+
+def distinct(values):
+    """``values`` without duplicates, in first-seen order."""
+    return list(dict.fromkeys(values))
+
+
+def document_queryset(queryset=None):
+    """``queryset`` with everything ``article_document`` reads prefetched."""
+    if queryset is None:
+        queryset = Article.objects.all()
+    plan = ArticleNestedSerializer.prefetch_plan
+    lookups = [lookup for field in DOCUMENT_RELATIONS for lookup in plan[field]]
+    lookups.append(AUTHOR_ROWS)
+    return queryset.prefetch_related(*lookups)
+
+
+def article_document(article):
+    """The search document of an article loaded with ``document_queryset``."""
+    identifiers = article.articleidentifier_set.all()
+    authors = article.author_set.all()
+    affiliations = [a for author in authors for a in author.affiliation_set.all()]
+    infos = article.publicationinfo_set.all()
+    return {
+        "id": article.pk,
+        "title": article.title,
+        "subtitle": article.subtitle,
+        "abstract": article.abstract,
+        "dois": [
+            i.identifier_value
+            for i in identifiers
+            if i.identifier_type == ArticleIdentifierType.DOI
+        ],
+        "arxiv_ids": [
+            i.identifier_value
+            for i in identifiers
+            if i.identifier_type == ArticleIdentifierType.ARXIV
+        ],
+        "authors": [f"{a.first_name} {a.last_name}" for a in authors],
+        "orcids": distinct(
+            i.identifier_value
+            for author in authors
+            for i in author.authoridentifier_set.all()
+        ),
+        "author_count": len(authors),
+        "affiliations": distinct(a.value for a in affiliations),
+        "organizations": distinct(a.organization for a in affiliations),
+        "countries": distinct(a.country_id for a in affiliations),
+        "journals": distinct(info.journal_title for info in infos),
+        "publishers": distinct(info.publisher.name for info in infos),
+        "categories": [c.category for c in article.articlearxivcategory_set.all()],
+        "collaborations": [c.name for c in article.experimentalcollaboration_set.all()],
+        "reception_date": article.reception_date,
+        "acceptance_date": article.acceptance_date,
+        "publication_date": article.publication_date,
+        "first_online_date": article.first_online_date,
+        "year": article.publication_date.year if article.publication_date else None,
+        "created_at": article.created_at,
+        "updated_at": article.updated_at,
+    }
+
+
+def article_documents(queryset=None, chunk_size=500):
+    """Stream the documents of ``queryset``, prefetching one chunk at a time."""
+    for article in document_queryset(queryset).iterator(chunk_size=chunk_size):
+        yield article_document(article)
@@ -0,0 +1,253 @@
+"""
+Streaming exports of the whole corpus, as NDJSON, CSV or JSON-LD.
+
+Articles are read from a server-side cursor, with the related rows
+prefetched and rendered one chunk at a time: the memory used does not
+depend on the number of articles exported.
+"""
+import csv
+import io
+import json
+import zlib
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from scoap3.articles.api.serializers import ArticleNestedSerializer
+from scoap3.articles.models import Article
+from scoap3.utils.iterables import chunked
+
+#: Articles fetched, with their related rows, per round trip.
+CHUNK_SIZE = 500
+
+#: Columns of the CSV export, with several values joined by ``CSV_SEPARATOR``.
+CSV_COLUMNS = [
+    "id",
+    "doi",
+    "arxiv_id",
+    "title",
+    "publication_date",
+    "journal",
+    "volume",
+    "publisher",
+    "authors",
+    "orcids",
+    "countries",
+    "arxiv_categories",
+    "licenses",
+    "funders",
+    "collaborations",
+    "updated_at",
+]
+CSV_SEPARATOR = "; "
+
+ARXIV_CATEGORIES = "https://arxiv.org/category_taxonomy"
+
+
+def export_queryset(date_from=None, date_to=None, journals=None):
+    """Articles published from ``date_from`` to ``date_to`` in any of ``journals``."""
+    queryset = Article.objects.all()
+    if date_from is not None:
+        queryset = queryset.filter(publication_date__gte=date_from)
+    if date_to is not None:
+        queryset = queryset.filter(publication_date__lte=date_to)
+    if journals:
+        # A subquery rather than a join, which would repeat articles.
+        queryset = queryset.filter(
+            pk__in=Article.objects.filter(
+                publicationinfo__journal_title__in=journals
+            ).values("pk")
+        )
+    return ArticleNestedSerializer.setup_eager_loading(queryset.order_by("pk"))
+
+
+def article_records(queryset):
+    """The nested records of ``queryset``, as served by the article API."""
+    for chunk in chunked(queryset.iterator(chunk_size=CHUNK_SIZE), CHUNK_SIZE):
+        yield from ArticleNestedSerializer(chunk, many=True).data
+
+
+def dumps(value, **kwargs):
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False, **kwargs)
+
+
+def identifier_values(record, identifier_type):
+    return [
+        identifier["identifier_value"]
+        for identifier in record["identifiers"]
+        if identifier["identifier_type"] == identifier_type
+    ]
+
+
+def distinct(values):
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def ndjson_lines(records):
+    for record in records:
+        yield dumps(record) + "\n"
+
+
+def csv_row(record):
+    """Flatten ``record`` into the ``CSV_COLUMNS``."""
+    authors = record["authors"]
+    affiliations = [a for author in authors for a in author["affiliations"]]
+    publication = record["publication_info"][0] if record["publication_info"] else {}
+    columns = {
+        "id": record["id"],
+        "doi": identifier_values(record, "DOI"),
+        "arxiv_id": identifier_values(record, "arXiv"),
+        "title": record["title"],
+        "publication_date": record["publication_date"],
+        "journal": publication.get("journal_title", ""),
+        "volume": publication.get("journal_volume", ""),
+        "publisher": (publication.get("publisher") or {}).get("name", ""),
+        "authors": [f"{a['last_name']}, {a['first_name']}" for a in authors],
+        "orcids": [
+            i["identifier_value"]
+            for author in authors
+            for i in author["identifiers"]
+            if i["identifier_type"] == "ORCID"
+        ],
+        "countries": distinct(a["country"]["code"] for a in affiliations),
+        "arxiv_categories": [c["category"] for c in record["arxiv_categories"]],
+        "licenses": distinct(
+            license["url"] or license["name"] for license in record["related_licenses"]
+        ),
+        "funders": distinct(funder["funder_name"] for funder in record["funders"]),
+        "collaborations": [c["name"] for c in record["collaborations"]],
+        "updated_at": record["updated_at"],
+    }
+    return [
+        CSV_SEPARATOR.join(value) if isinstance(value, list) else value
+        for value in (columns[column] for column in CSV_COLUMNS)
+    ]
+
+
+def csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for record in records:
+        writer.writerow(csv_row(record))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def jsonld_node(record):
+    """``record`` as a schema.org ``ScholarlyArticle``."""
+    dois = identifier_values(record, "DOI")
+    node = {
+        "@type": "ScholarlyArticle",
+        "identifier": [
+            {
+                "@type": "PropertyValue",
+                "propertyID": identifier["identifier_type"],
+                "value": identifier["identifier_value"],
+            }
+            for identifier in record["identifiers"]
+        ],
+        "headline": record["title"],
+        "alternativeHeadline": record["subtitle"] or None,
+        "abstract": record["abstract"] or None,
+        "datePublished": record["publication_date"],
+        "dateModified": record["updated_at"],
+        "author": [
+            {
+                "@type": "Person",
+                "givenName": author["first_name"],
+                "familyName": author["last_name"],
+                "identifier": [i["identifier_value"] for i in author["identifiers"]],
+                "affiliation": [
+                    {
+                        "@type": "Organization",
+                        "name": affiliation["organization"] or affiliation["value"],
+                        "address": {
+                            "@type": "PostalAddress",
+                            "addressCountry": affiliation["country"]["code"],
+                        },
+                    }
+                    for affiliation in author["affiliations"]
+                ],
+            }
+            for author in record["authors"]
+        ],
+        "isPartOf": [
+            {
+                "@type": "PublicationVolume",
+                "volumeNumber": publication["journal_volume"] or None,
+                "isPartOf": {
+                    "@type": "Periodical",
+                    "name": publication["journal_title"],
+                },
+            }
+            for publication in record["publication_info"]
+        ],
+        "publisher": [
+            {"@type": "Organization", "name": publication["publisher"]["name"]}
+            for publication in record["publication_info"]
+        ],
+        "license": distinct(
+            license["url"] or license["name"] for license in record["related_licenses"]
+        ),
+        "about": [
+            {
+                "@type": "DefinedTerm",
+                "termCode": category["category"],
+                "inDefinedTermSet": ARXIV_CATEGORIES,
+            }
+            for category in record["arxiv_categories"]
+        ],
+        "funder": [
+            {"@type": "Organization", "name": funder["funder_name"]}
+            for funder in record["funders"]
+        ],
+    }
+    if dois:
+        node["@id"] = f"https://doi.org/{dois[0]}"
+    return {key: value for key, value in node.items() if value not in (None, [])}
+
+
+def jsonld_chunks(records):
+    yield '{"@context": "https://schema.org", "@graph": ['
+    separator = "\n"
+    for record in records:
+        yield separator + dumps(jsonld_node(record))
+        separator = ",\n"
+    yield "\n]}\n"
+
+
+#: Export formats, as (renderer, content type, file extension).
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_lines, "application/x-ndjson", "ndjson"),
+    "csv": (csv_lines, "text/csv", "csv"),
+    "jsonld": (jsonld_chunks, "application/ld+json", "jsonld"),
+}
+
+
+def export_articles(export_format, queryset):
+    """Render ``queryset`` in ``export_format``, as an iterable of strings."""
+    render = EXPORT_FORMATS[export_format][0]
+    return render(article_records(queryset))
+
+
+def gzip_chunks(chunks, flush_size=64 * 1024):
+    """
+    Compress the ``chunks`` of text with gzip as they come.
+
+    Compressed data is emitted every ``flush_size`` bytes of input or so,
+    which keeps both the response flowing and the compression ratio.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode()
+        pending += len(data)
+        output = compressor.compress(data)
+        if pending >= flush_size:
+            output += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if output:
+            yield output
+    yield compressor.flush()
@@ -0,0 +1,910 @@
+"""
+Bulk ingestion of complete article documents.
+
+A batch is written with one ``bulk_create`` per table, including the m2m
+through tables, inside a single transaction. The number of queries depends
+on the number of tables, not on the number of articles or authors.
+
+In upsert mode documents are matched to existing articles by their
+identifiers (DOI, arXiv). A matched article is compared with the document
+collection by collection and only the collections that differ are
+rewritten, so re-ingesting an unchanged batch only costs the lookups.
+Documents are matched inside the write transaction, with their identifiers
+locked, so that concurrent batches carrying the same ones are matched in
+turn.
+"""
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+
+from scoap3.articles.api.serializers import (
+    AUTHOR_ROWS,
+    ArticleIngestSerializer,
+    ArticleNestedSerializer,
+)
+from scoap3.articles.models import Article, ArticleIdentifier
+from scoap3.articles.signals import (
+    ARTICLE_GRAPH_MODELS,
+    articles_changed,
+    bulk_changes,
+    record_tombstones,
+    touch_articles,
+)
+from scoap3.authors.api.serializers import AuthorIngestSerializer
+from scoap3.authors.models import Author, AuthorIdentifier, AuthorIdentifierType
+from scoap3.misc.affiliations import (
+    AffiliationResolver,
+    affiliation_fingerprint,
+    document_fingerprint,
+)
+from scoap3.misc.countries import fill_countries
+from scoap3.misc.models import (
+    Affiliation,
+    ArticleArxivCategory,
+    Copyright,
+    Country,
+    ExperimentalCollaboration,
+    Funder,
+    InstitutionIdentifier,
+    License,
+    PublicationInfo,
+    Publisher,
+    RelatedMaterial,
+)
+from scoap3.misc.reference import (
+    REFERENCE_MODELS,
+    country_names,
+    invalidate_references,
+    reference_rows,
+)
+from scoap3.utils.cache import invalidate_models
+from scoap3.utils.text import normalize_text
+
+ARTICLE_FIELDS = (
+    "title",
+    "subtitle",
+    "abstract",
+    "reception_date",
+    "acceptance_date",
+    "publication_date",
+    "first_online_date",
+)
+
+#: Document keys stored in tables with an ``article_id`` foreign key, as
+#: (key, model, related name on ``Article``, fields compared in upsert mode).
+CHILD_COLLECTIONS = (
+    (
+        "identifiers",
+        ArticleIdentifier,
+        "articleidentifier_set",
+        ("identifier_type", "identifier_value"),
+    ),
+    (
+        "publication_info",
+        PublicationInfo,
+        "publicationinfo_set",
+        (
+            "journal_volume",
+            "journal_title",
+            "journal_issue",
+            "page_start",
+            "page_end",
+            "artid",
+            "volume_year",
+            "journal_issue_date",
+        ),
+    ),
+    ("copyrights", Copyright, "copyright_set", ("statement", "holder", "year")),
+    (
+        "arxiv_categories",
+        ArticleArxivCategory,
+        "articlearxivcategory_set",
+        ("category", "primary"),
+    ),
+)
+
+#: Document keys stored through m2m tables, as (key, model, fields identifying
+#: an existing row, through table, through column pointing at the row).
+M2M_RELATIONS = (
+    (
+        "related_licenses",
+        License,
+        ("name", "url"),
+        Article.related_licenses.through,
+        "license_id",
+    ),
+    (
+        "related_materials",
+        RelatedMaterial,
+        ("title", "doi", "related_material_type"),
+        Article.related_materials.through,
+        "relatedmaterial_id",
+    ),
+    (
+        "funders",
+        Funder,
+        ("funder_identifier", "funder_name", "award_number"),
+        Funder.article_id.through,
+        "funder_id",
+    ),
+    (
+        "collaborations",
+        ExperimentalCollaboration,
+        ("name", "experimental_collaboration_order"),
+        ExperimentalCollaboration.article_id.through,
+        "experimentalcollaboration_id",
+    ),
+)
+
+#: Related name on ``Article`` of each m2m document key.
+M2M_RELATED_NAMES = {
+    "related_licenses": "related_licenses",
+    "related_materials": "related_materials",
+    "funders": "funder_set",
+    "collaborations": "experimentalcollaboration_set",
+}
+
+#: Error of documents losing a race with a concurrent write.
+RETRY_ERROR = "Conflicts with a concurrent write, retry."
+
+
+def document_affiliations(document):
+    return [
+        affiliation
+        for author in document.get("authors", [])
+        for affiliation in author.get("affiliations", [])
+    ]
+
+
+def document_countries(document):
+    return {affiliation["country"] for affiliation in document_affiliations(document)}
+
+
+def uninferred_countries(document):
+    """
+    Infer the missing countries of the affiliations of ``document``, see
+    ``fill_countries``. Returns the errors of those it cannot infer.
+    """
+    return [
+        f"Cannot infer the country of: {affiliation['value']}"
+        for affiliation in fill_countries(document_affiliations(document))
+    ]
+
+
+def document_identifiers(document):
+    return [
+        (identifier["identifier_type"], identifier["identifier_value"])
+        for identifier in document.get("identifiers", [])
+    ]
+
+
+def known_countries(codes):
+    """The existing countries among ``codes``, looked up in their cache first."""
+    known = codes & country_names().keys()
+    if codes - known:
+        known.update(
+            Country.objects.filter(code__in=codes - known).values_list(
+                "code", flat=True
+            )
+        )
+    return known
+
+
+def validate_documents(raw_documents):
+    """
+    Validate a batch of raw documents.
+
+    Returns ``(valid, errors)``: the validated data of the valid documents
+    keyed by batch index, and the errors of the others.
+    """
+    valid, errors = {}, {}
+    for index, raw_document in enumerate(raw_documents):
+        serializer = ArticleIngestSerializer(data=raw_document)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            errors[index] = serializer.errors
+
+    for index, document in list(valid.items()):
+        uninferred = uninferred_countries(document)
+        if uninferred:
+            errors[index] = {"country": uninferred}
+            del valid[index]
+    known = known_countries(
+        set().union(*(document_countries(d) for d in valid.values()))
+    )
+    for index, document in list(valid.items()):
+        unknown = document_countries(document) - known
+        if unknown:
+            errors[index] = {"country": [f"Unknown code: {c}" for c in sorted(unknown)]}
+            del valid[index]
+    return valid, errors
+
+
+def match_documents(valid):
+    """
+    Find the existing article each document refers to, in one query.
+
+    Returns ``(matches, errors)``: the matched article id (or ``None``) of
+    each usable document keyed by batch index, and the errors of documents
+    whose identifiers are ambiguous.
+    """
+    wanted = {pair for d in valid.values() for pair in document_identifiers(d)}
+    owners = {}
+    if wanted:
+        rows = ArticleIdentifier.objects.filter(
+            identifier_type__in={t for t, _ in wanted},
+            identifier_value__in={v for _, v in wanted},
+        ).values_list("identifier_type", "identifier_value", "article_id")
+        owners = {(t, v): a for t, v, a in rows if (t, v) in wanted}
+
+    matches, errors, claimed = {}, {}, {}
+    for index, document in sorted(valid.items()):
+        pairs = document_identifiers(document)
+        article_ids = {owners[pair] for pair in pairs if pair in owners}
+        others = sorted({claimed[pair] for pair in pairs if pair in claimed})
+        if len(set(pairs)) < len(pairs):
+            errors[index] = {"identifiers": ["Duplicate identifiers."]}
+        elif others:
+            errors[index] = {
+                "identifiers": [
+                    f"Also used by document {i} of the batch." for i in others
+                ]
+            }
+        elif len(article_ids) > 1:
+            errors[index] = {
+                "identifiers": [
+                    f"Identify several articles: {', '.join(map(str, sorted(article_ids)))}."
+                ]
+            }
+        else:
+            matches[index] = article_ids.pop() if article_ids else None
+            claimed.update(dict.fromkeys(pairs, index))
+    return matches, errors
+
+
+def lock_identifiers(valid):
+    """
+    Lock the identifiers of the documents until the transaction ends.
+
+    Advisory locks on their hashes, taken in the same order by every batch.
+    """
+    keys = sorted(
+        {
+            f"{t}:{v}"
+            for document in valid.values()
+            for t, v in document_identifiers(document)
+        }
+    )
+    if not keys:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtextextended(key, 0)) "
+            "FROM unnest(%s::text[]) AS key",
+            [keys],
+        )
+
+
+def ingest_batch(raw_documents, upsert=False):
+    """
+    Validate and write a batch of documents, returning one result per document.
+
+    Without ``upsert``, documents whose identifiers already belong to an
+    article are rejected. With it, they update that article. Documents
+    losing a race with a concurrent write are reported invalid, to retry.
+    """
+    valid, errors = validate_documents(raw_documents)
+    try:
+        with transaction.atomic():
+            lock_identifiers(valid)
+            matches, conflicts = match_documents(valid)
+            errors.update(conflicts)
+            if not upsert:
+                for index, article_id in list(matches.items()):
+                    if article_id is not None:
+                        errors[index] = {
+                            "identifiers": [f"Already used by article {article_id}."]
+                        }
+                        del matches[index]
+
+            new = [i for i, article_id in sorted(matches.items()) if article_id is None]
+            existing = [(i, a) for i, a in sorted(matches.items()) if a is not None]
+            if existing:
+                # Articles deleted since they were matched.
+                present = set(
+                    Article.objects.select_for_update()
+                    .filter(pk__in=[a for _, a in existing])
+                    .values_list("pk", flat=True)
+                )
+                for index, article_id in existing:
+                    if article_id not in present:
+                        errors[index] = {"identifiers": [RETRY_ERROR]}
+                existing = [(i, a) for i, a in existing if a in present]
+            articles = create_articles([valid[index] for index in new])
+            changed = update_articles([(a, valid[i]) for i, a in existing])
+    except IntegrityError:
+        # A unique value taken meanwhile by a write of another endpoint.
+        errors.update(dict.fromkeys(valid, {"non_field_errors": [RETRY_ERROR]}))
+        return sorted(
+            (
+                {"index": index, "status": "invalid", "errors": index_errors}
+                for index, index_errors in errors.items()
+            ),
+            key=lambda result: result["index"],
+        )
+
+    results = [
+        {"index": index, "status": "invalid", "errors": errors[index]}
+        for index in errors
+    ]
+    results += [
+        {"index": index, "status": "created", "id": article.pk}
+        for index, article in zip(new, articles)
+    ]
+    results += [
+        {
+            "index": index,
+            "status": "updated" if article_id in changed else "unchanged",
+            "id": article_id,
+        }
+        for index, article_id in existing
+    ]
+    return sorted(results, key=lambda result: result["index"])
+
+
+def resolve(model, key_fields, rows):
+    """
+    Map each distinct ``key_fields`` tuple in ``rows`` to a row id.
+
+    Existing rows are looked up in one query, the missing ones are created
+    with one ``bulk_create``. Rows of reference tables are first looked up in
+    their cache, which usually makes the query unnecessary.
+    """
+    wanted = {tuple(row[field] for field in key_fields) for row in rows}
+    if not wanted:
+        return {}
+    ids = {}
+    if model in REFERENCE_MODELS:
+        for row in reference_rows(model):
+            key = tuple(row[field] for field in key_fields)
+            if key in wanted:
+                ids.setdefault(key, row["id"])
+    unknown = wanted - ids.keys()
+    if unknown:
+        lookup = {
+            f"{field}__in": {key[i] for key in unknown}
+            for i, field in enumerate(key_fields)
+        }
+        for row in model.objects.filter(**lookup).values("id", *key_fields):
+            key = tuple(row[field] for field in key_fields)
+            if key in unknown:
+                ids.setdefault(key, row["id"])
+    missing = [model(**dict(zip(key_fields, key))) for key in wanted if key not in ids]
+    for obj in model.objects.bulk_create(missing):
+        ids[tuple(getattr(obj, field) for field in key_fields)] = obj.pk
+    if missing:
+        invalidate_models([model])
+        if model in REFERENCE_MODELS:
+            invalidate_references([model])
+    return ids
+
+
+def resolve_publishers(documents):
+    return resolve(
+        Publisher,
+        ("name",),
+        [
+            {"name": info["publisher"]}
+            for d in documents
+            for info in d.get("publication_info", [])
+        ],
+    )
+
+
+def build_children(key, model, article, document, publishers):
+    """Unsaved rows of the ``key`` collection of ``document``."""
+    rows = []
+    for item in document.get(key, []):
+        item = dict(item)
+        if "publisher" in item:
+            item["publisher_id"] = publishers[(item.pop("publisher"),)]
+        rows.append(model(article_id=article, **item))
+    return rows
+
+
+def author_fields(author, position):
+    """The ``Author`` fields of an author document at ``position``."""
+    return {
+        "first_name": author["first_name"],
+        "last_name": author["last_name"],
+        "email": author["email"],
+        "author_order": author.get("author_order", position),
+    }
+
+
+def build_authors(article, document):
+    """Unsaved authors of ``document``, as ``(article, author, document)`` tuples."""
+    return [
+        (article, Author(article_id=article, **author_fields(author, position)), author)
+        for position, author in enumerate(document.get("authors", []))
+    ]
+
+
+@transaction.atomic
+def create_articles(documents):
+    """Create articles and all their related rows from validated documents."""
+    if not documents:
+        return []
+    publishers = resolve_publishers(documents)
+    articles = Article.objects.bulk_create(
+        [Article(**{f: d[f] for f in ARTICLE_FIELDS if f in d}) for d in documents]
+    )
+
+    for key, model, _, _ in CHILD_COLLECTIONS:
+        model.objects.bulk_create(
+            [
+                row
+                for article, document in zip(articles, documents)
+                for row in build_children(key, model, article, document, publishers)
+            ]
+        )
+    authors = [
+        row
+        for article, document in zip(articles, documents)
+        for row in build_authors(article, document)
+    ]
+    Author.objects.bulk_create([author for _, author, _ in authors])
+    create_author_rows(authors)
+    create_m2m_links(list(zip(articles, documents)))
+
+    invalidate_models(ARTICLE_GRAPH_MODELS)
+    articles_changed.send(
+        sender=Article, article_ids={article.pk for article in articles}
+    )
+    return articles
+
+
+def create_m2m_links(pairs, relations=M2M_RELATIONS):
+    """Link ``(article, document)`` pairs to the rows of the given m2m relations."""
+    for key, model, key_fields, through, column in relations:
+        items = [(a, item) for a, d in pairs for item in d.get(key, [])]
+        ids = resolve(model, key_fields, [item for _, item in items])
+        links = {
+            (article.pk, ids[tuple(item[field] for field in key_fields)])
+            for article, item in items
+        }
+        through.objects.bulk_create(
+            [through(article_id=a, **{column: target}) for a, target in links]
+        )
+
+
+def create_author_rows(authors):
+    """
+    Create the identifiers and affiliation links of freshly created authors.
+
+    ``authors`` holds ``(article, author, document)`` tuples. Authors are
+    linked to the canonical rows of their affiliations, see
+    ``scoap3.misc.affiliations``.
+    """
+    AuthorIdentifier.objects.bulk_create(
+        AuthorIdentifier(author_id=author, **identifier)
+        for _, author, document in authors
+        for identifier in document.get("identifiers", [])
+    )
+    create_affiliation_links(
+        [
+            (affiliation, author)
+            for _, author, document in authors
+            for affiliation in document.get("affiliations", [])
+        ]
+    )
+
+
+def create_affiliation_links(links):
+    """Link the ``(affiliation document, author)`` pairs of ``links``."""
+    ids = AffiliationResolver().resolve([affiliation for affiliation, _ in links])
+    through = Affiliation.author_id.through
+    through.objects.bulk_create(
+        through(affiliation_id=affiliation_id, author_id=author_id)
+        for affiliation_id, author_id in {
+            (ids[document_fingerprint(affiliation)], author.pk)
+            for affiliation, author in links
+        }
+    )
+
+
+# Comparison keys. Both sides are reduced to sorted tuples of plain values,
+# with the model defaults applied to the document side by instantiating it.
+
+
+def sorted_keys(keys):
+    return sorted(keys, key=repr)
+
+
+def publisher_name(row):
+    publisher = getattr(row, "publisher", None)
+    return publisher and publisher.name
+
+
+def children_key(fields, rows):
+    return sorted_keys(
+        tuple(getattr(row, field) for field in fields) + (publisher_name(row),)
+        for row in rows
+    )
+
+
+def document_children_key(key, model, fields, document):
+    keys = []
+    for item in document.get(key, []):
+        item = dict(item)
+        publisher = item.pop("publisher", None)
+        row = model(**item)
+        keys.append(tuple(getattr(row, field) for field in fields) + (publisher,))
+    return sorted_keys(keys)
+
+
+def authors_key(authors):
+    return sorted_keys(
+        (
+            author.author_order,
+            author.first_name,
+            author.last_name,
+            author.email,
+            sorted_keys(
+                (i.identifier_type, i.identifier_value)
+                for i in author.authoridentifier_set.all()
+            ),
+            sorted(affiliation_fingerprint(a) for a in author.affiliation_set.all()),
+        )
+        for author in authors
+    )
+
+
+def document_authors_key(document):
+    return sorted_keys(
+        (
+            author.get("author_order", position),
+            author["first_name"],
+            author["last_name"],
+            author["email"],
+            sorted_keys(
+                (i["identifier_type"], i["identifier_value"])
+                for i in author.get("identifiers", [])
+            ),
+            sorted(document_fingerprint(a) for a in author.get("affiliations", [])),
+        )
+        for position, author in enumerate(document.get("authors", []))
+    )
+
+
+def m2m_key(key_fields, rows):
+    return {tuple(getattr(row, field) for field in key_fields) for row in rows}
+
+
+def document_m2m_key(key, key_fields, document):
+    return {
+        tuple(item[field] for field in key_fields) for item in document.get(key, [])
+    }
+
+
+def update_articles(matches):
+    """
+    Bring matched articles in line with their documents.
+
+    ``matches`` holds ``(article_id, document)`` pairs. The articles are
+    locked and loaded with every relation, then each collection is compared
+    with the document and only the differing ones are replaced, one bulk
+    statement per table for the whole batch. Returns the ids of the articles
+    that changed.
+    """
+    if not matches:
+        return set()
+    queryset = Article.objects.select_for_update().filter(
+        pk__in=[article_id for article_id, _ in matches]
+    )
+    lookups = [
+        lookup
+        for field, field_lookups in ArticleNestedSerializer.prefetch_plan.items()
+        if field != "authors"
+        for lookup in field_lookups
+    ]
+    articles = queryset.prefetch_related(*lookups, AUTHOR_ROWS).in_bulk()
+    pairs = [(articles[article_id], document) for article_id, document in matches]
+
+    changed_fields, changed = set(), set()
+    replaced_children = {key: [] for key, *_ in CHILD_COLLECTIONS}
+    replaced_m2m = {key: [] for key, *_ in M2M_RELATIONS}
+    replaced_authors = []
+    for article, document in pairs:
+        incoming = Article(**{f: document[f] for f in ARTICLE_FIELDS if f in document})
+        for field in ARTICLE_FIELDS:
+            if getattr(article, field) != getattr(incoming, field):
+                setattr(article, field, getattr(incoming, field))
+                changed_fields.add(field)
+                changed.add(article.pk)
+        for key, model, related_name, fields in CHILD_COLLECTIONS:
+            current = getattr(article, related_name).all()
+            if children_key(fields, current) != document_children_key(
+                key, model, fields, document
+            ):
+                replaced_children[key].append((article, document))
+        if authors_key(article.author_set.all()) != document_authors_key(document):
+            replaced_authors.append((article, document))
+        for key, _, key_fields, _, _ in M2M_RELATIONS:
+            current = getattr(article, M2M_RELATED_NAMES[key]).all()
+            if m2m_key(key_fields, current) != document_m2m_key(
+                key, key_fields, document
+            ):
+                replaced_m2m[key].append((article, document))
+
+    for replaced in (*replaced_children.values(), *replaced_m2m.values()):
+        changed.update(article.pk for article, _ in replaced)
+    changed.update(article.pk for article, _ in replaced_authors)
+    if not changed:
+        return changed
+
+    written = {model for key, model, *_ in CHILD_COLLECTIONS if replaced_children[key]}
+    written |= {model for key, model, *_ in M2M_RELATIONS if replaced_m2m[key]}
+    invalidate_models(written)
+    with bulk_changes():
+        if changed_fields:
+            Article.objects.bulk_update(
+                [article for article, _ in pairs if article.pk in changed],
+                sorted(changed_fields),
+            )
+        publishers = resolve_publishers(
+            [document for _, document in replaced_children["publication_info"]]
+        )
+        for key, model, _, _ in CHILD_COLLECTIONS:
+            replaced = replaced_children[key]
+            if not replaced:
+                continue
+            delete_rows(
+                model, model.objects.filter(article_id__in=[a for a, _ in replaced])
+            )
+            model.objects.bulk_create(
+                [
+                    row
+                    for article, document in replaced
+                    for row in build_children(key, model, article, document, publishers)
+                ]
+            )
+        if replaced_authors:
+            replace_authors(replaced_authors)
+        for relation in M2M_RELATIONS:
+            key, _, _, through, _ = relation
+            replaced = replaced_m2m[key]
+            if replaced:
+                through.objects.filter(article_id__in=[a for a, _ in replaced]).delete()
+                create_m2m_links(replaced, relations=[relation])
+    touch_articles(changed)
+    return changed
+
+
+def delete_rows(model, queryset):
+    """Delete the rows of a child ``queryset``, recording their tombstones."""
+    record_tombstones(model, queryset.values_list("pk", "article_id"))
+    queryset.delete()
+
+
+def name_key(first_name, last_name, author_order):
+    return (normalize_text(first_name), normalize_text(last_name), author_order)
+
+
+def orcids(identifiers):
+    return [
+        value
+        for identifier_type, value in identifiers
+        if identifier_type == AuthorIdentifierType.ORCID
+    ]
+
+
+def match_authors(authors, documents):
+    """
+    Pair the author ``documents`` of an article with its current ``authors``.
+
+    A document is matched to the author sharing one of its ORCIDs, failing
+    that to the author with the same normalized name and order. Returns the
+    matched author, or ``None``, of each document and the unmatched authors.
+    """
+    by_orcid, by_name = defaultdict(list), defaultdict(list)
+    for author in authors:
+        identifiers = [
+            (i.identifier_type, i.identifier_value)
+            for i in author.authoridentifier_set.all()
+        ]
+        for orcid in orcids(identifiers):
+            by_orcid[orcid].append(author)
+        key = name_key(author.first_name, author.last_name, author.author_order)
+        by_name[key].append(author)
+
+    unmatched = dict.fromkeys(authors)
+    matched = [None] * len(documents)
+
+    def claim(position, candidates):
+        for author in candidates:
+            if author in unmatched:
+                del unmatched[author]
+                matched[position] = author
+                return True
+        return False
+
+    for position, document in enumerate(documents):
+        identifiers = [
+            (i["identifier_type"], i["identifier_value"])
+            for i in document.get("identifiers", [])
+        ]
+        for orcid in orcids(identifiers):
+            if claim(position, by_orcid[orcid]):
+                break
+    for position, document in enumerate(documents):
+        if matched[position] is None:
+            fields = author_fields(document, position)
+            claim(
+                position,
+                by_name[
+                    name_key(
+                        fields["first_name"],
+                        fields["last_name"],
+                        fields["author_order"],
+                    )
+                ],
+            )
+    return matched, list(unmatched)
+
+
+def replace_author_list(article_id, raw_authors):
+    """
+    Replace the authors of an article with ``raw_authors``, author documents
+    as accepted by the bulk ingest endpoint, writing only the differences.
+
+    Returns the counts of ``replace_authors``, or raises ``ValidationError``.
+    """
+    serializer = AuthorIngestSerializer(data=raw_authors, many=True)
+    serializer.is_valid(raise_exception=True)
+    document = {"authors": serializer.validated_data}
+    uninferred = uninferred_countries(document)
+    if uninferred:
+        raise ValidationError({"country": uninferred})
+    unknown = document_countries(document) - known_countries(
+        document_countries(document)
+    )
+    if unknown:
+        raise ValidationError(
+            {"country": [f"Unknown code: {c}" for c in sorted(unknown)]}
+        )
+
+    with transaction.atomic():
+        article = get_object_or_404(
+            Article.objects.select_for_update().prefetch_related(AUTHOR_ROWS),
+            pk=article_id,
+        )
+        with bulk_changes():
+            counts = replace_authors([(article, document)])
+        if any(counts.values()):
+            touch_articles([article.pk])
+    return counts
+
+
+def replace_authors(pairs):
+    """
+    Bring the authors of ``(article, document)`` pairs in line with the
+    documents' ones, writing only the differences.
+
+    The articles must be loaded with ``AUTHOR_ROWS``. Each incoming author
+    is matched to an existing one, see ``match_authors``: matched authors
+    have their changed fields, identifiers and affiliation links rewritten,
+    the others are created or deleted. Authors gaining an affiliation are
+    linked to its canonical row. Every table is written with one bulk
+    statement for the whole batch. Returns the number of authors created, updated, in
+    their fields, identifiers or affiliations, and deleted.
+    """
+    created, updated, deleted, update_fields = [], [], [], set()
+    revised = set()
+    added_identifiers, deleted_identifiers = [], []
+    added_links, deleted_links = [], []
+    for article, document in pairs:
+        authors = list(article.author_set.all())
+        documents = document.get("authors", [])
+        matched, unmatched = match_authors(authors, documents)
+        deleted += unmatched
+        for position, (author, author_document) in enumerate(zip(matched, documents)):
+            fields = author_fields(author_document, position)
+            if author is None:
+                author = Author(article_id=article, **fields)
+                created.append(author)
+                current_identifiers, current_affiliations = {}, {}
+            else:
+                changed = [f for f, v in fields.items() if getattr(author, f) != v]
+                for field in changed:
+                    setattr(author, field, fields[field])
+                if changed:
+                    updated.append(author)
+                    update_fields.update(changed)
+                    revised.add(author.pk)
+                current_identifiers = {
+                    (i.identifier_type, i.identifier_value): i
+                    for i in author.authoridentifier_set.all()
+                }
+                current_affiliations = {
+                    affiliation_fingerprint(a): a for a in author.affiliation_set.all()
+                }
+
+            identifiers = {
+                (i["identifier_type"], i["identifier_value"]): i
+                for i in author_document.get("identifiers", [])
+            }
+            wanted = {
+                document_fingerprint(a): a
+                for a in author_document.get("affiliations", [])
+            }
+            dropped_identifiers = [
+                identifier.pk
+                for key, identifier in current_identifiers.items()
+                if key not in identifiers
+            ]
+            dropped_links = [
+                (affiliation.pk, author.pk)
+                for key, affiliation in current_affiliations.items()
+                if key not in wanted
+            ]
+            new_identifiers = [
+                AuthorIdentifier(author_id=author, **identifier)
+                for key, identifier in identifiers.items()
+                if key not in current_identifiers
+            ]
+            new_links = [
+                (affiliation, author)
+                for key, affiliation in wanted.items()
+                if key not in current_affiliations
+            ]
+
+            if author.pk is not None and (
+                dropped_identifiers or dropped_links or new_identifiers or new_links
+            ):
+                revised.add(author.pk)
+            deleted_identifiers += dropped_identifiers
+            deleted_links += dropped_links
+            added_identifiers += new_identifiers
+            added_links += new_links
+
+    if deleted:
+        delete_rows(Author, Author.objects.filter(pk__in=[a.pk for a in deleted]))
+    if updated:
+        Author.objects.bulk_update(updated, sorted(update_fields))
+    Author.objects.bulk_create(created)
+    AuthorIdentifier.objects.filter(pk__in=deleted_identifiers).delete()
+    AuthorIdentifier.objects.bulk_create(added_identifiers)
+
+    if deleted_links:
+        Affiliation.author_id.through.objects.filter(
+            reduce(
+                or_,
+                (Q(affiliation_id=f, author_id=a) for f, a in deleted_links),
+            )
+        ).delete()
+    create_affiliation_links(added_links)
+    # Affiliations are not owned by a single author, drop the orphaned ones.
+    orphans = {f for f, _ in deleted_links} | {
+        affiliation.pk
+        for author in deleted
+        for affiliation in author.affiliation_set.all()
+    }
+    if orphans:
+        Affiliation.objects.filter(pk__in=orphans, author_id__isnull=True).delete()
+
+    written = set()
+    if created or updated or deleted:
+        written.add(Author)
+    if deleted or deleted_identifiers or added_identifiers:
+        written.add(AuthorIdentifier)
+    if deleted_links or added_links or orphans:
+        written |= {Affiliation, InstitutionIdentifier}
+    invalidate_models(written)
+    return {"created": len(created), "updated": len(revised), "deleted": len(deleted)}
@@ -0,0 +1,89 @@
+import time
+import tracemalloc
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from scoap3.articles.models import Article
+from scoap3.articles.statistics import country_codes, fractional_counts, load_incidence
+from scoap3.authors.models import Author
+
+
+def orm_shares(first_id, last_id):
+    """The shares computed over model instances, as reports used to."""
+    shares = defaultdict(float)
+    authors = defaultdict(list)
+    for author in Author.objects.filter(
+        article_id__gte=first_id, article_id__lte=last_id
+    ).prefetch_related("affiliation_set"):
+        affiliations = list(author.affiliation_set.all())
+        if affiliations:
+            authors[author.article_id_id].append(affiliations)
+    for article_id, article_authors in authors.items():
+        for affiliations in article_authors:
+            for affiliation in affiliations:
+                shares[article_id, affiliation.country_id] += (
+                    1 / len(article_authors) / len(affiliations)
+                )
+    return shares
+
+
+def vectorized_shares(first_id, last_id):
+    codes = country_codes()
+    articles, countries, shares = fractional_counts(
+        load_incidence(first_id, last_id, codes), len(codes)
+    )
+    return dict(zip(zip(articles.tolist(), codes[countries].tolist()), shares.tolist()))
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the vectorized country share computation with the per-object "
+        "ORM one, on the first articles. Nothing is written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--articles",
+            type=int,
+            default=10000,
+            help="Number of articles to compute the shares of.",
+        )
+
+    def handle(self, *args, articles=10000, **options):
+        bounds = Article.objects.order_by("pk")[:articles].aggregate(
+            first=Min("pk"), last=Max("pk")
+        )
+        if bounds["first"] is None:
+            self.stdout.write("No articles.")
+            return
+        self.stdout.write(f"Shares of articles {bounds['first']}-{bounds['last']}:")
+
+        results = {}
+        for name, function in (("ORM", orm_shares), ("NumPy", vectorized_shares)):
+            results[name], elapsed, peak = measure(
+                function, bounds["first"], bounds["last"]
+            )
+            self.stdout.write(
+                f"{name:>6}: {elapsed:8.3f} s, peak {peak / 2**20:8.1f} MiB, "
+                f"{len(results[name])} shares"
+            )
+
+        orm, vectorized = results["ORM"], results["NumPy"]
+        if orm.keys() != vectorized.keys() or any(
+            abs(orm[key] - vectorized[key]) > 1e-9 for key in orm
+        ):
+            self.stderr.write(self.style.ERROR("The results differ."))
+        else:
+            self.stdout.write(self.style.SUCCESS("The results match."))
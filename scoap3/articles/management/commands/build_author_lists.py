@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from scoap3.articles.models import Article
+from scoap3.authors.author_lists import rebuild_author_lists
+from scoap3.utils.iterables import chunked
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the packed author lists of all articles, or of the given ones. "
+        "Run once after deploying author lists; they are otherwise rebuilt as "
+        "articles change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("article_ids", nargs="*", type=int)
+
+    def handle(self, *args, article_ids=(), **options):
+        if not article_ids:
+            article_ids = Article.objects.values_list("pk", flat=True).iterator()
+        built = 0
+        for chunk in chunked(article_ids):
+            rebuild_author_lists(chunk)
+            built += len(chunk)
+        self.stdout.write(f"Built the author lists of {built} articles.")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from scoap3.articles.rollups import refresh_rollups
+from scoap3.articles.shares import recompute_shares
+from scoap3.articles.statistics import rebuild_shares
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the country shares of all articles, or of the given ones. "
+        "They are otherwise kept up to date as articles change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("article_ids", nargs="*", type=int)
+
+    def handle(self, *args, article_ids=(), **options):
+        if article_ids:
+            recompute_shares(article_ids)
+            self.stdout.write(f"Recomputed {len(article_ids)} articles.")
+        else:
+            self.stdout.write(f"Recomputed {rebuild_shares()} articles.")
+        # The country rollup is computed from the shares.
+        refresh_rollups(force=True)
@@ -0,0 +1,58 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from scoap3.articles.export import (
+    EXPORT_FORMATS,
+    export_articles,
+    export_queryset,
+    gzip_chunks,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the articles, or those published in a date range or journals, "
+        "as NDJSON, CSV or JSON-LD. Output files ending in .gz are gzipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-format", choices=list(EXPORT_FORMATS), default="ndjson"
+        )
+        parser.add_argument(
+            "--output",
+            "-o",
+            default="-",
+            help="File to write to, the standard output by default.",
+        )
+        parser.add_argument("--date-from", type=datetime.date.fromisoformat)
+        parser.add_argument("--date-to", type=datetime.date.fromisoformat)
+        parser.add_argument(
+            "--journal",
+            action="append",
+            dest="journals",
+            help="Journal title, repeat for several journals.",
+        )
+
+    def handle(self, *args, **options):
+        chunks = export_articles(
+            options["output_format"],
+            export_queryset(
+                date_from=options["date_from"],
+                date_to=options["date_to"],
+                journals=options["journals"],
+            ),
+        )
+        output = options["output"]
+        if output == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        if output.endswith(".gz"):
+            with open(output, "wb") as file:
+                file.writelines(gzip_chunks(chunks))
+        else:
+            with open(output, "w", encoding="utf-8", newline="") as file:
+                file.writelines(chunks)
+        self.stderr.write(f"Exported to {output}.")
@@ -0,0 +1,18 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from scoap3.articles.statistics import funder_shares
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the fractional article counts of each funder and country as CSV, "
+        "from the country shares."
+    )
+
+    def handle(self, *args, **options):
+        writer = csv.writer(self.stdout)
+        writer.writerow(["funder", "country", "articles"])
+        for funder, country, articles in funder_shares():
+            writer.writerow([funder, country, f"{articles:.4f}"])
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scoap3.articles import reindex
+from scoap3.articles.tasks import run_reindex
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the article search index into a new index and swap the alias "
+        "once it is loaded. Resumes the reindex in progress, if any."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Load the partitions in this process instead of Celery workers.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Abandon the reindex in progress and start from scratch.",
+        )
+
+    def handle(self, *args, sync=False, restart=False, **options):
+        article_reindex = reindex.current_reindex()
+        if article_reindex is not None and restart:
+            reindex.abandon_reindex(article_reindex)
+            article_reindex = None
+        if article_reindex is None:
+            article_reindex = reindex.start_reindex()
+            self.stdout.write(f"Started reindex into {article_reindex.index}.")
+        else:
+            self.stdout.write(f"Resuming reindex into {article_reindex.index}.")
+
+        partitions = reindex.pending_partitions(article_reindex)
+        if not sync:
+            run_reindex(article_reindex)
+            self.stdout.write(
+                f"Queued {len(partitions)} partitions, the alias is swapped once "
+                "they are loaded."
+            )
+            return
+
+        for number, partition in enumerate(partitions, 1):
+            reindex.load_partition(partition)
+            self.stdout.write(
+                f"Loaded partition {number}/{len(partitions)} "
+                f"(ids {partition.start_id}-{partition.end_id})."
+            )
+        try:
+            reindex.finish_reindex(article_reindex)
+        except reindex.ReindexError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(f"{article_reindex.index} is live."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from scoap3.articles.snapshots import write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the Parquet snapshot of the articles, rewriting only the "
+        "partitions that changed since the last one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true", help="Rewrite all the partitions."
+        )
+
+    def handle(self, *args, full=False, **options):
+        manifest = write_snapshot(full=full)
+        written = sum(
+            partition["written_at"] == manifest["generated_at"]
+            for partition in manifest["partitions"]
+        )
+        self.stdout.write(
+            f"Wrote {written} of {len(manifest['partitions'])} partitions."
+        )
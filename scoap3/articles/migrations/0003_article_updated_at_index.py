@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("articles", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["updated_at", "id"], name="articles_ar_updated_496f95_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("articles", "0003_article_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=255)),
+                ("object_id", models.BigIntegerField()),
+                ("article_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="articletombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="articles_ar_deleted_4a8121_idx"
+            ),
+        ),
+    ]
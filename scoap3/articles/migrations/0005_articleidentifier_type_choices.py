@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("articles", "0004_articletombstone"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="articleidentifier",
+            name="identifier_type",
+            field=models.CharField(
+                choices=[("DOI", "Doi"), ("arXiv", "Arxiv")], max_length=255
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-18 19:33
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_identifiers(apps, schema_editor):
+    """
+    Drop the identifiers repeated within an article, keeping the oldest row,
+    so that the constraint can be added.
+
+    Identifiers shared by different articles abort the migration instead:
+    these are duplicate articles, to be merged by hand, and deleting their
+    identifiers would leave them unmatchable.
+    """
+    ArticleIdentifier = apps.get_model("articles", "ArticleIdentifier")
+    duplicates = list(
+        ArticleIdentifier.objects.values("identifier_type", "identifier_value")
+        .annotate(
+            rows=Count("id"),
+            articles=ArrayAgg("article_id", distinct=True),
+            keep_id=Min("id"),
+        )
+        .filter(rows__gt=1)
+    )
+    shared = [d for d in duplicates if len(d["articles"]) > 1]
+    if shared:
+        raise RuntimeError(
+            "Identifiers shared by several articles, merge these first:\n"
+            + "\n".join(
+                f"{d['identifier_type']} {d['identifier_value']}: "
+                f"articles {', '.join(map(str, sorted(d['articles'])))}"
+                for d in shared
+            )
+        )
+    for duplicate in duplicates:
+        ArticleIdentifier.objects.filter(
+            identifier_type=duplicate["identifier_type"],
+            identifier_value=duplicate["identifier_value"],
+        ).exclude(id=duplicate["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("articles", "0005_articleidentifier_type_choices"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_identifiers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="articleidentifier",
+            constraint=models.UniqueConstraint(
+                fields=("identifier_type", "identifier_value"),
+                name="unique_article_identifier",
+            ),
+        ),
+    ]
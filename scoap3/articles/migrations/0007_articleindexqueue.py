@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("articles", "0006_unique_article_identifier"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleIndexQueue",
+            fields=[
+                (
+                    "article_id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("queued_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["queued_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="articleindexqueue",
+            index=models.Index(
+                fields=["queued_at"], name="articles_ar_queued__374401_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2 on 2026-10-18 19:48
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+import django.db.models.functions.text
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce({row}subtitle, '')), 'B')
+    || setweight(to_tsvector('english', coalesce({row}abstract, '')), 'C')
+"""
+
+CREATE_TRIGGER = f"""
+CREATE FUNCTION articles_article_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER articles_article_search_vector
+BEFORE INSERT OR UPDATE OF title, subtitle, abstract ON articles_article
+FOR EACH ROW EXECUTE FUNCTION articles_article_search_vector();
+
+UPDATE articles_article SET search_vector = {SEARCH_VECTOR.format(row="")};
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER articles_article_search_vector ON articles_article;
+DROP FUNCTION articles_article_search_vector();
+"""
+
+TRIGRAM_INDEX = django.contrib.postgres.indexes.GinIndex(
+    django.contrib.postgres.indexes.OpClass(
+        django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+    ),
+    name="article_title_trgm_idx",
+)
+
+
+def trigram_available(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+def add_trigram_index(apps, schema_editor):
+    # pg_trgm ships with the contrib package, which some PostgreSQL builds
+    # lack. The admin search then works without the index.
+    if not trigram_available(schema_editor):
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.add_index(apps.get_model("articles", "Article"), TRIGRAM_INDEX)
+
+
+def remove_trigram_index(apps, schema_editor):
+    schema_editor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX.name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("articles", "0008_articlereindex"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="article_search_vector_idx"
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="article", index=TRIGRAM_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_trigram_index, remove_trigram_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2 on 2026-10-18 19:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("misc", "0001_initial"),
+        ("articles", "0009_article_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleCountryShare",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("share", models.FloatField()),
+                ("year", models.IntegerField(blank=True, null=True)),
+                ("journal_title", models.CharField(blank=True, max_length=255)),
+                (
+                    "article_id",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="articles.article",
+                    ),
+                ),
+                (
+                    "country",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="misc.country"
+                    ),
+                ),
+                (
+                    "publisher",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="misc.publisher",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="articlecountryshare",
+            index=models.Index(
+                fields=["year", "country"], name="articles_ar_year_60d50c_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="articlecountryshare",
+            constraint=models.UniqueConstraint(
+                fields=("article_id", "country"), name="unique_article_country_share"
+            ),
+        ),
+    ]
@@ -0,0 +1,144 @@
+# Generated by Django 4.2 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+# The first publication info of each article.
+FIRST_JOURNAL = """
+SELECT DISTINCT ON (article_id_id) article_id_id, journal_title, publisher_id
+FROM misc_publicationinfo
+ORDER BY article_id_id, id
+"""
+
+# Each view has a unique index over its dimensions, which concurrent
+# refreshes require.
+CREATE_VIEWS = f"""
+CREATE MATERIALIZED VIEW articles_publicationrollup AS
+SELECT row_number() OVER (ORDER BY year, journal, publisher) AS id, *
+FROM (
+    SELECT
+        extract(year FROM article.publication_date)::integer AS year,
+        coalesce(info.journal_title, '') AS journal,
+        coalesce(publisher.name, '') AS publisher,
+        count(*)::integer AS articles
+    FROM articles_article article
+    LEFT JOIN ({FIRST_JOURNAL}) info ON info.article_id_id = article.id
+    LEFT JOIN misc_publisher publisher ON publisher.id = info.publisher_id
+    GROUP BY 1, 2, 3
+) rollup;
+CREATE UNIQUE INDEX articles_publicationrollup_key
+ON articles_publicationrollup (year, journal, publisher);
+
+CREATE MATERIALIZED VIEW articles_arxivcategoryrollup AS
+SELECT row_number() OVER (ORDER BY year, category) AS id, *
+FROM (
+    SELECT
+        extract(year FROM article.publication_date)::integer AS year,
+        category.category,
+        count(DISTINCT article.id)::integer AS articles
+    FROM misc_articlearxivcategory category
+    JOIN articles_article article ON article.id = category.article_id_id
+    GROUP BY 1, 2
+) rollup;
+CREATE UNIQUE INDEX articles_arxivcategoryrollup_key
+ON articles_arxivcategoryrollup (year, category);
+
+CREATE MATERIALIZED VIEW articles_countryrollup AS
+SELECT row_number() OVER (ORDER BY year, country, journal, publisher) AS id, *
+FROM (
+    SELECT
+        coalesce(share.year, 0) AS year,
+        share.country_id AS country,
+        share.journal_title AS journal,
+        coalesce(publisher.name, '') AS publisher,
+        sum(share.share) AS articles,
+        count(*)::integer AS article_count
+    FROM articles_articlecountryshare share
+    LEFT JOIN misc_publisher publisher ON publisher.id = share.publisher_id
+    GROUP BY 1, 2, 3, 4
+) rollup;
+CREATE UNIQUE INDEX articles_countryrollup_key
+ON articles_countryrollup (year, country, journal, publisher);
+"""
+
+DROP_VIEWS = """
+DROP MATERIALIZED VIEW articles_publicationrollup;
+DROP MATERIALIZED VIEW articles_arxivcategoryrollup;
+DROP MATERIALIZED VIEW articles_countryrollup;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("articles", "0010_articlecountryshare"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_VIEWS, DROP_VIEWS),
+        migrations.CreateModel(
+            name="ArxivCategoryRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.IntegerField()),
+                ("category", models.CharField(max_length=255)),
+                ("articles", models.IntegerField()),
+            ],
+            options={
+                "ordering": ["year", "category"],
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="CountryRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.IntegerField()),
+                ("country", models.CharField(max_length=2)),
+                ("journal", models.CharField(max_length=255)),
+                ("publisher", models.CharField(max_length=255)),
+                ("articles", models.FloatField()),
+                ("article_count", models.IntegerField()),
+            ],
+            options={
+                "ordering": ["year", "country", "journal", "publisher"],
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="PublicationRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.IntegerField()),
+                ("journal", models.CharField(max_length=255)),
+                ("publisher", models.CharField(max_length=255)),
+                ("articles", models.IntegerField()),
+            ],
+            options={
+                "ordering": ["year", "journal", "publisher"],
+                "managed": False,
+            },
+        ),
+    ]
@@ -1,6 +1,16 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 
-from scoap3.authors.models import AuthorIdentifierType
+#: Text search configuration of ``Article.search_vector``.
+SEARCH_CONFIG = "english"
+
+
+class ArticleManager(models.Manager):
+    def get_queryset(self):
+        # Only ever read by the database itself.
+        return super().get_queryset().defer("search_vector")
 
 
 class Article(models.Model):
@@ -23,9 +33,29 @@ class Article(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Title (weight A), subtitle (B) and abstract (C), kept up to date by a
+    # trigger, see migration 0009.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ArticleManager()
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["updated_at", "id"]),
+            GinIndex(fields=["search_vector"], name="article_search_vector_idx"),
+            # Serves the ``icontains`` lookups of the admin search. Only
+            # created where the pg_trgm extension is available.
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="article_title_trgm_idx",
+            ),
+        ]
+
+
+class ArticleIdentifierType(models.TextChoices):
+    DOI = ("DOI",)
+    ARXIV = ("arXiv",)
 
 
 class ArticleIdentifier(models.Model):
@@ -35,7 +65,7 @@ class ArticleIdentifier(models.Model):
     )
     identifier_type = models.CharField(
         max_length=255,
-        choices=AuthorIdentifierType.choices,
+        choices=ArticleIdentifierType.choices,
     )
     identifier_value = models.CharField(
         max_length=255,
@@ -46,3 +76,161 @@ class ArticleIdentifier(models.Model):
         indexes = [
             models.Index(fields=["article_id", "identifier_type", "identifier_value"])
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["identifier_type", "identifier_value"],
+                name="unique_article_identifier",
+            )
+        ]
+
+
+class ArticleTombstone(models.Model):
+    """Record of a deleted article, or of a deleted row belonging to one."""
+
+    model = models.CharField(max_length=255)
+    object_id = models.BigIntegerField()
+    article_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["deleted_at", "id"])]
+
+
+class ArticleIndexQueue(models.Model):
+    """
+    Article whose search document is out of date.
+
+    Rows are written in the same transaction as the change, so an update
+    cannot reach the database without reaching the queue, and an article
+    touched many times is queued once.
+    """
+
+    article_id = models.BigIntegerField(primary_key=True)
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["queued_at"]
+        indexes = [models.Index(fields=["queued_at"])]
+
+
+class ArticleReindexStatus(models.TextChoices):
+    RUNNING = ("running",)
+    DONE = ("done",)
+    FAILED = ("failed",)
+
+
+class ArticleReindex(models.Model):
+    """Full rebuild of the article search index into a new, versioned index."""
+
+    index = models.CharField(max_length=255, unique=True)
+    status = models.CharField(
+        max_length=255,
+        choices=ArticleReindexStatus.choices,
+        default=ArticleReindexStatus.RUNNING,
+    )
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+
+
+class ArticleReindexPartition(models.Model):
+    """
+    Range of article ids loaded by one worker of a reindex.
+
+    ``next_id`` is the checkpoint: the articles before it are indexed.
+    """
+
+    reindex_id = models.ForeignKey(
+        "articles.ArticleReindex",
+        on_delete=models.CASCADE,
+    )
+    start_id = models.BigIntegerField()
+    end_id = models.BigIntegerField()
+    next_id = models.BigIntegerField()
+    indexed = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["id"]
+
+    @property
+    def done(self):
+        return self.next_id > self.end_id
+
+
+class ArticleCountryShare(models.Model):
+    """
+    Fraction of an article credited to a country, see ``scoap3.articles.shares``.
+
+    The year, journal and publisher are copied from the article so that
+    reports group the shares without joins.
+    """
+
+    article_id = models.ForeignKey(
+        "articles.Article",
+        on_delete=models.CASCADE,
+    )
+    country = models.ForeignKey("misc.Country", on_delete=models.CASCADE)
+    share = models.FloatField()
+    year = models.IntegerField(null=True, blank=True)
+    journal_title = models.CharField(max_length=255, blank=True)
+    publisher = models.ForeignKey(
+        "misc.Publisher", on_delete=models.SET_NULL, null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["article_id", "country"], name="unique_article_country_share"
+            )
+        ]
+        indexes = [models.Index(fields=["year", "country"])]
+
+
+class PublicationRollup(models.Model):
+    """
+    Articles by year, journal and publisher.
+
+    This and the other rollups are materialized views, see migration 0011
+    and ``scoap3.articles.rollups``. Articles count for their first journal.
+    """
+
+    year = models.IntegerField()
+    journal = models.CharField(max_length=255)
+    publisher = models.CharField(max_length=255)
+    articles = models.IntegerField()
+
+    class Meta:
+        managed = False
+        ordering = ["year", "journal", "publisher"]
+
+
+class ArxivCategoryRollup(models.Model):
+    """Articles by year and arXiv category."""
+
+    year = models.IntegerField()
+    category = models.CharField(max_length=255)
+    articles = models.IntegerField()
+
+    class Meta:
+        managed = False
+        ordering = ["year", "category"]
+
+
+class CountryRollup(models.Model):
+    """Fractional and whole article counts by year, country, journal and publisher."""
+
+    year = models.IntegerField()
+    country = models.CharField(max_length=2)
+    journal = models.CharField(max_length=255)
+    publisher = models.CharField(max_length=255)
+    articles = models.FloatField()
+    article_count = models.IntegerField()
+
+    class Meta:
+        managed = False
+        ordering = ["year", "country", "journal", "publisher"]
@@ -0,0 +1,462 @@
+"""
+OAI-PMH 2.0 data provider over articles.
+
+Lists are keyset-paginated on ``(updated_at, id)``. The resumption token is
+the encoded request arguments plus the keys of the last record sent, so no
+harvest state is kept on the server. Each page is rendered record by record
+from a server-side cursor, so memory use is bounded by the page size.
+"""
+import base64
+import binascii
+import datetime
+import json
+import xml.etree.ElementTree as ET
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Prefetch
+from django.utils import timezone
+from django.utils.text import slugify
+
+from scoap3.articles.models import Article, ArticleIdentifier
+from scoap3.authors.models import Author
+from scoap3.misc.models import ArticleArxivCategory, PublicationInfo
+from scoap3.utils.pagination import keyset_filter
+
+OAI_NAMESPACE = "http://www.openarchives.org/OAI/2.0/"
+OAI_DC_NAMESPACE = "http://www.openarchives.org/OAI/2.0/oai_dc/"
+DC_NAMESPACE = "http://purl.org/dc/elements/1.1/"
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+ET.register_namespace("oai_dc", OAI_DC_NAMESPACE)
+ET.register_namespace("dc", DC_NAMESPACE)
+ET.register_namespace("xsi", XSI_NAMESPACE)
+
+METADATA_FORMATS = {
+    "oai_dc": (
+        "http://www.openarchives.org/OAI/2.0/oai_dc.xsd",
+        OAI_DC_NAMESPACE,
+    ),
+}
+
+GRANULARITY = "%Y-%m-%dT%H:%M:%SZ"
+KEYSET = ("updated_at", "id")
+#: Rows fetched per round trip from the server-side cursor.
+CHUNK_SIZE = 100
+
+#: Arguments accepted by each verb, as (required, optional, exclusive).
+VERBS = {
+    "Identify": (set(), set(), None),
+    "ListMetadataFormats": (set(), {"identifier"}, None),
+    "ListSets": (set(), set(), "resumptionToken"),
+    "ListIdentifiers": (
+        {"metadataPrefix"},
+        {"from", "until", "set"},
+        "resumptionToken",
+    ),
+    "ListRecords": ({"metadataPrefix"}, {"from", "until", "set"}, "resumptionToken"),
+    "GetRecord": ({"identifier", "metadataPrefix"}, set(), None),
+}
+
+#: Set kinds, mapped to the function listing their distinct values.
+SET_KINDS = {
+    "journal": lambda: PublicationInfo.objects.values_list("journal_title", flat=True),
+    "publisher": lambda: PublicationInfo.objects.values_list(
+        "publisher__name", flat=True
+    ),
+    "arxiv": lambda: ArticleArxivCategory.objects.values_list("category", flat=True),
+}
+
+
+class OAIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def format_datestamp(value):
+    return value.astimezone(datetime.timezone.utc).strftime(GRANULARITY)
+
+
+def parse_datestamp(value, end_of_range=False):
+    for fmt, step in (
+        (GRANULARITY, datetime.timedelta(seconds=1)),
+        ("%Y-%m-%d", datetime.timedelta(days=1)),
+    ):
+        try:
+            parsed = datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return (parsed + step, len(value)) if end_of_range else (parsed, len(value))
+    raise OAIError("badArgument", f"Invalid date: {value}")
+
+
+def encode_token(arguments, last):
+    payload = dict(arguments, last=[last.updated_at.isoformat(), last.pk])
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_token(token):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        last = payload.pop("last")
+        if not isinstance(last, list) or len(last) != len(KEYSET):
+            raise ValueError
+        updated_at, pk = last
+        # Checked here, the keyset filter would fail on them mid-response.
+        if type(pk) is not int:
+            raise TypeError
+        updated_at = datetime.datetime.fromisoformat(updated_at)
+        if updated_at.tzinfo is None:
+            raise ValueError
+    except (binascii.Error, ValueError, AttributeError, KeyError, TypeError):
+        raise OAIError("badResumptionToken", "The resumption token is invalid.")
+    return payload, [updated_at, pk]
+
+
+def oai_identifier(article_id):
+    return f"oai:{settings.OAI_PMH_REPOSITORY_IDENTIFIER}:{article_id}"
+
+
+def parse_oai_identifier(identifier):
+    prefix = f"oai:{settings.OAI_PMH_REPOSITORY_IDENTIFIER}:"
+    article_id = identifier.removeprefix(prefix)
+    if identifier.startswith(prefix) and article_id.isdigit():
+        return int(article_id)
+    raise OAIError("idDoesNotExist", f"Unknown identifier: {identifier}")
+
+
+def set_spec(kind, value):
+    if kind == "arxiv":
+        return f"{kind}:{value}"
+    return f"{kind}:{slugify(value)}"
+
+
+def filter_set(queryset, spec):
+    kind, _, value = spec.partition(":")
+    if kind not in SET_KINDS or not value:
+        raise OAIError("badArgument", f"Unknown set: {spec}")
+    if kind == "arxiv":
+        return queryset.filter(
+            Exists(
+                ArticleArxivCategory.objects.filter(
+                    article_id=OuterRef("pk"), category=value
+                )
+            )
+        )
+    # Journal and publisher names are few; resolve the slug in Python.
+    names = {name for name in SET_KINDS[kind]().distinct() if slugify(name) == value}
+    field = "journal_title__in" if kind == "journal" else "publisher__name__in"
+    return queryset.filter(
+        Exists(
+            PublicationInfo.objects.filter(article_id=OuterRef("pk"), **{field: names})
+        )
+    )
+
+
+def record_queryset(with_metadata):
+    queryset = Article.objects.all()
+    lookups = [
+        Prefetch(
+            "publicationinfo_set",
+            queryset=PublicationInfo.objects.select_related("publisher"),
+        ),
+        "articlearxivcategory_set",
+    ]
+    if with_metadata:
+        lookups += [
+            Prefetch(
+                "author_set",
+                queryset=Author.objects.order_by("author_order", "id").only(
+                    "article_id", "first_name", "last_name"
+                ),
+            ),
+            Prefetch(
+                "articleidentifier_set",
+                queryset=ArticleIdentifier.objects.only(
+                    "article_id", "identifier_value"
+                ),
+            ),
+            "related_licenses",
+        ]
+    else:
+        queryset = queryset.only("id", "updated_at")
+    return queryset.prefetch_related(*lookups)
+
+
+def article_set_specs(article):
+    specs = []
+    for info in article.publicationinfo_set.all():
+        specs.append(set_spec("journal", info.journal_title))
+        specs.append(set_spec("publisher", info.publisher.name))
+    for category in article.articlearxivcategory_set.all():
+        specs.append(set_spec("arxiv", category.category))
+    return list(dict.fromkeys(specs))
+
+
+def build_header(article):
+    header = ET.Element("header")
+    ET.SubElement(header, "identifier").text = oai_identifier(article.pk)
+    ET.SubElement(header, "datestamp").text = format_datestamp(article.updated_at)
+    for spec in article_set_specs(article):
+        ET.SubElement(header, "setSpec").text = spec
+    return header
+
+
+def build_oai_dc(article):
+    dc = ET.Element(
+        f"{{{OAI_DC_NAMESPACE}}}dc",
+        {
+            f"{{{XSI_NAMESPACE}}}schemaLocation": (
+                f"{OAI_DC_NAMESPACE} {METADATA_FORMATS['oai_dc'][0]}"
+            )
+        },
+    )
+
+    def add(tag, text):
+        if text:
+            ET.SubElement(dc, f"{{{DC_NAMESPACE}}}{tag}").text = str(text)
+
+    add("title", article.title)
+    for author in article.author_set.all():
+        add("creator", f"{author.last_name}, {author.first_name}")
+    add("description", article.abstract)
+    add("date", article.publication_date)
+    add("type", "article")
+    for identifier in article.articleidentifier_set.all():
+        add("identifier", identifier.identifier_value)
+    for info in article.publicationinfo_set.all():
+        add("source", info.journal_title)
+        add("publisher", info.publisher.name)
+    for category in article.articlearxivcategory_set.all():
+        add("subject", category.category)
+    for license in article.related_licenses.all():
+        add("rights", license.url or license.name)
+    return dc
+
+
+def render_record(article, with_metadata):
+    if not with_metadata:
+        return ET.tostring(build_header(article), encoding="unicode")
+    record = ET.Element("record")
+    record.append(build_header(article))
+    ET.SubElement(record, "metadata").append(build_oai_dc(article))
+    return ET.tostring(record, encoding="unicode")
+
+
+def envelope(verb, arguments, base_url):
+    attributes = "".join(
+        f' {key}="{escape_attribute(value)}"' for key, value in arguments.items()
+    )
+    if verb in VERBS:
+        attributes = f' verb="{verb}"' + attributes
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<OAI-PMH xmlns="{OAI_NAMESPACE}" xmlns:xsi="{XSI_NAMESPACE}" '
+        f'xsi:schemaLocation="{OAI_NAMESPACE} '
+        'http://www.openarchives.org/OAI/2.0/OAI-PMH.xsd">'
+        f"<responseDate>{format_datestamp(timezone.now())}</responseDate>"
+        f"<request{attributes}>{escape_text(base_url)}</request>",
+        "</OAI-PMH>\n",
+    )
+
+
+def escape_text(value):
+    return str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value):
+    return escape_text(value).replace('"', "&quot;")
+
+
+def render_error(error, arguments, base_url):
+    if error.code in ("badVerb", "badArgument"):
+        # The request element must not echo arguments that were not valid.
+        verb, echoed = None, {}
+    else:
+        verb = arguments.get("verb")
+        echoed = {key: value for key, value in arguments.items() if key != "verb"}
+    head, tail = envelope(verb, echoed, base_url)
+    return (
+        f'{head}<error code="{error.code}">{escape_text(error.message)}</error>{tail}'
+    )
+
+
+class OAIRequest:
+    """A validated OAI-PMH request, rendered as an iterable of XML chunks."""
+
+    def __init__(self, params, base_url):
+        self.params = params
+        self.base_url = base_url
+        self.arguments = {key: params[key] for key in params}
+        self.page_size = settings.OAI_PMH_PAGE_SIZE
+
+    def validate(self):
+        for key in self.params:
+            if len(self.params.getlist(key)) > 1:
+                raise OAIError("badArgument", f"Repeated argument: {key}")
+        verb = self.params.get("verb")
+        if verb not in VERBS:
+            raise OAIError("badVerb", "Illegal or missing verb.")
+        required, optional, exclusive = VERBS[verb]
+        given = set(self.arguments) - {"verb"}
+        if exclusive and exclusive in given:
+            if given != {exclusive}:
+                raise OAIError("badArgument", f"{exclusive} is an exclusive argument.")
+            return verb
+        if not required <= given:
+            missing = ", ".join(sorted(required - given))
+            raise OAIError("badArgument", f"Missing argument: {missing}")
+        if not given <= required | optional:
+            illegal = ", ".join(sorted(given - required - optional))
+            raise OAIError("badArgument", f"Illegal argument: {illegal}")
+        prefix = self.arguments.get("metadataPrefix")
+        if prefix is not None and prefix not in METADATA_FORMATS:
+            raise OAIError("cannotDisseminateFormat", f"Unknown format: {prefix}")
+        return verb
+
+    def render(self):
+        """Return the response body, raising ``OAIError`` before any output."""
+        verb = self.validate()
+        body = getattr(self, f"render_{verb}")()
+        head, tail = envelope(verb, self.arguments_echo(), self.base_url)
+
+        def stream():
+            yield head
+            yield from body
+            yield tail
+
+        return stream()
+
+    def arguments_echo(self):
+        return {key: value for key, value in self.arguments.items() if key != "verb"}
+
+    def render_Identify(self):
+        earliest = (
+            Article.objects.order_by("updated_at")
+            .values_list("updated_at", flat=True)
+            .first()
+            or timezone.now()
+        )
+        return [
+            "<Identify>"
+            f"<repositoryName>{escape_text(settings.OAI_PMH_REPOSITORY_NAME)}"
+            "</repositoryName>"
+            f"<baseURL>{escape_text(self.base_url)}</baseURL>"
+            "<protocolVersion>2.0</protocolVersion>",
+            *(
+                f"<adminEmail>{escape_text(email)}</adminEmail>"
+                for _, email in settings.ADMINS
+            ),
+            f"<earliestDatestamp>{format_datestamp(earliest)}</earliestDatestamp>"
+            "<deletedRecord>no</deletedRecord>"
+            "<granularity>YYYY-MM-DDThh:mm:ssZ</granularity>"
+            "</Identify>",
+        ]
+
+    def render_ListMetadataFormats(self):
+        if "identifier" in self.arguments:
+            article_id = parse_oai_identifier(self.arguments["identifier"])
+            if not Article.objects.filter(pk=article_id).exists():
+                raise OAIError("idDoesNotExist", "Unknown identifier.")
+        formats = "".join(
+            "<metadataFormat>"
+            f"<metadataPrefix>{prefix}</metadataPrefix>"
+            f"<schema>{schema}</schema>"
+            f"<metadataNamespace>{namespace}</metadataNamespace>"
+            "</metadataFormat>"
+            for prefix, (schema, namespace) in METADATA_FORMATS.items()
+        )
+        return [f"<ListMetadataFormats>{formats}</ListMetadataFormats>"]
+
+    def render_ListSets(self):
+        if "resumptionToken" in self.arguments:
+            raise OAIError("badResumptionToken", "ListSets is not paginated.")
+        chunks = ["<ListSets>"]
+        for kind, values in SET_KINDS.items():
+            seen = set()
+            for value in values().order_by().distinct():
+                spec = set_spec(kind, value)
+                if spec in seen:
+                    continue
+                seen.add(spec)
+                chunks.append(
+                    f"<set><setSpec>{escape_text(spec)}</setSpec>"
+                    f"<setName>{escape_text(value)}</setName></set>"
+                )
+        chunks.append("</ListSets>")
+        return chunks
+
+    def render_GetRecord(self):
+        article_id = parse_oai_identifier(self.arguments["identifier"])
+        article = record_queryset(with_metadata=True).filter(pk=article_id).first()
+        if article is None:
+            raise OAIError("idDoesNotExist", "Unknown identifier.")
+        return ["<GetRecord>", render_record(article, True), "</GetRecord>"]
+
+    def render_ListIdentifiers(self):
+        return self.render_list("ListIdentifiers", with_metadata=False)
+
+    def render_ListRecords(self):
+        return self.render_list("ListRecords", with_metadata=True)
+
+    def list_arguments(self):
+        if "resumptionToken" in self.arguments:
+            return decode_token(self.arguments["resumptionToken"])
+        arguments = {
+            key: self.arguments[key]
+            for key in ("metadataPrefix", "from", "until", "set")
+            if key in self.arguments
+        }
+        return arguments, None
+
+    def list_queryset(self, arguments, last, with_metadata):
+        queryset = record_queryset(with_metadata)
+        lengths = set()
+        if "from" in arguments:
+            start, length = parse_datestamp(arguments["from"])
+            queryset = queryset.filter(updated_at__gte=start)
+            lengths.add(length)
+        if "until" in arguments:
+            end, length = parse_datestamp(arguments["until"], end_of_range=True)
+            queryset = queryset.filter(updated_at__lt=end)
+            lengths.add(length)
+        if len(lengths) > 1:
+            raise OAIError("badArgument", "from and until granularities differ.")
+        if "set" in arguments:
+            queryset = filter_set(queryset, arguments["set"])
+        if last is not None:
+            queryset = queryset.filter(keyset_filter(KEYSET, last))
+        return queryset.order_by(*KEYSET)[: self.page_size + 1]
+
+    def render_list(self, verb, with_metadata):
+        arguments, last = self.list_arguments()
+        if arguments.get("metadataPrefix") not in METADATA_FORMATS:
+            raise OAIError("badResumptionToken", "The resumption token is invalid.")
+        rows = self.list_queryset(arguments, last, with_metadata).iterator(
+            chunk_size=CHUNK_SIZE
+        )
+        first = next(rows, None)
+        if first is None:
+            raise OAIError("noRecordsMatch", "No records match the request.")
+        return self.stream_list(verb, arguments, first, rows, with_metadata, last)
+
+    def stream_list(self, verb, arguments, first, rows, with_metadata, last):
+        # ``rows`` holds up to one record more than a page; its presence means
+        # that another page follows.
+        yield f"<{verb}>"
+        yield render_record(first, with_metadata)
+        previous, sent = first, 1
+        for article in rows:
+            if sent == self.page_size:
+                token = encode_token(arguments, previous)
+                yield f"<resumptionToken>{token}</resumptionToken>"
+                break
+            yield render_record(article, with_metadata)
+            previous, sent = article, sent + 1
+        else:
+            if last is not None:
+                # The last page of a resumed list carries an empty token.
+                yield "<resumptionToken/>"
+        yield f"</{verb}>"
@@ -0,0 +1,175 @@
+"""
+Zero-downtime rebuild of the article search index.
+
+A reindex loads a new index, named after the alias with a timestamp, while
+searches keep being served by the current one:
+
+1. ``start_reindex`` creates the index with refresh and replicas disabled
+   and splits the article ids into ranges of ``SEARCH_REINDEX_PARTITION_SIZE``.
+2. ``load_partition`` indexes one range with bulk requests, checkpointing
+   after each of them. Partitions are loaded in parallel by Celery workers,
+   and an interrupted reindex resumes from the checkpoints.
+3. ``finish_reindex`` restores the index settings, checks the document
+   count against the database and atomically moves the alias to the index.
+
+Changes made meanwhile are written to both indexes by ``sync_articles``.
+Documents carry their ``updated_at`` as external version, so a partition
+cannot overwrite a more recent copy of a document.
+"""
+from django.conf import settings
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from scoap3.articles.documents import article_documents, article_index_name, distinct
+from scoap3.articles.models import (
+    Article,
+    ArticleIndexQueue,
+    ArticleReindex,
+    ArticleReindexPartition,
+    ArticleReindexStatus,
+    ArticleTombstone,
+)
+from scoap3.articles.search import (
+    bulk,
+    create_index,
+    get_client,
+    index_actions,
+    live_indexes,
+)
+
+#: Index settings while loading; replicas are added once the load is over.
+LOAD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+
+class ReindexError(Exception):
+    pass
+
+
+def current_reindex():
+    """The reindex in progress, if any."""
+    return ArticleReindex.objects.filter(status=ArticleReindexStatus.RUNNING).first()
+
+
+def start_reindex():
+    """Create the new index and the partitions to load into it."""
+    if current_reindex() is not None:
+        raise ReindexError("A reindex is already running.")
+    name = f"{article_index_name()}-{timezone.now():%Y%m%d%H%M%S}"
+    create_index(name, **LOAD_SETTINGS)
+    reindex = ArticleReindex.objects.create(index=name)
+
+    bounds = Article.objects.aggregate(first=Min("id"), last=Max("id"))
+    size = settings.SEARCH_REINDEX_PARTITION_SIZE
+    if bounds["first"] is not None:
+        ArticleReindexPartition.objects.bulk_create(
+            ArticleReindexPartition(
+                reindex_id=reindex,
+                start_id=start,
+                end_id=min(start + size - 1, bounds["last"]),
+                next_id=start,
+            )
+            for start in range(bounds["first"], bounds["last"] + 1, size)
+        )
+    return reindex
+
+
+def pending_partitions(reindex):
+    partitions = ArticleReindexPartition.objects.filter(reindex_id=reindex)
+    return [partition for partition in partitions if not partition.done]
+
+
+def load_partition(partition):
+    """Index the rest of ``partition``, one checkpointed bulk request at a time."""
+    index = partition.reindex_id.index
+    batch_size = settings.SEARCH_INDEX_BATCH_SIZE
+    while not partition.done:
+        articles = Article.objects.filter(
+            pk__gte=partition.next_id, pk__lte=partition.end_id
+        ).order_by("pk")[:batch_size]
+        documents = list(article_documents(articles, chunk_size=batch_size))
+        bulk(index_actions(documents, [index]), chunk_size=batch_size)
+        if len(documents) < batch_size:
+            partition.next_id = partition.end_id + 1
+        else:
+            partition.next_id = documents[-1]["id"] + 1
+        partition.indexed += len(documents)
+        partition.save(update_fields=["next_id", "indexed"])
+
+
+def finish_reindex(reindex):
+    """
+    Validate the loaded index and make it live.
+
+    The document count must match the number of articles, give or take the
+    changes still waiting in the index queue. On mismatch the reindex is
+    marked as failed and the alias left alone.
+    """
+    if pending_partitions(reindex):
+        raise ReindexError("Some partitions are not loaded yet.")
+    client = get_client()
+
+    # Articles deleted while their partition was loading.
+    deleted = ArticleTombstone.objects.filter(
+        model=Article._meta.label_lower, deleted_at__gte=reindex.started_at
+    ).values_list("article_id", flat=True)
+    bulk(
+        {"_op_type": "delete", "_index": reindex.index, "_id": article_id}
+        for article_id in distinct(deleted)
+    )
+
+    client.indices.put_settings(
+        index=reindex.index,
+        body={
+            "refresh_interval": None,
+            "number_of_replicas": settings.OPENSEARCH_NUMBER_OF_REPLICAS,
+        },
+    )
+    client.indices.refresh(index=reindex.index)
+    indexed = client.count(index=reindex.index)["count"]
+    expected = Article.objects.count()
+    if abs(indexed - expected) > ArticleIndexQueue.objects.count():
+        reindex.status = ArticleReindexStatus.FAILED
+        reindex.error = f"Indexed {indexed} documents for {expected} articles."
+        reindex.save(update_fields=["status", "error"])
+        raise ReindexError(reindex.error)
+
+    swap_alias(reindex.index)
+    reindex.status = ArticleReindexStatus.DONE
+    reindex.finished_at = timezone.now()
+    reindex.save(update_fields=["status", "finished_at"])
+
+
+def swap_alias(index):
+    """
+    Point the alias at ``index`` only, in one atomic request.
+
+    The index the alias pointed at is kept for a rollback, older ones are
+    deleted.
+    """
+    client = get_client()
+    alias = article_index_name()
+    previous = live_indexes()
+    actions = [{"add": {"index": index, "alias": alias}}]
+    if alias in previous:
+        # A concrete index named like the alias, from before versioned indexes.
+        actions.insert(0, {"remove_index": {"index": alias}})
+    else:
+        actions += [{"remove": {"index": i, "alias": alias}} for i in previous]
+    client.indices.update_aliases(body={"actions": actions})
+
+    older = set(client.indices.get(index=f"{alias}-*")) - previous - {index}
+    building = set(
+        ArticleReindex.objects.filter(status=ArticleReindexStatus.RUNNING).values_list(
+            "index", flat=True
+        )
+    )
+    for name in older - building:
+        client.indices.delete(index=name)
+
+
+def abandon_reindex(reindex, error="Abandoned."):
+    """Mark ``reindex`` as failed and drop its index."""
+    reindex.status = ArticleReindexStatus.FAILED
+    reindex.error = error
+    reindex.save(update_fields=["status", "error"])
+    get_client().indices.delete(index=reindex.index, ignore_unavailable=True)
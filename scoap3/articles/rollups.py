@@ -0,0 +1,97 @@
+"""
+Dashboard rollups: article counts precomputed by year, journal, publisher,
+arXiv category and country.
+
+The rollups are PostgreSQL materialized views, created by migration 0011.
+``refresh_rollups`` refreshes them concurrently, so that the dashboards keep
+reading the previous version meanwhile, and only when articles, their
+country shares or the publishers and countries they name changed since the
+last refresh.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from scoap3.articles.models import (
+    Article,
+    ArticleCountryShare,
+    ArticleTombstone,
+    ArxivCategoryRollup,
+    CountryRollup,
+    PublicationRollup,
+)
+from scoap3.misc.models import Country, Publisher
+from scoap3.utils.cache import get_versions, model_scope
+
+#: The rollups, with the counts summed over the dimensions grouped away.
+ROLLUPS = {
+    PublicationRollup: ["articles"],
+    ArxivCategoryRollup: ["articles"],
+    CountryRollup: ["articles", "article_count"],
+}
+
+#: Cache key of the ``(watermark, refreshed at)`` of the last refresh.
+LAST_REFRESH = "articles:rollups:last-refresh"
+
+
+def watermark():
+    """Changes the rollups are computed from; moves on with every change to them."""
+    return (
+        Article.objects.aggregate(Max("updated_at"))["updated_at__max"],
+        ArticleTombstone.objects.aggregate(Max("id"))["id__max"],
+        # Shares are replaced, never updated in place.
+        ArticleCountryShare.objects.aggregate(Max("id"))["id__max"],
+        *get_versions([model_scope(Publisher), model_scope(Country)]),
+    )
+
+
+def last_refreshed():
+    """When the rollups were last refreshed, if known."""
+    last_refresh = cache.get(LAST_REFRESH)
+    return last_refresh[1] if last_refresh else None
+
+
+def refresh_rollups(force=False):
+    """Refresh the rollups if their sources changed, returns whether they were."""
+    current = watermark()
+    last_refresh = cache.get(LAST_REFRESH)
+    if not force and last_refresh and last_refresh[0] == current:
+        return False
+    with connection.cursor() as cursor:
+        for model in ROLLUPS:
+            cursor.execute(
+                f"REFRESH MATERIALIZED VIEW CONCURRENTLY {model._meta.db_table}"
+            )
+    cache.set(LAST_REFRESH, (current, timezone.now()), timeout=None)
+    return True
+
+
+def aggregate_rollup(model, group_by, filters=None, year_from=None, year_to=None):
+    """
+    Sum the counts of the ``model`` rollup by the ``group_by`` dimensions.
+
+    ``filters`` maps dimensions to the values to keep.
+    """
+    queryset = model.objects.all()
+    for name, values in (filters or {}).items():
+        if values:
+            queryset = queryset.filter(**{f"{name}__in": values})
+    if year_from is not None:
+        queryset = queryset.filter(year__gte=year_from)
+    if year_to is not None:
+        queryset = queryset.filter(year__lte=year_to)
+    # Annotations cannot be named after the fields they sum.
+    measures = {f"total_{name}": name for name in ROLLUPS[model]}
+    rows = (
+        queryset.values(*group_by)
+        .annotate(**{total: Sum(name) for total, name in measures.items()})
+        .order_by(*group_by)
+    )
+    return [
+        {
+            **{name: row[name] for name in group_by},
+            **{name: row[total] for total, name in measures.items()},
+        }
+        for row in rows
+    ]
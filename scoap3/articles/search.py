@@ -0,0 +1,227 @@
+"""
+OpenSearch access: the client, index maintenance and the article search.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from opensearchpy import OpenSearch, helpers
+from opensearchpy.exceptions import NotFoundError, OpenSearchException
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from scoap3.articles.documents import (
+    ARTICLE_INDEX,
+    article_documents,
+    article_index_name,
+)
+from scoap3.articles.models import Article, ArticleReindex, ArticleReindexStatus
+
+#: Facets of the search response, as (name, indexed field, number of buckets).
+FACETS = (
+    ("country", "countries", 250),
+    ("journal", "journals.raw", 50),
+    ("publisher", "publishers", 50),
+    ("year", "year", 100),
+)
+
+#: Exact-match filters accepted by ``search_articles``, by indexed field.
+FILTERS = {
+    "country": "countries",
+    "journal": "journals.raw",
+    "publisher": "publishers",
+    "year": "year",
+    "category": "categories",
+    "collaboration": "collaborations.raw",
+    "doi": "dois",
+    "arxiv_id": "arxiv_ids",
+    "orcid": "orcids",
+}
+
+#: Fields searched by the free text query, with their boost.
+QUERY_FIELDS = [
+    "title^4",
+    "subtitle^2",
+    "abstract",
+    "authors^2",
+    "affiliations",
+    "organizations",
+    "collaborations^2",
+    "journals",
+]
+
+SORTS = {
+    "relevance": ["_score", {"publication_date": "desc"}, {"id": "desc"}],
+    "date": [{"publication_date": "asc"}, {"id": "asc"}],
+    "-date": [{"publication_date": "desc"}, {"id": "desc"}],
+}
+
+#: Fields left out of the hits, which can be huge for large collaborations.
+EXCLUDED_FIELDS = ["authors", "orcids", "affiliations", "organizations"]
+
+
+class SearchUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Search is temporarily unavailable."
+    default_code = "search_unavailable"
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    return OpenSearch(
+        hosts=settings.OPENSEARCH_HOSTS, timeout=settings.OPENSEARCH_TIMEOUT
+    )
+
+
+def create_index(name, **index_settings):
+    """Create an empty article index, with ``index_settings`` on top of the defaults."""
+    body = {
+        **ARTICLE_INDEX,
+        "settings": {**ARTICLE_INDEX["settings"], **index_settings},
+    }
+    get_client().indices.create(index=name, body=body)
+    return name
+
+
+def live_indexes():
+    """Concrete indexes behind the ``article_index_name()`` alias."""
+    try:
+        return set(get_client().indices.get_alias(index=article_index_name()))
+    except NotFoundError:
+        return set()
+
+
+def write_indexes():
+    """Indexes article changes go to: the live ones and any being rebuilt."""
+    building = ArticleReindex.objects.filter(status=ArticleReindexStatus.RUNNING)
+    return live_indexes() | set(building.values_list("index", flat=True))
+
+
+def document_version(document):
+    # Versions make a stale copy of a document, say loaded by a reindex
+    # while the article changed, lose against the current one.
+    return int(document["updated_at"].timestamp() * 1_000_000)
+
+
+def index_actions(documents, indexes):
+    for document in documents:
+        for index in indexes:
+            yield {
+                "_index": index,
+                "_id": document["id"],
+                "_version": document_version(document),
+                "_version_type": "external_gte",
+                "_source": document,
+            }
+
+
+def bulk(actions, **kwargs):
+    """Send ``actions``, ignoring stale versions and deletions of missing documents."""
+    indexed, _ = helpers.bulk(get_client(), actions, ignore_status=(404, 409), **kwargs)
+    return indexed
+
+
+def sync_articles(article_ids):
+    """
+    Bring the documents of ``article_ids`` up to date in one bulk request.
+
+    The documents of articles that no longer exist are deleted.
+    """
+    indexes = write_indexes()
+    if not indexes:
+        return
+    article_ids = set(article_ids)
+    documents = list(article_documents(Article.objects.filter(pk__in=article_ids)))
+    deleted = article_ids - {document["id"] for document in documents}
+    actions = list(index_actions(documents, indexes))
+    actions += [
+        {"_op_type": "delete", "_index": index, "_id": article_id}
+        for article_id in deleted
+        for index in indexes
+    ]
+    bulk(actions)
+
+
+def terms_filter(field, values):
+    return {"terms": {field: list(values)}}
+
+
+def build_search(
+    query="", filters=None, date_from=None, date_to=None, sort=None, offset=0, size=10
+):
+    """
+    Build the request body of an article search.
+
+    The facet filters are applied as a ``post_filter`` and each facet is
+    counted with the filters of the other facets only, so that selecting a
+    country still lists the counts of the other countries.
+    """
+    filters = {name: values for name, values in (filters or {}).items() if values}
+    if query:
+        match = {
+            "simple_query_string": {
+                "query": query,
+                "fields": QUERY_FIELDS,
+                "default_operator": "and",
+            }
+        }
+    else:
+        match = {"match_all": {}}
+    dates = {}
+    if date_from:
+        dates["gte"] = date_from
+    if date_to:
+        dates["lte"] = date_to
+    scope = [{"range": {"publication_date": dates}}] if dates else []
+
+    aggregations = {}
+    for name, field, buckets in FACETS:
+        others = [
+            terms_filter(FILTERS[n], values)
+            for n, values in filters.items()
+            if n != name
+        ]
+        aggregations[name] = {
+            "filter": {"bool": {"filter": others}},
+            "aggs": {"values": {"terms": {"field": field, "size": buckets}}},
+        }
+    return {
+        "query": {"bool": {"must": [match], "filter": scope}},
+        "post_filter": {
+            "bool": {
+                "filter": [
+                    terms_filter(FILTERS[name], values)
+                    for name, values in filters.items()
+                ]
+            }
+        },
+        "aggs": aggregations,
+        "sort": SORTS[sort or ("relevance" if query else "-date")],
+        "from": offset,
+        "size": size,
+        "track_total_hits": True,
+        "_source": {"excludes": EXCLUDED_FIELDS},
+    }
+
+
+def search_articles(**kwargs):
+    """Run an article search, see ``build_search`` for the arguments."""
+    try:
+        response = get_client().search(
+            index=article_index_name(), body=build_search(**kwargs)
+        )
+    except OpenSearchException as exc:
+        raise SearchUnavailable() from exc
+    return {
+        "count": response["hits"]["total"]["value"],
+        "results": [
+            {**hit["_source"], "score": hit["_score"]}
+            for hit in response["hits"]["hits"]
+        ],
+        "facets": {
+            name: [
+                {"value": bucket["key"], "count": bucket["doc_count"]}
+                for bucket in response["aggregations"][name]["values"]["buckets"]
+            ]
+            for name, _, _ in FACETS
+        },
+    }
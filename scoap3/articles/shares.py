@@ -0,0 +1,145 @@
+"""
+Fractional country shares of articles, kept in ``ArticleCountryShare``.
+
+Each article counts as one, split equally between its authors with at least
+one affiliation. The part of an author is in turn split equally between
+their affiliations, and credited to the country of each. The shares of an
+article with affiliated authors thus add up to one.
+
+The shares of an article are recomputed when the transaction that changed
+it commits, see ``schedule_recompute``.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from scoap3.articles.models import Article, ArticleCountryShare
+from scoap3.misc.models import Affiliation, PublicationInfo
+from scoap3.utils.iterables import chunked
+from scoap3.utils.transactions import CommitBatch
+
+#: Number of articles recomputed per round of queries.
+CHUNK_SIZE = 1000
+
+#: Dimensions the shares can be grouped and filtered by, by field.
+SHARE_DIMENSIONS = {
+    "country": "country",
+    "year": "year",
+    "journal": "journal_title",
+    "publisher": "publisher__name",
+}
+
+
+def article_shares(article_ids):
+    """Map the ``article_ids`` to their ``{country code: share}``."""
+    countries = defaultdict(lambda: defaultdict(list))
+    links = Affiliation.author_id.through.objects.filter(
+        author__article_id__in=article_ids
+    ).values_list("author__article_id", "author_id", "affiliation__country")
+    for article_id, author_id, country in links:
+        countries[article_id][author_id].append(country)
+
+    shares = {}
+    for article_id, authors in countries.items():
+        shares[article_id] = defaultdict(float)
+        for affiliations in authors.values():
+            part = 1 / len(authors) / len(affiliations)
+            for country in affiliations:
+                shares[article_id][country] += part
+    return shares
+
+
+def article_details(article_ids):
+    """Map ``article_ids`` to the year, journal title and publisher of their shares."""
+    journals = {}
+    for article_id, journal_title, publisher_id in PublicationInfo.objects.filter(
+        article_id__in=article_ids
+    ).values_list("article_id", "journal_title", "publisher"):
+        journals.setdefault(article_id, (journal_title, publisher_id))
+    return {
+        article_id: (year, *journals.get(article_id, ("", None)))
+        for article_id, year in Article.objects.filter(pk__in=article_ids).values_list(
+            "pk", "publication_date__year"
+        )
+    }
+
+
+def replace_shares(article_ids, shares):
+    """
+    Replace the shares of ``article_ids`` by ``shares``.
+
+    ``shares`` holds the ``(article id, country code, share)`` of the
+    articles; those of deleted articles are skipped.
+    """
+    details = article_details(article_ids)
+    with transaction.atomic():
+        ArticleCountryShare.objects.filter(article_id__in=article_ids).delete()
+        ArticleCountryShare.objects.bulk_create(
+            (
+                ArticleCountryShare(
+                    article_id_id=article_id,
+                    country_id=country,
+                    share=share,
+                    year=details[article_id][0],
+                    journal_title=details[article_id][1],
+                    publisher_id=details[article_id][2],
+                )
+                for article_id, country, share in shares
+                if article_id in details
+            ),
+            batch_size=CHUNK_SIZE,
+        )
+
+
+def recompute_shares(article_ids):
+    """Replace the shares of ``article_ids``; deleted articles lose theirs."""
+    for chunk in chunked(sorted(set(article_ids)), CHUNK_SIZE):
+        replace_shares(
+            chunk,
+            (
+                (article_id, country, share)
+                for article_id, countries in article_shares(chunk).items()
+                for country, share in countries.items()
+            ),
+        )
+
+
+pending_recomputes = CommitBatch(recompute_shares)
+
+
+def schedule_recompute(article_ids):
+    """
+    Recompute the shares of ``article_ids`` once the transaction commits.
+
+    The articles changed by a transaction are recomputed together, however
+    many rows of theirs it touched.
+    """
+    pending_recomputes.add(article_ids)
+
+
+def aggregate_shares(group_by, filters=None, year_from=None, year_to=None):
+    """
+    Sum the shares by the ``group_by`` dimensions.
+
+    ``filters`` maps dimensions to the values to keep. Each group has the
+    number of ``articles`` credited to it, fractional, and the
+    ``article_count`` of articles it has a share of.
+    """
+    queryset = ArticleCountryShare.objects.all()
+    for name, values in (filters or {}).items():
+        if values:
+            queryset = queryset.filter(**{f"{SHARE_DIMENSIONS[name]}__in": values})
+    if year_from is not None:
+        queryset = queryset.filter(year__gte=year_from)
+    if year_to is not None:
+        queryset = queryset.filter(year__lte=year_to)
+    fields = [name for name in group_by if SHARE_DIMENSIONS[name] == name]
+    aliases = {
+        name: F(SHARE_DIMENSIONS[name]) for name in group_by if name not in fields
+    }
+    return list(
+        queryset.values(*fields, **aliases)
+        .annotate(articles=Sum("share"), article_count=Count("article_id"))
+        .order_by(*group_by)
+    )
@@ -0,0 +1,315 @@
+import threading
+from contextlib import contextmanager
+from functools import partial, wraps
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from scoap3.articles.models import Article, ArticleIdentifier, ArticleTombstone
+from scoap3.articles.shares import schedule_recompute
+from scoap3.articles.tasks import queue_for_indexing
+from scoap3.authors.author_lists import schedule_rebuild
+from scoap3.authors.models import Author, AuthorIdentifier
+from scoap3.misc.models import (
+    Affiliation,
+    ArticleArxivCategory,
+    Copyright,
+    Country,
+    ExperimentalCollaboration,
+    Funder,
+    InstitutionIdentifier,
+    License,
+    PublicationInfo,
+    Publisher,
+    RelatedMaterial,
+)
+from scoap3.utils.cache import invalidate_articles, invalidate_models
+from scoap3.utils.iterables import chunked
+from scoap3.utils.transactions import ClockTimestamp, CommitBatch
+
+#: Sent with ``article_ids`` whenever articles, or rows belonging to them,
+#: were created, changed or deleted.
+articles_changed = Signal()
+
+#: Models with a direct ``article_id`` foreign key.
+ARTICLE_CHILD_MODELS = (
+    ArticleIdentifier,
+    Author,
+    PublicationInfo,
+    Copyright,
+    ArticleArxivCategory,
+)
+
+#: Models whose rows are written along with articles. Bulk writers, which
+#: skip the handlers below, drop the cached API responses of those they write.
+ARTICLE_GRAPH_MODELS = (
+    Article,
+    *ARTICLE_CHILD_MODELS,
+    AuthorIdentifier,
+    Affiliation,
+    InstitutionIdentifier,
+    Funder,
+    ExperimentalCollaboration,
+)
+
+#: Models served from the API response cache, see ``scoap3.utils.cache``.
+CACHED_MODELS = {*ARTICLE_GRAPH_MODELS, Country, Publisher, License, RelatedMaterial}
+
+
+#: Rows stamped per statement, see ``stamp_rows``.
+STAMP_CHUNK_SIZE = 1000
+
+_tracking = threading.local()
+
+
+@contextmanager
+def bulk_changes():
+    """
+    Silence the per-row change tracking handlers below.
+
+    For bulk writers, which record their tombstones with
+    ``record_tombstones`` and touch their articles with ``touch_articles``
+    in a constant number of queries instead.
+    """
+    previous = getattr(_tracking, "suspended", False)
+    _tracking.suspended = True
+    try:
+        yield
+    finally:
+        _tracking.suspended = previous
+
+
+def tracked(handler):
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not getattr(_tracking, "suspended", False):
+            handler(*args, **kwargs)
+
+    return wrapper
+
+
+def stamp_rows(model, field, pks):
+    """
+    Set ``field`` of the ``pks`` rows of ``model`` to the current time, one
+    short transaction per chunk.
+
+    Rows are stamped as they are written, yet become visible when their
+    transaction commits: the change feed would skip those of a transaction
+    lasting longer than ``API_CHANGE_FEED_DELAY`` once a cursor passed
+    their stamps. They are stamped again on commit, see ``article_changed``.
+    """
+    for chunk in chunked(sorted(pks), STAMP_CHUNK_SIZE):
+        model.objects.filter(pk__in=chunk).update(**{field: ClockTimestamp()})
+
+
+def stamp_articles(article_ids):
+    stamp_rows(Article, "updated_at", article_ids)
+    # Responses cached since the commit carry the previous stamps.
+    invalidate_articles(article_ids)
+    invalidate_models([Article])
+
+
+pending_stamps = CommitBatch(stamp_articles)
+pending_tombstone_stamps = CommitBatch(
+    partial(stamp_rows, ArticleTombstone, "deleted_at")
+)
+
+
+def record_tombstones(model, rows):
+    """Record the deletion of ``(object_id, article_id)`` rows of ``model``."""
+    tombstones = ArticleTombstone.objects.bulk_create(
+        ArticleTombstone(
+            model=model._meta.label_lower, object_id=object_id, article_id=article_id
+        )
+        for object_id, article_id in rows
+    )
+    # Outside transactions they commit as they are stamped.
+    if connection.in_atomic_block:
+        pending_tombstone_stamps.add(tombstone.pk for tombstone in tombstones)
+
+
+def touch_articles(article_ids):
+    """Move the given articles to the head of the change feed."""
+    article_ids = set(article_ids)
+    if not article_ids:
+        return
+    Article.objects.filter(pk__in=article_ids).update(updated_at=timezone.now())
+    articles_changed.send(sender=Article, article_ids=article_ids)
+
+
+def is_article_deletion(origin):
+    if isinstance(origin, QuerySet):
+        return origin.model is Article
+    return isinstance(origin, Article)
+
+
+def is_cascade(sender, instance, origin):
+    """Whether ``instance`` is being deleted because another row was."""
+    if origin is None or origin is instance:
+        return False
+    if isinstance(origin, QuerySet):
+        return origin.model is not sender
+    return True
+
+
+def linked_article_ids(through, instance):
+    """Articles linked to ``instance`` through an m2m ``through`` table."""
+    lookup = {instance._meta.model_name: instance.pk}
+    return through.objects.filter(**lookup).values_list("article_id", flat=True)
+
+
+def affiliation_article_ids(affiliation):
+    return Author.objects.filter(affiliation=affiliation).values_list(
+        "article_id", flat=True
+    )
+
+
+@receiver(articles_changed)
+def article_changed(sender, article_ids, **kwargs):
+    if connection.in_atomic_block:
+        pending_stamps.add(article_ids)
+    schedule_rebuild(article_ids)
+    queue_for_indexing(article_ids)
+    schedule_recompute(article_ids)
+    # Related models are dropped by the writes to their own rows.
+    invalidate_articles(article_ids)
+    invalidate_models([Article])
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@tracked
+def cached_model_written(sender, **kwargs):
+    if sender in CACHED_MODELS:
+        invalidate_models([sender])
+
+
+@receiver(m2m_changed)
+@tracked
+def cached_m2m_written(sender, instance, action, model, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_models(CACHED_MODELS & {type(instance), model})
+
+
+@receiver(post_save, sender=Article)
+@tracked
+def article_saved(sender, instance, **kwargs):
+    articles_changed.send(sender=Article, article_ids={instance.pk})
+
+
+@receiver(post_delete, sender=Article)
+@tracked
+def article_deleted(sender, instance, **kwargs):
+    record_tombstones(Article, [(instance.pk, instance.pk)])
+    articles_changed.send(sender=Article, article_ids={instance.pk})
+
+
+@tracked
+def child_saved(sender, instance, **kwargs):
+    touch_articles([instance.article_id_id])
+
+
+@tracked
+def child_deleted(sender, instance, origin=None, **kwargs):
+    # Rows removed together with their article are covered by its tombstone.
+    if is_article_deletion(origin):
+        return
+    record_tombstones(sender, [(instance.pk, instance.article_id_id)])
+    touch_articles([instance.article_id_id])
+
+
+for model in ARTICLE_CHILD_MODELS:
+    post_save.connect(child_saved, sender=model)
+    post_delete.connect(child_deleted, sender=model)
+
+
+@receiver(post_save, sender=AuthorIdentifier)
+@receiver(post_delete, sender=AuthorIdentifier)
+@tracked
+def author_identifier_changed(sender, instance, origin=None, **kwargs):
+    # Deleted along with its author, whose own handler touches the article.
+    if is_cascade(sender, instance, origin):
+        return
+    touch_articles(
+        Author.objects.filter(pk=instance.author_id_id).values_list(
+            "article_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=InstitutionIdentifier)
+@receiver(post_delete, sender=InstitutionIdentifier)
+@tracked
+def institution_identifier_changed(sender, instance, origin=None, **kwargs):
+    # Deleted along with its affiliation, whose own handler touches the articles.
+    if is_cascade(sender, instance, origin):
+        return
+    touch_articles(affiliation_article_ids(instance.affiliation_id_id))
+
+
+@receiver(post_save, sender=Affiliation)
+@tracked
+def affiliation_saved(sender, instance, created, **kwargs):
+    if not created:
+        touch_articles(affiliation_article_ids(instance))
+
+
+@receiver(pre_delete, sender=Affiliation)
+@tracked
+def affiliation_deleting(sender, instance, **kwargs):
+    # The author links are gone by the time ``post_delete`` is sent.
+    instance._article_ids = set(affiliation_article_ids(instance))
+
+
+@receiver(post_delete, sender=Affiliation)
+@tracked
+def affiliation_deleted(sender, instance, **kwargs):
+    touch_articles(getattr(instance, "_article_ids", ()))
+
+
+@receiver(m2m_changed, sender=Affiliation.author_id.through)
+@tracked
+def affiliation_authors_changed(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if isinstance(instance, Author):
+        touch_articles([instance.article_id_id])
+    elif action == "pre_clear":
+        touch_articles(affiliation_article_ids(instance))
+    else:
+        touch_articles(
+            Author.objects.filter(pk__in=pk_set).values_list("article_id", flat=True)
+        )
+
+
+@tracked
+def article_m2m_changed(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if isinstance(instance, Article):
+        touch_articles([instance.pk])
+    elif action == "pre_clear":
+        touch_articles(linked_article_ids(sender, instance))
+    else:
+        # ``instance`` is on the other side, ``pk_set`` holds article ids.
+        touch_articles(pk_set)
+
+
+for m2m_field in (
+    Article.related_licenses,
+    Article.related_materials,
+    Funder.article_id,
+    ExperimentalCollaboration.article_id,
+):
+    m2m_changed.connect(article_m2m_changed, sender=m2m_field.through)
+
+
+@receiver(post_save, sender=Funder)
+@receiver(post_save, sender=ExperimentalCollaboration)
+@tracked
+def article_m2m_target_saved(sender, instance, created, **kwargs):
+    if not created:
+        touch_articles(linked_article_ids(sender.article_id.through, instance))
@@ -0,0 +1,292 @@
+"""
+Columnar snapshots of the article graph, as Parquet files for analysts.
+
+Articles are split into partitions of ``SNAPSHOT_PARTITION_SIZE`` ids, each
+written as one file per table with the rows belonging to its articles.
+``manifest.json`` lists the partitions with the number of articles and the
+latest ``updated_at`` they were written with. A snapshot only rewrites the
+partitions where these changed, and the manifest records when each was
+written, so analysts download the partitions written since their last
+snapshot.
+
+Strings with few distinct values are dictionary-encoded, which Arrow
+readers load as categoricals. Files get new names when rewritten, and the
+manifest is written last: a snapshot is never seen half done.
+"""
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from scoap3.articles.models import Article
+from scoap3.authors.models import Author
+from scoap3.misc.models import Affiliation, Country, Funder, PublicationInfo
+
+MANIFEST = "manifest.json"
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+
+def article_rows(first_id, last_id):
+    return Article.objects.filter(pk__gte=first_id, pk__lte=last_id).values_list(
+        "id",
+        "title",
+        "subtitle",
+        "abstract",
+        "reception_date",
+        "acceptance_date",
+        "publication_date",
+        "first_online_date",
+        "created_at",
+        "updated_at",
+    )
+
+
+def author_rows(first_id, last_id):
+    return Author.objects.filter(
+        article_id__gte=first_id, article_id__lte=last_id
+    ).values_list(
+        "id", "article_id", "first_name", "last_name", "email", "author_order"
+    )
+
+
+def affiliation_rows(first_id, last_id):
+    # An affiliation shared by the articles of several partitions is
+    # written to each of them.
+    return (
+        Affiliation.objects.filter(
+            author_id__article_id__gte=first_id, author_id__article_id__lte=last_id
+        )
+        .distinct()
+        .values_list("id", "country", "value", "organization")
+    )
+
+
+def author_affiliation_rows(first_id, last_id):
+    return Affiliation.author_id.through.objects.filter(
+        author__article_id__gte=first_id, author__article_id__lte=last_id
+    ).values_list("author_id", "affiliation_id")
+
+
+def publication_info_rows(first_id, last_id):
+    return PublicationInfo.objects.filter(
+        article_id__gte=first_id, article_id__lte=last_id
+    ).values_list(
+        "id",
+        "article_id",
+        "journal_title",
+        "journal_volume",
+        "journal_issue",
+        "journal_issue_date",
+        "page_start",
+        "page_end",
+        "artid",
+        "volume_year",
+        "publisher__name",
+    )
+
+
+def funder_rows(first_id, last_id):
+    return Funder.article_id.through.objects.filter(
+        article_id__gte=first_id, article_id__lte=last_id
+    ).values_list(
+        "article_id",
+        "funder_id",
+        "funder__funder_identifier",
+        "funder__funder_name",
+        "funder__award_number",
+    )
+
+
+#: Tables written for each partition, as (rows, Arrow schema).
+PARTITION_TABLES = {
+    "articles": (
+        article_rows,
+        pa.schema(
+            [
+                ("id", pa.int64()),
+                ("title", pa.string()),
+                ("subtitle", pa.string()),
+                ("abstract", pa.string()),
+                ("reception_date", pa.date32()),
+                ("acceptance_date", pa.date32()),
+                ("publication_date", pa.date32()),
+                ("first_online_date", pa.date32()),
+                ("created_at", pa.timestamp("us", tz="UTC")),
+                ("updated_at", pa.timestamp("us", tz="UTC")),
+            ]
+        ),
+    ),
+    "authors": (
+        author_rows,
+        pa.schema(
+            [
+                ("id", pa.int64()),
+                ("article_id", pa.int64()),
+                ("first_name", pa.string()),
+                ("last_name", pa.string()),
+                ("email", pa.string()),
+                ("author_order", pa.int32()),
+            ]
+        ),
+    ),
+    "affiliations": (
+        affiliation_rows,
+        pa.schema(
+            [
+                ("id", pa.int64()),
+                ("country", CATEGORY),
+                ("value", pa.string()),
+                ("organization", CATEGORY),
+            ]
+        ),
+    ),
+    "author_affiliations": (
+        author_affiliation_rows,
+        pa.schema([("author_id", pa.int64()), ("affiliation_id", pa.int64())]),
+    ),
+    "publication_info": (
+        publication_info_rows,
+        pa.schema(
+            [
+                ("id", pa.int64()),
+                ("article_id", pa.int64()),
+                ("journal_title", CATEGORY),
+                ("journal_volume", pa.string()),
+                ("journal_issue", pa.string()),
+                ("journal_issue_date", pa.date32()),
+                ("page_start", pa.int64()),
+                ("page_end", pa.int64()),
+                ("artid", pa.string()),
+                ("volume_year", CATEGORY),
+                ("publisher", CATEGORY),
+            ]
+        ),
+    ),
+    "funders": (
+        funder_rows,
+        pa.schema(
+            [
+                ("article_id", pa.int64()),
+                ("funder_id", pa.int64()),
+                ("funder_identifier", CATEGORY),
+                ("funder_name", CATEGORY),
+                ("award_number", pa.string()),
+            ]
+        ),
+    ),
+}
+
+COUNTRY_SCHEMA = pa.schema([("code", pa.string()), ("name", pa.string())])
+
+
+def snapshot_path(*parts):
+    return "/".join([settings.SNAPSHOT_LOCATION, *parts])
+
+
+def parquet_file(rows, schema):
+    """``rows`` as the content of a Parquet file with ``schema``."""
+    columns = list(zip(*rows)) or [[] for _ in schema]
+    table = pa.table(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd")
+    return ContentFile(buffer.getvalue())
+
+
+def save(path, content):
+    # Only the manifest is ever overwritten, other paths carry the snapshot
+    # time.
+    default_storage.delete(path)
+    return default_storage.save(path, content)
+
+
+def read_manifest():
+    if not default_storage.exists(snapshot_path(MANIFEST)):
+        return None
+    with default_storage.open(snapshot_path(MANIFEST)) as file:
+        return json.load(file)
+
+
+def partition_stats(size):
+    """The number of articles and latest ``updated_at`` of each partition."""
+    return {
+        row["partition"]: row
+        for row in Article.objects.values(partition=F("pk") / size)
+        .annotate(articles=Count("pk"), last_updated=Max("updated_at"))
+        .order_by("partition")
+    }
+
+
+def write_partition(partition, size, stamp):
+    first_id, last_id = partition * size, (partition + 1) * size - 1
+    return {
+        name: save(
+            snapshot_path("partitions", str(first_id), f"{name}-{stamp}.parquet"),
+            parquet_file(rows(first_id, last_id), schema),
+        )
+        for name, (rows, schema) in PARTITION_TABLES.items()
+    }
+
+
+def write_snapshot(full=False):
+    """
+    Write the partitions that changed since the last snapshot, or all of
+    them if ``full``, then the manifest. Returns the manifest.
+    """
+    size = settings.SNAPSHOT_PARTITION_SIZE
+    previous = read_manifest()
+    if previous is None or previous["partition_size"] != size:
+        full = True
+    known = {p["start_id"]: p for p in previous["partitions"]} if previous else {}
+
+    now = timezone.now()
+    stamp = f"{now:%Y%m%dT%H%M%S%f}"
+    partitions, stale = [], []
+    for number, stats in partition_stats(size).items():
+        first_id = number * size
+        version = {
+            "articles": stats["articles"],
+            "updated_at": stats["last_updated"].isoformat(),
+        }
+        entry = known.pop(first_id, None)
+        if full or entry is None or {k: entry[k] for k in version} != version:
+            if entry is not None:
+                stale.extend(entry["files"].values())
+            entry = {
+                "start_id": first_id,
+                "end_id": first_id + size - 1,
+                **version,
+                "written_at": now.isoformat(),
+                "files": write_partition(number, size, stamp),
+            }
+        partitions.append(entry)
+    # Partitions whose articles were all deleted.
+    for entry in known.values():
+        stale.extend(entry["files"].values())
+
+    countries = save(
+        snapshot_path(f"countries-{stamp}.parquet"),
+        parquet_file(Country.objects.values_list("code", "name"), COUNTRY_SCHEMA),
+    )
+    if previous is not None:
+        stale.append(previous["countries"])
+    manifest = {
+        "generated_at": now.isoformat(),
+        "partition_size": size,
+        "countries": countries,
+        "partitions": partitions,
+    }
+    save(snapshot_path(MANIFEST), ContentFile(json.dumps(manifest, indent=2)))
+    current = {countries, *(p for e in partitions for p in e["files"].values())}
+    for path in set(stale) - current:
+        default_storage.delete(path)
+    return manifest
@@ -0,0 +1,157 @@
+"""
+Vectorized country statistics over the whole corpus.
+
+``scoap3.articles.shares`` recomputes the shares of the few articles a
+transaction changed. Rebuilding them for the whole corpus, or summing them
+by funder, goes through here instead: the author, affiliation and country
+incidence is read in chunks of articles into integer arrays, and the
+fractional counts are NumPy group-by reductions over them.
+"""
+import numpy as np
+from django.conf import settings
+
+from scoap3.articles.models import Article, ArticleCountryShare
+from scoap3.articles.shares import replace_shares
+from scoap3.misc.models import Affiliation, Country, Funder
+from scoap3.utils.iterables import chunked
+
+#: One row per link between an author and an affiliation.
+INCIDENCE_DTYPE = np.dtype([("article", "i8"), ("author", "i8"), ("country", "i4")])
+
+
+def country_codes():
+    """
+    All country codes, sorted; countries are referred to by their position.
+
+    Read from the table rather than the reference cache, which could miss
+    a country created since it was filled.
+    """
+    return np.array(sorted(Country.objects.values_list("code", flat=True)))
+
+
+def load_incidence(first_id, last_id, codes):
+    """The incidence of the articles with ids from ``first_id`` to ``last_id``."""
+    positions = {code: position for position, code in enumerate(codes)}
+    rows = (
+        Affiliation.author_id.through.objects.filter(
+            author__article_id__gte=first_id, author__article_id__lte=last_id
+        )
+        .values_list("author__article_id", "author_id", "affiliation__country")
+        .iterator(chunk_size=settings.STATISTICS_CHUNK_SIZE)
+    )
+    return np.fromiter(
+        ((article, author, positions[country]) for article, author, country in rows),
+        dtype=INCIDENCE_DTYPE,
+    )
+
+
+def group_sum(keys, weights):
+    """The distinct ``keys`` and the sum of the ``weights`` of each."""
+    groups, rows = np.unique(keys, return_inverse=True)
+    return groups, np.bincount(rows, weights=weights, minlength=len(groups))
+
+
+def fractional_counts(incidence, countries):
+    """
+    Sum the shares of each article and country of ``incidence``.
+
+    Returns the article ids, country positions and shares as three arrays,
+    ordered by article and country. See ``scoap3.articles.shares`` for how
+    articles are split.
+    """
+    if not len(incidence):
+        return np.empty(0, "i8"), np.empty(0, "i4"), np.empty(0)
+    authors, author_rows, affiliations = np.unique(
+        incidence["author"], return_inverse=True, return_counts=True
+    )
+    # Authors belong to a single article.
+    author_articles = np.empty(len(authors), "i8")
+    author_articles[author_rows] = incidence["article"]
+    _, article_rows, article_authors = np.unique(
+        author_articles, return_inverse=True, return_counts=True
+    )
+    weights = 1 / (article_authors[article_rows] * affiliations)[author_rows]
+
+    keys, shares = group_sum(
+        incidence["article"] * countries + incidence["country"], weights
+    )
+    return keys // countries, (keys % countries).astype("i4"), shares
+
+
+def rebuild_shares():
+    """Recompute the shares of all articles, returns the number of articles."""
+    done = 0
+    article_ids = Article.objects.order_by("pk").values_list("pk", flat=True)
+    for chunk in chunked(
+        article_ids.iterator(chunk_size=settings.STATISTICS_CHUNK_SIZE),
+        settings.STATISTICS_CHUNK_SIZE,
+    ):
+        # Again for each chunk, countries may be created meanwhile.
+        codes = country_codes()
+        incidence = load_incidence(chunk[0], chunk[-1], codes)
+        articles, countries, shares = fractional_counts(incidence, len(codes))
+        replace_shares(
+            chunk, zip(articles.tolist(), codes[countries].tolist(), shares.tolist())
+        )
+        done += len(chunk)
+    return done
+
+
+def load_shares(codes):
+    """All the shares, as arrays of article ids, country positions and shares."""
+    positions = {code: position for position, code in enumerate(codes)}
+    rows = (
+        ArticleCountryShare.objects.order_by("article_id", "country")
+        .values_list("article_id", "country", "share")
+        .iterator(chunk_size=settings.STATISTICS_CHUNK_SIZE)
+    )
+    shares = np.fromiter(
+        ((article, positions[country], share) for article, country, share in rows),
+        dtype=[("article", "i8"), ("country", "i4"), ("share", "f8")],
+    )
+    return shares["article"], shares["country"], shares["share"]
+
+
+def funder_shares():
+    """
+    Sum the country shares of the articles of each funder.
+
+    Funders are told apart by name, an article funded by several awards of
+    a funder counts once. Returns ``(funder name, country code, articles)``
+    triples, ordered by funder and country.
+    """
+    codes = country_codes()
+    share_articles, share_countries, shares = load_shares(codes)
+
+    links = Funder.article_id.through.objects.values_list(
+        "funder__funder_name", "article_id"
+    ).iterator(chunk_size=settings.STATISTICS_CHUNK_SIZE)
+    funders = {}
+    links = [
+        (funders.setdefault(name, len(funders)), article_id)
+        for name, article_id in links
+    ]
+    if not links:
+        return []
+    pairs = np.unique(np.array(links, "i8"), axis=0)
+    link_funders, link_articles = pairs[:, 0], pairs[:, 1]
+
+    # Join each link with the share rows of its article, which are sorted.
+    starts = np.searchsorted(share_articles, link_articles, side="left")
+    counts = np.searchsorted(share_articles, link_articles, side="right") - starts
+    rows = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(
+        counts.sum()
+    )
+    keys, totals = group_sum(
+        np.repeat(link_funders, counts) * len(codes) + share_countries[rows],
+        shares[rows],
+    )
+
+    funder_names = np.array(list(funders), dtype=object)
+    return sorted(
+        zip(
+            funder_names[keys // len(codes)].tolist(),
+            codes[keys % len(codes)].tolist(),
+            totals.tolist(),
+        )
+    )
@@ -0,0 +1,130 @@
+from functools import reduce
+from operator import or_
+
+from celery import chord
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from opensearchpy.exceptions import OpenSearchException
+
+from config import celery_app
+from scoap3.articles import reindex
+from scoap3.articles.models import (
+    ArticleIndexQueue,
+    ArticleReindex,
+    ArticleReindexPartition,
+)
+from scoap3.articles.rollups import refresh_rollups
+from scoap3.articles.search import sync_articles
+from scoap3.articles.snapshots import write_snapshot
+
+#: Cache key set while a flush of the index queue is scheduled.
+FLUSH_SCHEDULED = "articles:index-queue:flush-scheduled"
+
+
+def queue_for_indexing(article_ids):
+    """
+    Queue articles for reindexing once the current transaction commits.
+
+    Queuing an article again only refreshes its ``queued_at``, and at most
+    one flush is scheduled per transaction, however many rows it touched.
+    """
+    ArticleIndexQueue.objects.bulk_create(
+        [ArticleIndexQueue(article_id=article_id) for article_id in article_ids],
+        update_conflicts=True,
+        unique_fields=["article_id"],
+        update_fields=["queued_at"],
+    )
+    if not any(hook[1] is schedule_flush for hook in connection.run_on_commit):
+        transaction.on_commit(schedule_flush)
+
+
+def schedule_flush():
+    # Writes committed until the flush starts are picked up by it, so one
+    # flush per latency window is enough. The flag expires on its own should
+    # the task be lost.
+    latency = settings.SEARCH_INDEX_LATENCY
+    if cache.add(FLUSH_SCHEDULED, True, timeout=latency + 60):
+        flush_index_queue.apply_async(countdown=latency)
+
+
+@celery_app.task(
+    autoretry_for=(OpenSearchException,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    max_retries=None,
+    soft_time_limit=30 * 60,
+    time_limit=35 * 60,
+)
+def flush_index_queue():
+    """
+    Reindex the oldest batch of queued articles, in one bulk request.
+
+    Runs again right away while full batches are found. On OpenSearch
+    errors the queue is left as is and the task retried with exponential
+    backoff.
+    """
+    cache.delete(FLUSH_SCHEDULED)
+    batch = list(
+        ArticleIndexQueue.objects.values_list("article_id", "queued_at")[
+            : settings.SEARCH_INDEX_BATCH_SIZE
+        ]
+    )
+    if not batch:
+        return 0
+    sync_articles([article_id for article_id, _ in batch])
+    # Articles queued again meanwhile have a newer ``queued_at`` and stay.
+    ArticleIndexQueue.objects.filter(
+        reduce(or_, (Q(article_id=a, queued_at=q) for a, q in batch))
+    ).delete()
+    if len(batch) == settings.SEARCH_INDEX_BATCH_SIZE:
+        flush_index_queue.delay()
+    return len(batch)
+
+
+def run_reindex(article_reindex):
+    """Load the pending partitions of a reindex in parallel, then finish it."""
+    partitions = reindex.pending_partitions(article_reindex)
+    return chord(reindex_partition.si(partition.pk) for partition in partitions)(
+        finish_reindex.si(article_reindex.pk)
+    )
+
+
+@celery_app.task(
+    autoretry_for=(OpenSearchException,),
+    retry_backoff=True,
+    max_retries=8,
+    soft_time_limit=60 * 60,
+    time_limit=65 * 60,
+)
+def reindex_partition(partition_id):
+    partition = ArticleReindexPartition.objects.select_related("reindex_id").get(
+        pk=partition_id
+    )
+    reindex.load_partition(partition)
+    return partition.indexed
+
+
+@celery_app.task(
+    autoretry_for=(OpenSearchException,),
+    retry_backoff=True,
+    max_retries=8,
+    soft_time_limit=30 * 60,
+    time_limit=35 * 60,
+)
+def finish_reindex(reindex_id):
+    reindex.finish_reindex(ArticleReindex.objects.get(pk=reindex_id))
+
+
+@celery_app.task(soft_time_limit=30 * 60, time_limit=35 * 60)
+def refresh_dashboard_rollups():
+    """Refresh the dashboard rollups, if articles changed since the last run."""
+    return refresh_rollups()
+
+
+@celery_app.task(soft_time_limit=3 * 60 * 60, time_limit=3 * 60 * 60 + 300)
+def write_article_snapshot():
+    """Write the partitions of the Parquet snapshot that changed since the last."""
+    manifest = write_snapshot()
+    return len(manifest["partitions"])
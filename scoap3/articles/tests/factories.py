@@ -0,0 +1,25 @@
+from factory import Faker, SubFactory
+from factory.django import DjangoModelFactory
+
+from scoap3.articles.models import Article, ArticleIdentifier, ArticleIdentifierType
+
+
+class ArticleFactory(DjangoModelFactory):
+    reception_date = Faker("date_object")
+    acceptance_date = Faker("date_object")
+    publication_date = Faker("date_object")
+    first_online_date = Faker("date_object")
+    title = Faker("sentence")
+    abstract = Faker("paragraph")
+
+    class Meta:
+        model = Article
+
+
+class ArticleIdentifierFactory(DjangoModelFactory):
+    article_id = SubFactory(ArticleFactory)
+    identifier_type = ArticleIdentifierType.DOI
+    identifier_value = Faker("numerify", text="10.1016/j.physletb.2023.######")
+
+    class Meta:
+        model = ArticleIdentifier
@@ -0,0 +1,150 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.tests.factories import ArticleFactory
+from scoap3.articles.tests.test_views import count_list_queries, create_full_article
+from scoap3.authors.api.serializers import AuthorNestedSerializer
+from scoap3.authors.author_lists import (
+    article_authors,
+    pending_rebuilds,
+    rebuild_author_lists,
+)
+from scoap3.authors.models import ArticleAuthorList, Author
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.reference import country_names
+from scoap3.misc.tests.factories import InstitutionIdentifierFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_packed_list_renders_like_the_rows(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        article = create_full_article(authors=4)
+    authors = Author.objects.filter(article_id=article).order_by("author_order")
+
+    packed = article_authors(
+        ArticleAuthorList.objects.get(article_id=article).article_id
+    )
+
+    assert packed == AuthorNestedSerializer(authors, many=True).data
+
+
+def test_lists_are_rebuilt_as_authors_change(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        article = create_full_article(authors=2)
+        author = AuthorFactory(article_id=article, first_name="Late", author_order=5)
+
+    assert [a["first_name"] for a in article_authors(article)][-1] == "Late"
+    with django_capture_on_commit_callbacks(execute=True):
+        author.delete()
+    assert ArticleAuthorList.objects.get(article_id=article).authors == 2
+
+
+def test_lists_are_packed_on_the_fly_until_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        article = create_full_article(authors=2)
+
+    AuthorFactory(article_id=article, first_name="Late", author_order=5)
+
+    assert not ArticleAuthorList.objects.filter(article_id=article).exists()
+    assert [a["first_name"] for a in article_authors(article)][-1] == "Late"
+
+
+def test_lists_are_rebuilt_once_per_transaction(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        article = ArticleFactory()
+    with django_capture_on_commit_callbacks() as callbacks:
+        for order in range(10):
+            AuthorFactory(article_id=article, author_order=order)
+
+    (rebuild,) = [c for c in callbacks if c == pending_rebuilds.run]
+    with CaptureQueriesContext(connection) as context:
+        rebuild()
+    assert ArticleAuthorList.objects.get(article_id=article).authors == 10
+    assert len(context.captured_queries) < 10
+
+
+def test_lists_follow_institution_identifiers(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        article = create_full_article(authors=1)
+        affiliation = Author.objects.get(article_id=article).affiliation_set.get()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        InstitutionIdentifierFactory(
+            affiliation_id=affiliation, identifier_value="https://ror.org/01ggx4157"
+        )
+
+    packed = ArticleAuthorList.objects.get(article_id=article).data
+    assert packed["affiliations"][0][4] == [["ROR", "https://ror.org/01ggx4157"]]
+
+
+def test_missing_lists_are_packed_once_per_page(api_client: APIClient):
+    # Lists are only built on commit, these articles have none.
+    create_full_article(authors=1)
+    country_names()
+    few = count_list_queries(api_client, page_size=10)
+
+    for _ in range(4):
+        create_full_article(authors=3)
+    country_names()
+    many = count_list_queries(api_client, page_size=10)
+
+    assert not ArticleAuthorList.objects.exists()
+    assert few == many
+
+
+def test_rebuilds_lock_the_articles():
+    article = ArticleFactory()
+
+    with CaptureQueriesContext(connection) as context:
+        rebuild_author_lists([article.pk])
+
+    assert any("FOR UPDATE" in q["sql"] for q in context.captured_queries)
+
+
+def test_articles_without_authors_have_an_empty_list(
+    django_capture_on_commit_callbacks,
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        article = ArticleFactory()
+
+    assert ArticleAuthorList.objects.get(article_id=article).data["authors"] == []
+
+
+def test_authors_are_paginated_in_order_in_one_query(
+    api_client: APIClient, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        article = create_full_article(authors=5)
+    url = reverse("api:article-authors", args=[article.pk])
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url, {"limit": 2, "offset": 2})
+
+    assert response.status_code == 200
+    assert response.data["count"] == 5
+    assert [a["author_order"] for a in response.data["results"]] == [2, 3]
+    assert response.data["results"][0]["affiliations"][0]["country"]["code"]
+    article_queries = [
+        q for q in context.captured_queries if '"articles_article"' in q["sql"]
+    ]
+    assert len(article_queries) == 1  # The list, its ETag is derived from it.
+
+
+def test_authors_of_a_missing_article(api_client: APIClient):
+    response = api_client.get(reverse("api:article-authors", args=[0]))
+
+    assert response.status_code == 404
+
+
+def test_command_builds_missing_lists():
+    article = create_full_article(authors=3)
+    ArticleAuthorList.objects.all().delete()
+
+    call_command("build_author_lists")
+
+    assert ArticleAuthorList.objects.get(article_id=article).authors == 3
@@ -0,0 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.ingest import ingest_batch
+from scoap3.articles.models import Article
+from scoap3.articles.tests.factories import ArticleFactory
+from scoap3.articles.tests.test_ingest import article_document
+from scoap3.authors.models import Author
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.models import Funder, PublicationInfo
+from scoap3.misc.tests.factories import AffiliationFactory, CountryFactory
+from scoap3.utils.cache import article_scope, get_versions, model_scope
+
+pytestmark = pytest.mark.django_db
+
+
+def selects(context):
+    return [q for q in context.captured_queries if q["sql"].startswith("SELECT")]
+
+
+def test_detail_is_served_from_the_cache(api_client: APIClient):
+    article = ArticleFactory()
+    url = reverse("api:article-detail", args=[article.pk])
+    api_client.get(url)
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url)
+
+    assert response.status_code == 200
+    assert response.data["id"] == article.pk
+    assert selects(context) == []
+
+
+def test_writes_invalidate_the_article_only(api_client: APIClient):
+    article, other = ArticleFactory.create_batch(2)
+    url = reverse("api:article-detail", args=[article.pk])
+    api_client.get(url)
+    (other_version,) = get_versions([article_scope(other.pk)])
+
+    AuthorFactory(article_id=article, first_name="Added")
+
+    assert api_client.get(url).data["authors"][0]["first_name"] == "Added"
+    assert get_versions([article_scope(other.pk)]) == [other_version]
+
+
+def test_lists_follow_their_model(api_client: APIClient):
+    url = reverse("api:author-list")
+    assert api_client.get(url).data["results"] == []
+
+    author = AuthorFactory()
+
+    assert [a["id"] for a in api_client.get(url).data["results"]] == [author.pk]
+
+
+def test_shared_rows_invalidate_the_articles_nesting_them(
+    api_client: APIClient, django_capture_on_commit_callbacks
+):
+    # Country names are read from the reference cache, refreshed on commit.
+    with django_capture_on_commit_callbacks(execute=True):
+        affiliation = AffiliationFactory()
+        affiliation.author_id.add(AuthorFactory())
+    article = affiliation.author_id.get().article_id
+    url = reverse("api:article-detail", args=[article.pk])
+    api_client.get(url)
+    (article_version,) = get_versions([model_scope(type(article))])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        country = affiliation.country
+        country.name = "Renamed"
+        country.save()
+
+    country_data = api_client.get(url).data["authors"][0]["affiliations"][0]["country"]
+    assert country_data["name"] == "Renamed"
+    assert get_versions([model_scope(type(article))]) == [article_version]
+
+
+def test_article_writes_leave_related_models_alone():
+    article = ArticleFactory()
+    scopes = [model_scope(Author), model_scope(Funder)]
+    versions = get_versions(scopes)
+    (article_version,) = get_versions([model_scope(Article)])
+
+    article.title = "Renamed"
+    article.save()
+
+    assert get_versions(scopes) == versions
+    assert get_versions([model_scope(Article)]) != [article_version]
+
+
+def test_bulk_writes_invalidate_the_models_written():
+    CountryFactory(code="CH")
+    document = article_document()
+    ingest_batch([document])
+    scopes = [model_scope(Author), model_scope(Funder)]
+    versions = get_versions(scopes)
+    (version,) = get_versions([model_scope(PublicationInfo)])
+
+    document["publication_info"][0]["journal_volume"] = "841"
+    ingest_batch([document], upsert=True)
+
+    assert get_versions(scopes) == versions
+    assert get_versions([model_scope(PublicationInfo)]) != [version]
+
+
+def test_expanded_relations_follow_their_model(api_client: APIClient):
+    author = AuthorFactory()
+    url = reverse("api:author-list") + "?expand=article_id"
+    api_client.get(url)
+
+    author.article_id.title = "Renamed"
+    author.article_id.save()
+
+    assert api_client.get(url).data["results"][0]["article_id"]["title"] == "Renamed"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writes_outside_transactions_invalidate_at_once():
+    affiliation = AffiliationFactory()
+    (version,) = get_versions([model_scope(type(affiliation))])
+
+    def rename():
+        # A thread of its own, as a worker's first write.
+        try:
+            affiliation.value = "Renamed"
+            affiliation.save()
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(1) as executor:
+        executor.submit(rename).result()
+
+    assert get_versions([model_scope(type(affiliation))]) != [version]
+
+
+def test_m2m_changes_invalidate_both_sides(api_client: APIClient):
+    affiliation = AffiliationFactory()
+    url = reverse("api:affiliation-detail", args=[affiliation.pk])
+    assert api_client.get(url).data["author_id"] == []
+
+    author = AuthorFactory()
+    author.affiliation_set.add(affiliation)
+
+    assert api_client.get(url).data["author_id"] == [author.pk]
+
+
+class TestConditionalRequests:
+    def test_unchanged_detail_is_not_modified_without_queries(
+        self, api_client: APIClient
+    ):
+        article = ArticleFactory()
+        url = reverse("api:article-detail", args=[article.pk])
+        etag = api_client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert selects(context) == []
+
+    def test_changed_children_change_the_etag(self, api_client: APIClient):
+        article = ArticleFactory()
+        url = reverse("api:article-detail", args=[article.pk])
+        etag = api_client.get(url)["ETag"]
+
+        AuthorFactory(article_id=article)
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_list_etag_needs_no_aggregate(self, api_client: APIClient):
+        ArticleFactory.create_batch(3)
+        url = reverse("api:article-list")
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, {"page_size": 2})
+
+        assert response["ETag"]
+        assert not any("COUNT(" in q["sql"] for q in context.captured_queries)
+
+    def test_list_honours_if_modified_since(self, api_client: APIClient):
+        ArticleFactory.create_batch(2)
+        url = reverse("api:article-list")
+        last_modified = api_client.get(url)["Last-Modified"]
+
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == 304
+
+    def test_change_feed_and_export_are_conditional(
+        self, api_client: APIClient, settings
+    ):
+        settings.API_CHANGE_FEED_DELAY = 0
+        ArticleFactory()
+        for url in (reverse("api:change-list"), reverse("api:export-list")):
+            etag = api_client.get(url)["ETag"]
+
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            assert response.status_code == 304
+
+    def test_change_feed_etag_needs_no_aggregate(self, api_client: APIClient, settings):
+        settings.API_CHANGE_FEED_DELAY = 0
+        ArticleFactory.create_batch(3)
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(reverse("api:change-list"))
+
+        assert response["ETag"]
+        assert not any("COUNT(" in q["sql"] for q in context.captured_queries)
+
+    def test_unchanged_export_is_not_modified_without_queries(
+        self, api_client: APIClient
+    ):
+        ArticleFactory.create_batch(2)
+        url = reverse("api:export-list")
+        etag = api_client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert selects(context) == []
+
+    def test_changed_articles_change_the_export_etag(self, api_client: APIClient):
+        article = ArticleFactory()
+        url = reverse("api:export-list")
+        etag = api_client.get(url)["ETag"]
+
+        article.delete()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
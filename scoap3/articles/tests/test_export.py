@@ -0,0 +1,127 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.export import CSV_COLUMNS, export_articles, export_queryset
+from scoap3.articles.tests.factories import ArticleFactory, ArticleIdentifierFactory
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.reference import country_names
+from scoap3.misc.tests.factories import AffiliationFactory, PublicationInfoFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def create_article(journal="Physics Letters B", published=datetime.date(2023, 1, 1)):
+    article = ArticleFactory(publication_date=published)
+    ArticleIdentifierFactory(article_id=article)
+    PublicationInfoFactory(article_id=article, journal_title=journal)
+    author = AuthorFactory(article_id=article)
+    AffiliationFactory().author_id.add(author)
+    return article
+
+
+def read(chunks):
+    return "".join(chunks)
+
+
+class TestExportArticles:
+    def test_query_count_does_not_grow_within_a_chunk(
+        self, django_capture_on_commit_callbacks
+    ):
+        # Author lists are packed once the articles are committed.
+        with django_capture_on_commit_callbacks(execute=True):
+            create_article()
+        country_names()  # Loaded once per process, not per export.
+        with CaptureQueriesContext(connection) as few:
+            read(export_articles("ndjson", export_queryset()))
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(3):
+                create_article()
+        country_names()  # Reloaded after the new countries committed.
+        with CaptureQueriesContext(connection) as many:
+            read(export_articles("ndjson", export_queryset()))
+
+        assert len(many) == len(few)
+
+    def test_ndjson_has_nested_records(self):
+        article = create_article()
+
+        lines = read(export_articles("ndjson", export_queryset())).splitlines()
+
+        record = json.loads(lines[0])
+        assert record["id"] == article.pk
+        assert record["authors"][0]["affiliations"][0]["country"]["code"]
+
+    def test_csv_is_flat(self):
+        article = create_article()
+
+        rows = list(
+            csv.DictReader(io.StringIO(read(export_articles("csv", export_queryset()))))
+        )
+
+        assert list(rows[0]) == CSV_COLUMNS
+        assert rows[0]["doi"] == article.articleidentifier_set.get().identifier_value
+        assert rows[0]["journal"] == "Physics Letters B"
+
+    def test_jsonld_is_a_schema_org_graph(self):
+        article = create_article()
+        doi = article.articleidentifier_set.get().identifier_value
+
+        document = json.loads(read(export_articles("jsonld", export_queryset())))
+
+        assert document["@context"] == "https://schema.org"
+        (node,) = document["@graph"]
+        assert node["@type"] == "ScholarlyArticle"
+        assert node["@id"] == f"https://doi.org/{doi}"
+
+    def test_filters_by_date_and_journal(self):
+        kept = create_article()
+        create_article(journal="Nuclear Physics B")
+        create_article(published=datetime.date(2020, 1, 1))
+
+        queryset = export_queryset(
+            date_from=datetime.date(2022, 1, 1), journals=["Physics Letters B"]
+        )
+
+        assert list(queryset.values_list("pk", flat=True)) == [kept.pk]
+
+
+class TestArticleExportViewSet:
+    def test_streams_gzipped_export(self, api_client: APIClient):
+        article = create_article()
+
+        response = api_client.get(
+            reverse("api:export-list"),
+            {"output": "ndjson"},
+            HTTP_ACCEPT_ENCODING="gzip, deflate",
+        )
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Encoding"] == "gzip"
+        body = gzip.decompress(b"".join(response.streaming_content)).decode()
+        assert json.loads(body)["id"] == article.pk
+
+    def test_rejects_unknown_output(self, api_client: APIClient):
+        response = api_client.get(reverse("api:export-list"), {"output": "xml"})
+
+        assert response.status_code == 400
+
+
+def test_command_writes_gzipped_file(tmp_path):
+    create_article()
+    path = tmp_path / "articles.csv.gz"
+
+    call_command("export_articles", "--output-format=csv", f"--output={path}")
+
+    with gzip.open(path, "rt") as file:
+        assert len(list(csv.reader(file))) == 2
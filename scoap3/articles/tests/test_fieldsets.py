@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.tests.test_views import create_full_article
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.tests.factories import AffiliationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def get(client, url, **params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return response, [q["sql"] for q in context.captured_queries]
+
+
+def test_fields_select_the_columns_and_relations(api_client: APIClient):
+    create_full_article()
+
+    response, queries = get(api_client, reverse("api:article-list"), fields="id,title")
+
+    assert list(response.data["results"][0]) == ["id", "title"]
+    # The page, without prefetches, its ETag derived from it.
+    (page,) = [sql for sql in queries if sql.startswith("SELECT")]
+    assert '"abstract"' not in page
+
+
+def test_omit_drops_fields(api_client: APIClient):
+    article = create_full_article()
+    url = reverse("api:article-detail", args=[article.pk])
+
+    response, queries = get(api_client, url, omit="abstract,authors")
+
+    assert "abstract" not in response.data
+    assert "authors" not in response.data
+    assert not any("authors_author" in sql for sql in queries)
+
+
+def test_expand_nests_related_objects(api_client: APIClient):
+    affiliation = AffiliationFactory()
+    affiliation.author_id.add(AuthorFactory())
+
+    response, _ = get(
+        api_client, reverse("api:affiliation-list"), expand="country,author_id"
+    )
+
+    (data,) = response.data["results"]
+    assert data["country"]["code"] == affiliation.country.code
+    assert data["author_id"][0]["first_name"]
+
+
+def test_query_count_does_not_depend_on_the_page(api_client: APIClient):
+    AffiliationFactory().author_id.add(AuthorFactory())
+    url = reverse("api:affiliation-list")
+    _, few = get(api_client, url, expand="country")
+
+    for _ in range(3):
+        AffiliationFactory().author_id.add(AuthorFactory())
+    _, many = get(api_client, url, expand="country", page_size=10)
+
+    assert len(many) == len(few)
+
+
+@pytest.mark.parametrize(
+    "params", [{"fields": "id,unknown"}, {"omit": "unknown"}, {"expand": "title"}]
+)
+def test_rejects_unknown_fields(api_client: APIClient, params):
+    create_full_article()
+
+    response = api_client.get(reverse("api:article-list"), params)
+
+    assert response.status_code == 400
@@ -0,0 +1,356 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.ingest import RETRY_ERROR, ingest_batch
+from scoap3.articles.models import Article
+from scoap3.authors.models import Author
+from scoap3.misc.models import Affiliation, Funder
+from scoap3.misc.tests.factories import CountryFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def article_document(doi="10.1016/j.physletb.2023.137001", authors=2, country="CH"):
+    return {
+        "title": "Search for new physics",
+        "abstract": "We searched.",
+        "reception_date": "2023-01-01",
+        "acceptance_date": "2023-02-01",
+        "publication_date": "2023-03-01",
+        "first_online_date": "2023-03-01",
+        "identifiers": [{"identifier_type": "DOI", "identifier_value": doi}],
+        "authors": [
+            {
+                "first_name": f"Author{i}",
+                "last_name": "Physicist",
+                "email": f"author{i}@cern.ch",
+                "identifiers": [
+                    {
+                        "identifier_type": "ORCID",
+                        "identifier_value": f"0000-0000-0000-{i:04d}",
+                    }
+                ],
+                "affiliations": [
+                    {
+                        "value": "CERN, Geneva",
+                        "organization": "CERN",
+                        "country": country,
+                    }
+                ],
+            }
+            for i in range(authors)
+        ],
+        "publication_info": [
+            {
+                "journal_title": "Physics Letters B",
+                "journal_volume": "840",
+                "page_start": 1,
+                "page_end": 10,
+                "artid": "137001",
+                "volume_year": "2023",
+                "journal_issue_date": "2023-03-01",
+                "publisher": "Elsevier",
+            }
+        ],
+        "related_licenses": [
+            {"name": "CC-BY-4.0", "url": "https://creativecommons.org/licenses/by/4.0/"}
+        ],
+        "copyrights": [{"statement": "The authors", "holder": "Authors", "year": 2023}],
+        "funders": [
+            {
+                "funder_identifier": "SCOAP3",
+                "funder_name": "SCOAP3",
+                "award_number": "1",
+            }
+        ],
+        "collaborations": [{"name": "ATLAS", "experimental_collaboration_order": 0}],
+    }
+
+
+@pytest.fixture
+def country(db):
+    return CountryFactory(code="CH", name="Switzerland")
+
+
+class TestIngestBatch:
+    def test_creates_full_records(self, country):
+        results = ingest_batch([article_document(authors=3)])
+
+        assert results[0]["status"] == "created"
+        article = Article.objects.get(pk=results[0]["id"])
+        authors = Author.objects.filter(article_id=article).order_by("author_order")
+        assert [a.first_name for a in authors] == ["Author0", "Author1", "Author2"]
+        # Authors of one article sharing an affiliation share the row.
+        assert Affiliation.objects.get().author_id.count() == 3
+        assert article.related_licenses.get().name == "CC-BY-4.0"
+        assert Funder.objects.get().article_id.get() == article
+        assert article.publicationinfo_set.get().publisher.name == "Elsevier"
+
+    def test_query_count_does_not_depend_on_batch_size(self, country):
+        # Create the shared publisher, license, funder... rows up front.
+        ingest_batch([article_document(doi="warm-up", authors=1)])
+
+        with CaptureQueriesContext(connection) as small:
+            ingest_batch([article_document(doi="a", authors=1)])
+        with CaptureQueriesContext(connection) as large:
+            ingest_batch([article_document(doi=str(i), authors=20) for i in range(10)])
+
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_reports_invalid_records(self, country):
+        invalid = article_document()
+        del invalid["title"]
+
+        results = ingest_batch(
+            [invalid, article_document(), article_document(country="XX")]
+        )
+
+        assert [r["status"] for r in results] == ["invalid", "created", "invalid"]
+        assert "title" in results[0]["errors"]
+        assert results[2]["errors"] == {"country": ["Unknown code: XX"]}
+        assert Article.objects.count() == 1
+
+    def test_rejects_existing_identifiers(self, country):
+        ingest_batch([article_document(doi="a")])
+
+        results = ingest_batch([article_document(doi="a"), article_document(doi="a")])
+
+        assert [r["status"] for r in results] == ["invalid", "invalid"]
+        assert Article.objects.count() == 1
+
+    def test_concurrent_creations_are_retryable(self, country):
+        ingest_batch([article_document(doi="a")])
+
+        # Matched before the other batch committed the same identifier.
+        with mock.patch(
+            "scoap3.articles.ingest.match_documents", return_value=({0: None}, {})
+        ):
+            results = ingest_batch([article_document(doi="a")])
+
+        assert results == [
+            {
+                "index": 0,
+                "status": "invalid",
+                "errors": {"non_field_errors": [RETRY_ERROR]},
+            }
+        ]
+        assert Article.objects.count() == 1
+
+    def test_identifiers_are_locked_while_matching(self, country):
+        with CaptureQueriesContext(connection) as context:
+            ingest_batch([article_document(doi="a")])
+
+        sql = [q["sql"] for q in context.captured_queries]
+        lock = next(i for i, q in enumerate(sql) if "pg_advisory_xact_lock" in q)
+        match = next(i for i, q in enumerate(sql) if "articles_articleidentifier" in q)
+        assert lock < match
+
+
+class TestUpsert:
+    def test_deleted_matches_are_retryable(self, country):
+        document = article_document()
+        ingest_batch([document])
+
+        with mock.patch(
+            "scoap3.articles.ingest.match_documents", return_value=({0: 0}, {})
+        ):
+            results = ingest_batch([document], upsert=True)
+
+        assert results == [
+            {"index": 0, "status": "invalid", "errors": {"identifiers": [RETRY_ERROR]}}
+        ]
+
+    def test_unchanged_documents_are_not_written(self, country):
+        documents = [article_document(doi=str(i), authors=5) for i in range(3)]
+        created = ingest_batch(documents)
+        before = Article.objects.order_by("id").values_list("updated_at", flat=True)
+        before = list(before)
+
+        with CaptureQueriesContext(connection) as single:
+            ingest_batch(documents[:1], upsert=True)
+        with CaptureQueriesContext(connection) as queries:
+            results = ingest_batch(documents, upsert=True)
+
+        assert [r["status"] for r in results] == ["unchanged"] * 3
+        assert [r["id"] for r in results] == [r["id"] for r in created]
+        writes = [
+            q["sql"]
+            for q in queries.captured_queries
+            if not q["sql"].startswith(("SELECT", "SAVEPOINT", "RELEASE"))
+        ]
+        assert writes == []
+        assert len(queries.captured_queries) == len(single.captured_queries)
+        after = Article.objects.order_by("id").values_list("updated_at", flat=True)
+        assert list(after) == before
+
+    def test_updates_only_changed_collections(self, country):
+        document = article_document(authors=2)
+        article_id = ingest_batch([document])[0]["id"]
+        author_ids = set(Author.objects.values_list("id", flat=True))
+
+        document["title"] = "Search for newer physics"
+        document["copyrights"][0]["year"] = 2024
+        results = ingest_batch([document, article_document(doi="b")], upsert=True)
+
+        assert [r["status"] for r in results] == ["updated", "created"]
+        article = Article.objects.get(pk=article_id)
+        assert article.title == "Search for newer physics"
+        assert article.copyright_set.get().year == 2024
+        assert (
+            set(Author.objects.filter(article_id=article).values_list("id", flat=True))
+            == author_ids
+        )
+
+    def test_replaces_changed_authors(self, country):
+        document = article_document(authors=2)
+        article_id = ingest_batch([document])[0]["id"]
+
+        document["authors"][1]["affiliations"][0]["organization"] = "EPFL"
+        ingest_batch([document], upsert=True)
+
+        authors = Author.objects.filter(article_id=article_id).order_by("author_order")
+        assert [a.affiliation_set.get().organization for a in authors] == [
+            "CERN",
+            "EPFL",
+        ]
+        # The affiliation of the replaced authors is not left behind.
+        assert Affiliation.objects.count() == 2
+
+
+class TestReplaceAuthorList:
+    def put(self, client, article_id, authors):
+        url = reverse("api:article-authors", args=[article_id])
+        return client.put(url, authors, format="json")
+
+    def author_ids(self, article_id):
+        authors = Author.objects.filter(article_id=article_id).order_by("author_order")
+        return list(authors.values_list("id", flat=True))
+
+    def test_correction_writes_only_the_differences(
+        self, api_client: APIClient, country
+    ):
+        document = article_document(authors=300)
+        article_id = ingest_batch([document])[0]["id"]
+        before = self.author_ids(article_id)
+        for author in document["authors"][100:105]:
+            author["first_name"] += "-Corrected"
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.put(api_client, article_id, document["authors"])
+
+        assert response.status_code == 200
+        assert response.data == {"created": 0, "updated": 5, "deleted": 0}
+        assert self.author_ids(article_id) == before
+        author_writes = [
+            q["sql"]
+            for q in context.captured_queries
+            if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+            and '"authors_author' in q["sql"]
+        ]
+        assert len(author_writes) == 1
+        assert author_writes[0].startswith('UPDATE "authors_author"')
+        corrected = Author.objects.filter(first_name__endswith="-Corrected")
+        assert corrected.count() == 5
+
+    def test_unchanged_list_is_not_written(self, api_client: APIClient, country):
+        document = article_document(authors=3)
+        article_id = ingest_batch([document])[0]["id"]
+        updated_at = Article.objects.get(pk=article_id).updated_at
+
+        response = self.put(api_client, article_id, document["authors"])
+
+        assert response.data == {"created": 0, "updated": 0, "deleted": 0}
+        assert Article.objects.get(pk=article_id).updated_at == updated_at
+
+    def test_authors_are_matched_by_orcid_when_reordered(
+        self, api_client: APIClient, country
+    ):
+        document = article_document(authors=3)
+        article_id = ingest_batch([document])[0]["id"]
+        first, second, third = self.author_ids(article_id)
+        authors = document["authors"]
+
+        self.put(api_client, article_id, [authors[2], authors[0], authors[1]])
+
+        assert self.author_ids(article_id) == [third, first, second]
+
+    def test_authors_without_orcid_are_matched_by_name_and_order(
+        self, api_client: APIClient, country
+    ):
+        document = article_document(authors=3)
+        for author in document["authors"]:
+            author["identifiers"] = []
+        article_id = ingest_batch([document])[0]["id"]
+        first, _, third = self.author_ids(article_id)
+        authors = document["authors"]
+        authors[0]["first_name"] = " AUTHOR0 "
+        authors[1]["first_name"] = "Replacement"
+
+        response = self.put(api_client, article_id, authors)
+
+        assert response.data == {"created": 1, "updated": 1, "deleted": 1}
+        assert self.author_ids(article_id)[0] == first
+        assert self.author_ids(article_id)[2] == third
+
+    def test_affiliations_are_relinked_and_orphans_dropped(
+        self, api_client: APIClient, country
+    ):
+        document = article_document(authors=2)
+        article_id = ingest_batch([document])[0]["id"]
+        for author in document["authors"]:
+            author["affiliations"][0]["organization"] = "EPFL"
+
+        self.put(api_client, article_id, document["authors"])
+
+        assert list(Affiliation.objects.values_list("organization", flat=True)) == [
+            "EPFL"
+        ]
+        assert Affiliation.objects.get().author_id.count() == 2
+
+    def test_rejects_unknown_countries(self, api_client: APIClient, country):
+        document = article_document(authors=1)
+        article_id = ingest_batch([document])[0]["id"]
+        document["authors"][0]["affiliations"][0]["country"] = "XX"
+
+        response = self.put(api_client, article_id, document["authors"])
+
+        assert response.status_code == 400
+        assert Affiliation.objects.get().country_id == "CH"
+
+    def test_missing_article(self, api_client: APIClient, country):
+        response = self.put(api_client, 0, article_document()["authors"])
+
+        assert response.status_code == 404
+
+
+class TestBulkEndpoint:
+    def test_bulk(self, api_client: APIClient, country):
+        response = api_client.post(
+            reverse("api:article-bulk"), [article_document()], format="json"
+        )
+
+        assert response.status_code == 200
+        assert response.data["results"][0]["status"] == "created"
+
+    def test_bulk_rejects_oversized_batch(self, api_client: APIClient, settings):
+        settings.API_INGEST_MAX_BATCH_SIZE = 1
+
+        response = api_client.post(reverse("api:article-bulk"), [{}, {}], format="json")
+
+        assert response.status_code == 400
+
+    def test_bulk_upsert(self, api_client: APIClient, country):
+        url = reverse("api:article-bulk")
+        api_client.post(url, [article_document()], format="json")
+
+        response = api_client.post(
+            f"{url}?mode=upsert", [article_document()], format="json"
+        )
+
+        assert response.status_code == 200
+        assert response.data["results"][0]["status"] == "unchanged"
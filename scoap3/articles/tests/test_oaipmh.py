@@ -0,0 +1,121 @@
+import base64
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from scoap3.articles.oaipmh import DC_NAMESPACE, OAI_NAMESPACE
+from scoap3.articles.tests.factories import ArticleFactory
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.tests.factories import PublicationInfoFactory
+
+pytestmark = pytest.mark.django_db
+
+NS = {"oai": OAI_NAMESPACE, "dc": DC_NAMESPACE}
+
+
+def harvest(client: Client, **params) -> ET.Element:
+    response = client.get(reverse("oai-pmh"), params)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/xml")
+    if response.streaming:
+        return ET.fromstring(b"".join(response.streaming_content))
+    return ET.fromstring(response.content)
+
+
+def error_code(root: ET.Element):
+    error = root.find("oai:error", NS)
+    return error.get("code") if error is not None else None
+
+
+class TestOAIPMH:
+    def test_identify(self, client: Client):
+        root = harvest(client, verb="Identify")
+
+        assert root.find("oai:Identify/oai:repositoryName", NS).text == "SCOAP3"
+
+    def test_list_records_paginates_with_resumption_token(self, client, settings):
+        settings.OAI_PMH_PAGE_SIZE = 2
+        articles = ArticleFactory.create_batch(5)
+        AuthorFactory(article_id=articles[0], last_name="Higgs")
+
+        identifiers = []
+        params = {"verb": "ListRecords", "metadataPrefix": "oai_dc"}
+        while True:
+            root = harvest(client, **params)
+            records = root.findall("oai:ListRecords/oai:record", NS)
+            assert len(records) <= 2
+            identifiers += [
+                r.find("oai:header/oai:identifier", NS).text for r in records
+            ]
+            token = root.find("oai:ListRecords/oai:resumptionToken", NS)
+            if token is None or not token.text:
+                break
+            params = {"verb": "ListRecords", "resumptionToken": token.text}
+
+        # Adding the author moved the first article to the end of the list.
+        expected = [f"oai:scoap3.org:{a.pk}" for a in articles[1:] + articles[:1]]
+        assert identifiers == expected
+        record = harvest(
+            client, verb="GetRecord", metadataPrefix="oai_dc", identifier=expected[-1]
+        )
+        assert record.find(".//dc:creator", NS).text.startswith("Higgs, ")
+
+    def test_list_identifiers_by_journal_set(self, client: Client):
+        ArticleFactory()
+        info = PublicationInfoFactory(journal_title="Nuclear Physics B")
+
+        root = harvest(
+            client,
+            verb="ListIdentifiers",
+            metadataPrefix="oai_dc",
+            set="journal:nuclear-physics-b",
+        )
+
+        headers = root.findall("oai:ListIdentifiers/oai:header", NS)
+        assert [h.find("oai:identifier", NS).text for h in headers] == [
+            f"oai:scoap3.org:{info.article_id.pk}"
+        ]
+        sets = harvest(client, verb="ListSets")
+        specs = [s.text for s in sets.findall(".//oai:setSpec", NS)]
+        assert "journal:nuclear-physics-b" in specs
+
+    @pytest.mark.parametrize(
+        "params, code",
+        [
+            ({}, "badVerb"),
+            ({"verb": "ListRecords"}, "badArgument"),
+            (
+                {"verb": "ListRecords", "metadataPrefix": "marc"},
+                "cannotDisseminateFormat",
+            ),
+            ({"verb": "ListRecords", "resumptionToken": "bogus"}, "badResumptionToken"),
+            ({"verb": "ListRecords", "metadataPrefix": "oai_dc"}, "noRecordsMatch"),
+            (
+                {"verb": "GetRecord", "metadataPrefix": "oai_dc", "identifier": "x"},
+                "idDoesNotExist",
+            ),
+        ],
+    )
+    def test_errors(self, client: Client, params, code):
+        assert error_code(harvest(client, **params)) == code
+
+    @pytest.mark.parametrize(
+        "last",
+        [
+            ["x", 1],
+            ["2024-01-01T00:00:00+00:00", "abc"],
+            ["2024-01-01T00:00:00", 1],
+            [1, 1],
+        ],
+    )
+    def test_tokens_with_invalid_positions_are_bad(self, client: Client, last):
+        ArticleFactory()
+        payload = {"metadataPrefix": "oai_dc", "last": last}
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        root = harvest(client, verb="ListRecords", resumptionToken=token)
+
+        assert error_code(root) == "badResumptionToken"
@@ -0,0 +1,132 @@
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from opensearchpy.exceptions import ConnectionError, NotFoundError
+
+from scoap3.articles import reindex
+from scoap3.articles.models import (
+    ArticleIndexQueue,
+    ArticleReindex,
+    ArticleReindexStatus,
+)
+from scoap3.articles.search import sync_articles
+from scoap3.articles.tests.factories import ArticleFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def client():
+    client = mock.MagicMock()
+    client.indices.get_alias.side_effect = NotFoundError(404, "index_not_found")
+    client.indices.get.return_value = {}
+    with mock.patch("scoap3.articles.search.get_client", return_value=client):
+        with mock.patch("scoap3.articles.reindex.get_client", return_value=client):
+            yield client
+
+
+@pytest.fixture
+def loaded():
+    """Ids of the articles sent to bulk requests."""
+    ids = []
+
+    def bulk(actions, **kwargs):
+        ids.extend(a["_id"] for a in actions if a.get("_op_type") != "delete")
+
+    with mock.patch("scoap3.articles.reindex.bulk", side_effect=bulk):
+        yield ids
+
+
+class TestReindex:
+    def test_partitions_cover_all_articles(self, client, settings):
+        settings.SEARCH_REINDEX_PARTITION_SIZE = 2
+        articles = ArticleFactory.create_batch(5)
+
+        article_reindex = reindex.start_reindex()
+
+        partitions = reindex.pending_partitions(article_reindex)
+        assert [(p.start_id, p.end_id) for p in partitions] == [
+            (articles[0].pk, articles[1].pk),
+            (articles[2].pk, articles[3].pk),
+            (articles[4].pk, articles[4].pk),
+        ]
+        body = client.indices.create.call_args.kwargs["body"]
+        assert body["settings"]["refresh_interval"] == "-1"
+
+    def test_resumes_from_checkpoint(self, client, loaded, settings):
+        settings.SEARCH_INDEX_BATCH_SIZE = 2
+        articles = ArticleFactory.create_batch(5)
+        partition = reindex.pending_partitions(reindex.start_reindex())[0]
+
+        with mock.patch(
+            "scoap3.articles.reindex.bulk",
+            side_effect=[None, ConnectionError("N/A", "refused", None)],
+        ):
+            with pytest.raises(ConnectionError):
+                reindex.load_partition(partition)
+        partition.refresh_from_db()
+        assert partition.next_id == articles[2].pk
+
+        reindex.load_partition(partition)
+
+        assert loaded == [article.pk for article in articles[2:]]
+        assert partition.done
+
+    def test_swaps_alias_when_counts_match(self, client, loaded):
+        ArticleFactory.create_batch(3)
+        article_reindex = reindex.start_reindex()
+        client.count.return_value = {"count": 3}
+        client.indices.get_alias.side_effect = None
+        client.indices.get_alias.return_value = {"scoap3-test-articles-1": {}}
+
+        call_command("reindex_articles", "--sync")
+
+        article_reindex.refresh_from_db()
+        assert article_reindex.status == ArticleReindexStatus.DONE
+        actions = client.indices.update_aliases.call_args.kwargs["body"]["actions"]
+        assert actions == [
+            {"add": {"index": article_reindex.index, "alias": "scoap3-test-articles"}},
+            {
+                "remove": {
+                    "index": "scoap3-test-articles-1",
+                    "alias": "scoap3-test-articles",
+                }
+            },
+        ]
+
+    def test_keeps_alias_when_counts_differ(self, client, loaded):
+        ArticleFactory.create_batch(3)
+        ArticleIndexQueue.objects.all().delete()
+        article_reindex = reindex.start_reindex()
+        client.count.return_value = {"count": 1}
+
+        for partition in reindex.pending_partitions(article_reindex):
+            reindex.load_partition(partition)
+        with pytest.raises(reindex.ReindexError):
+            reindex.finish_reindex(article_reindex)
+
+        assert article_reindex.status == ArticleReindexStatus.FAILED
+        client.indices.update_aliases.assert_not_called()
+
+    def test_changes_are_written_to_the_index_being_built(self, client):
+        article = ArticleFactory()
+        article_reindex = reindex.start_reindex()
+
+        with mock.patch("scoap3.articles.search.helpers.bulk") as bulk:
+            bulk.return_value = (1, [])
+            sync_articles([article.pk])
+
+        actions = bulk.call_args.args[1]
+        assert [a["_index"] for a in actions] == [article_reindex.index]
+        assert actions[0]["_version_type"] == "external_gte"
+
+    def test_command_resumes_running_reindex(self, client, loaded):
+        ArticleFactory()
+        article_reindex = reindex.start_reindex()
+        client.count.return_value = {"count": 1}
+
+        call_command("reindex_articles", "--sync")
+
+        assert ArticleReindex.objects.get() == article_reindex
+        assert len(loaded) == 1
@@ -0,0 +1,111 @@
+import datetime
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.models import Article, PublicationRollup
+from scoap3.articles.rollups import LAST_REFRESH, refresh_rollups
+from scoap3.articles.shares import recompute_shares
+from scoap3.articles.tests.factories import ArticleFactory
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.models import ArticleArxivCategory, Publisher
+from scoap3.misc.tests.factories import (
+    AffiliationFactory,
+    CountryFactory,
+    PublicationInfoFactory,
+    PublisherFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_last_refresh():
+    cache.delete(LAST_REFRESH)
+
+
+@pytest.fixture
+def published():
+    elsevier = PublisherFactory(name="Elsevier")
+    for year, journal, country in (
+        (2022, "Physics Letters B", "CH"),
+        (2023, "Physics Letters B", "CH"),
+        (2023, "Nuclear Physics B", "FR"),
+    ):
+        article = ArticleFactory(publication_date=datetime.date(year, 6, 1))
+        PublicationInfoFactory(
+            article_id=article, journal_title=journal, publisher=elsevier
+        )
+        ArticleArxivCategory.objects.create(
+            article_id=article, category="hep-ph", primary=True
+        )
+        author = AuthorFactory(article_id=article)
+        AffiliationFactory(country=CountryFactory(code=country)).author_id.add(author)
+    recompute_shares(Article.objects.values_list("pk", flat=True))
+    refresh_rollups()
+
+
+class TestRefreshRollups:
+    def test_skips_refresh_without_changes(self, published):
+        assert not refresh_rollups()
+
+        ArticleFactory(publication_date=datetime.date(2024, 1, 1))
+
+        assert refresh_rollups()
+        assert PublicationRollup.objects.filter(year=2024, journal="").exists()
+
+    def test_refreshes_after_share_changes(self, published):
+        recompute_shares(Article.objects.values_list("pk", flat=True))
+
+        assert refresh_rollups()
+
+    def test_share_computation_refreshes_the_rollups(self, published):
+        cache.delete(LAST_REFRESH)
+
+        call_command("compute_country_shares")
+
+        assert not refresh_rollups()
+
+    def test_refreshes_after_publisher_renames(self, published):
+        publisher = Publisher.objects.get()
+        publisher.name = "Elsevier B.V."
+        publisher.save()
+
+        assert refresh_rollups()
+        assert PublicationRollup.objects.filter(publisher="Elsevier B.V.").exists()
+
+
+class TestRollupViewSets:
+    def test_publications_by_year(self, api_client: APIClient, published):
+        response = api_client.get(reverse("api:dashboard-publication-list"))
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [
+            {"year": 2022, "articles": 1},
+            {"year": 2023, "articles": 2},
+        ]
+        assert "public" in response["Cache-Control"]
+        assert "Last-Modified" in response
+
+    def test_categories_are_public(self, client, published):
+        response = client.get(
+            reverse("api:dashboard-category-list"), {"year_from": 2023}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [
+            {"year": 2023, "category": "hep-ph", "articles": 2}
+        ]
+
+    def test_countries_filtered_by_journal(self, api_client: APIClient, published):
+        response = api_client.get(
+            reverse("api:dashboard-country-list"),
+            {"group_by": "country", "journal": "Physics Letters B"},
+        )
+
+        assert response.json()["results"] == [
+            {"country": "CH", "articles": 2.0, "article_count": 2}
+        ]
@@ -0,0 +1,119 @@
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from opensearchpy.exceptions import ConnectionError
+from rest_framework.test import APIClient
+
+from scoap3.articles.documents import article_document, document_queryset
+from scoap3.articles.search import FACETS, build_search
+from scoap3.articles.tests.factories import ArticleFactory, ArticleIdentifierFactory
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.tests.factories import (
+    AffiliationFactory,
+    CountryFactory,
+    PublicationInfoFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def search_response(hits=(), buckets=None):
+    buckets = buckets or {}
+    return {
+        "hits": {
+            "total": {"value": len(hits), "relation": "eq"},
+            "hits": [{"_source": hit, "_score": 1.0} for hit in hits],
+        },
+        "aggregations": {
+            name: {"values": {"buckets": buckets.get(name, [])}}
+            for name, _, _ in FACETS
+        },
+    }
+
+
+@pytest.fixture
+def client_mock():
+    with mock.patch("scoap3.articles.search.get_client") as get_client:
+        yield get_client.return_value
+
+
+class TestArticleDocument:
+    def test_denormalizes_related_rows(self, django_assert_num_queries):
+        article = ArticleFactory(title="Higgs boson")
+        ArticleIdentifierFactory(article_id=article, identifier_value="10.1/x")
+        PublicationInfoFactory(article_id=article, publisher__name="Elsevier")
+        switzerland = CountryFactory(code="CH")
+        for order in range(2):
+            author = AuthorFactory(
+                article_id=article, author_order=order, first_name="Ada"
+            )
+            AffiliationFactory(country=switzerland, organization="CERN").author_id.add(
+                author
+            )
+
+        with django_assert_num_queries(11):
+            document = article_document(document_queryset().get(pk=article.pk))
+
+        assert document["title"] == "Higgs boson"
+        assert document["dois"] == ["10.1/x"]
+        assert document["author_count"] == 2
+        assert document["countries"] == ["CH"]
+        assert document["organizations"] == ["CERN"]
+        assert document["journals"] == ["Physics Letters B"]
+        assert document["publishers"] == ["Elsevier"]
+        assert document["year"] == article.publication_date.year
+
+
+class TestBuildSearch:
+    def test_facets_ignore_their_own_filter(self):
+        body = build_search(filters={"country": ["CH"], "journal": ["JHEP"]})
+
+        country_filters = body["aggs"]["country"]["filter"]["bool"]["filter"]
+        assert country_filters == [{"terms": {"journals.raw": ["JHEP"]}}]
+        assert body["post_filter"]["bool"]["filter"] == [
+            {"terms": {"countries": ["CH"]}},
+            {"terms": {"journals.raw": ["JHEP"]}},
+        ]
+
+    def test_sorts_by_relevance_only_with_a_query(self):
+        assert build_search(query="higgs")["sort"][0] == "_score"
+        assert build_search()["sort"][0] == {"publication_date": "desc"}
+
+
+class TestArticleSearchViewSet:
+    def test_search(self, api_client: APIClient, client_mock):
+        client_mock.search.return_value = search_response(
+            hits=[{"id": 1, "title": "Higgs boson"}],
+            buckets={"country": [{"key": "CH", "doc_count": 1}]},
+        )
+
+        response = api_client.get(
+            reverse("api:search-list"),
+            {"q": "higgs", "country": ["CH", "FR"], "page": 2, "page_size": 5},
+        )
+
+        assert response.status_code == 200
+        assert response.data["count"] == 1
+        assert response.data["results"][0]["title"] == "Higgs boson"
+        assert response.data["facets"]["country"] == [{"value": "CH", "count": 1}]
+        body = client_mock.search.call_args.kwargs["body"]
+        assert body["from"] == 5
+        assert {"terms": {"countries": ["CH", "FR"]}} in body["post_filter"]["bool"][
+            "filter"
+        ]
+
+    def test_rejects_pages_past_the_result_window(self, api_client, client_mock):
+        response = api_client.get(
+            reverse("api:search-list"), {"page": 1000, "page_size": 100}
+        )
+
+        assert response.status_code == 400
+        client_mock.search.assert_not_called()
+
+    def test_unavailable(self, api_client: APIClient, client_mock):
+        client_mock.search.side_effect = ConnectionError("N/A", "refused", None)
+
+        response = api_client.get(reverse("api:search-list"))
+
+        assert response.status_code == 503
@@ -0,0 +1,145 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.models import Article, ArticleCountryShare
+from scoap3.articles.shares import pending_recomputes, recompute_shares
+from scoap3.articles.tests.factories import ArticleFactory
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.tests.factories import (
+    AffiliationFactory,
+    CountryFactory,
+    PublicationInfoFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def shares(article):
+    return dict(
+        ArticleCountryShare.objects.filter(article_id=article).values_list(
+            "country", "share"
+        )
+    )
+
+
+def affiliated_author(article, *countries):
+    author = AuthorFactory(article_id=article)
+    for country in countries:
+        AffiliationFactory(country=CountryFactory(code=country)).author_id.add(author)
+    return author
+
+
+class TestRecomputeShares:
+    def test_splits_article_between_authors_and_affiliations(self):
+        article = ArticleFactory(publication_date=datetime.date(2023, 5, 1))
+        affiliated_author(article, "CH")
+        affiliated_author(article, "CH", "FR")
+        # Authors without affiliations are not counted.
+        AuthorFactory(article_id=article)
+        info = PublicationInfoFactory(article_id=article)
+
+        recompute_shares([article.pk])
+
+        assert shares(article) == {"CH": 0.75, "FR": 0.25}
+        row = ArticleCountryShare.objects.get(article_id=article, country="CH")
+        assert (row.year, row.journal_title, row.publisher_id) == (
+            2023,
+            info.journal_title,
+            info.publisher_id,
+        )
+
+    def test_follows_affiliation_changes(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            article = ArticleFactory()
+            author = affiliated_author(article, "CH")
+        assert shares(article) == {"CH": 1.0}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            AffiliationFactory(country=CountryFactory(code="DE")).author_id.add(author)
+
+        assert shares(article) == {"CH": 0.5, "DE": 0.5}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            author.delete()
+
+        assert shares(article) == {}
+
+    def test_recomputes_once_per_transaction(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            article = ArticleFactory()
+            for _ in range(5):
+                affiliated_author(article, "CH")
+
+        (recompute,) = [c for c in callbacks if c == pending_recomputes.run]
+        recompute()
+        assert shares(article) == {"CH": 1.0}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follows_writes_outside_transactions(self):
+        def write():
+            # A thread of its own, as a worker's first write.
+            try:
+                article = ArticleFactory()
+                affiliated_author(article, "CH")
+                return article
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(1) as executor:
+            article = executor.submit(write).result()
+
+        assert shares(article) == {"CH": 1.0}
+
+    def test_command_backfills_all_articles(self):
+        articles = ArticleFactory.create_batch(3)
+        for article in articles:
+            affiliated_author(article, "CH")
+        ArticleCountryShare.objects.all().delete()
+
+        call_command("compute_country_shares")
+
+        assert ArticleCountryShare.objects.count() == 3
+
+
+class TestArticleCountryShareViewSet:
+    @pytest.fixture
+    def published(self):
+        for year, countries in ((2022, ["CH"]), (2023, ["CH", "FR"]), (2023, ["FR"])):
+            article = ArticleFactory(publication_date=datetime.date(year, 1, 1))
+            PublicationInfoFactory(article_id=article)
+            for country in countries:
+                affiliated_author(article, country)
+        recompute_shares(Article.objects.values_list("pk", flat=True))
+
+    def test_groups_by_country_and_year(self, api_client: APIClient, published):
+        response = api_client.get(reverse("api:country-share-list"))
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [
+            {"country": "CH", "year": 2022, "articles": 1.0, "article_count": 1},
+            {"country": "CH", "year": 2023, "articles": 0.5, "article_count": 1},
+            {"country": "FR", "year": 2023, "articles": 1.5, "article_count": 2},
+        ]
+
+    def test_filters_and_groups_by_journal(self, api_client: APIClient, published):
+        response = api_client.get(
+            reverse("api:country-share-list"),
+            {"group_by": ["journal"], "year": 2023, "country": "FR"},
+        )
+
+        assert response.json()["results"] == [
+            {"journal": "Physics Letters B", "articles": 1.5, "article_count": 2}
+        ]
+
+    def test_rejects_unknown_dimension(self, api_client: APIClient):
+        response = api_client.get(
+            reverse("api:country-share-list"), {"group_by": "author"}
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,76 @@
+import pytest
+
+from scoap3.articles.models import Article, ArticleTombstone
+from scoap3.articles.tests.factories import ArticleFactory, ArticleIdentifierFactory
+from scoap3.authors.tests.factories import AuthorFactory, AuthorIdentifierFactory
+from scoap3.misc.tests.factories import AffiliationFactory, InstitutionIdentifierFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def updated_at(article):
+    return Article.objects.values_list("updated_at", flat=True).get(pk=article.pk)
+
+
+class TestChangeTracking:
+    def test_child_edit_bumps_article(self):
+        author = AuthorFactory()
+        before = updated_at(author.article_id)
+
+        author.first_name = "Changed"
+        author.save()
+
+        assert updated_at(author.article_id) > before
+
+    def test_affiliation_link_bumps_article(self):
+        author = AuthorFactory()
+        before = updated_at(author.article_id)
+
+        AffiliationFactory().author_id.add(author)
+
+        assert updated_at(author.article_id) > before
+
+    def test_author_identifier_edit_bumps_article(self):
+        identifier = AuthorIdentifierFactory()
+        article = identifier.author_id.article_id
+        before = updated_at(article)
+
+        identifier.delete()
+
+        assert updated_at(article) > before
+
+    def test_institution_identifier_edit_bumps_article(self):
+        author = AuthorFactory()
+        affiliation = AffiliationFactory()
+        affiliation.author_id.add(author)
+        before = updated_at(author.article_id)
+
+        identifier = InstitutionIdentifierFactory(affiliation_id=affiliation)
+
+        assert updated_at(author.article_id) > before
+        before = updated_at(author.article_id)
+        identifier.delete()
+        assert updated_at(author.article_id) > before
+
+    def test_child_deletion_records_tombstone(self):
+        identifier = ArticleIdentifierFactory()
+        pk = identifier.pk
+
+        identifier.delete()
+
+        tombstone = ArticleTombstone.objects.get()
+        assert tombstone.model == "articles.articleidentifier"
+        assert tombstone.object_id == pk
+        assert tombstone.article_id == identifier.article_id_id
+
+    def test_article_deletion_records_single_tombstone(self):
+        article = ArticleFactory()
+        AuthorIdentifierFactory(author_id=AuthorFactory(article_id=article))
+        ArticleIdentifierFactory(article_id=article)
+        pk = article.pk
+
+        article.delete()
+
+        assert list(ArticleTombstone.objects.values_list("model", "object_id")) == [
+            ("articles.article", pk)
+        ]
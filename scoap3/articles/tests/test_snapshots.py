@@ -0,0 +1,89 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from scoap3.articles.snapshots import write_snapshot
+from scoap3.articles.tests.factories import ArticleFactory
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.tests.factories import AffiliationFactory, PublicationInfoFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def storage(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.SNAPSHOT_PARTITION_SIZE = 2
+
+
+def read_table(path):
+    with default_storage.open(path) as file:
+        return pq.read_table(file)
+
+
+@pytest.fixture
+def articles():
+    articles = []
+    for _ in range(5):
+        article = ArticleFactory()
+        PublicationInfoFactory(article_id=article)
+        AffiliationFactory().author_id.add(AuthorFactory(article_id=article))
+        articles.append(article)
+    return articles
+
+
+def test_writes_partitions_of_articles(articles):
+    manifest = write_snapshot()
+
+    assert len(manifest["partitions"]) == 3
+    ids, authors = [], 0
+    for partition in manifest["partitions"]:
+        ids += read_table(partition["files"]["articles"]).column("id").to_pylist()
+        authors += read_table(partition["files"]["authors"]).num_rows
+    assert sorted(ids) == [article.pk for article in articles]
+    assert authors == 5
+
+    info = read_table(manifest["partitions"][0]["files"]["publication_info"])
+    assert pa.types.is_dictionary(info.schema.field("journal_title").type)
+    assert read_table(manifest["countries"]).num_rows == 5
+
+
+def test_rewrites_only_changed_partitions(articles):
+    first = write_snapshot()
+    changed = articles[-1]
+    changed.title = "Changed"
+    changed.save()
+
+    second = write_snapshot()
+
+    rewritten = [
+        new["start_id"]
+        for old, new in zip(first["partitions"], second["partitions"])
+        if new["files"] != old["files"]
+    ]
+    assert rewritten == [changed.pk // 2 * 2]
+    old_files = next(
+        p["files"] for p in first["partitions"] if p["start_id"] == rewritten[0]
+    )
+    assert not any(default_storage.exists(path) for path in old_files.values())
+
+
+def test_drops_emptied_partitions(articles):
+    write_snapshot()
+    articles[-1].delete()
+
+    manifest = write_snapshot()
+
+    assert [p["start_id"] for p in manifest["partitions"]] == sorted(
+        {article.pk // 2 * 2 for article in articles[:-1]}
+    )
+
+
+def test_command_rewrites_everything_with_full(articles, capsys):
+    write_snapshot()
+
+    call_command("snapshot_articles", "--full")
+
+    assert "Wrote 3 of 3 partitions." in capsys.readouterr().out
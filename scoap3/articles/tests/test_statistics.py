@@ -0,0 +1,84 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from scoap3.articles.models import Article, ArticleCountryShare
+from scoap3.articles.shares import recompute_shares
+from scoap3.articles.statistics import funder_shares, rebuild_shares
+from scoap3.articles.tests.factories import ArticleFactory
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.models import Funder
+from scoap3.misc.reference import country_names
+from scoap3.misc.tests.factories import AffiliationFactory, CountryFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def all_shares():
+    return {
+        (article_id, country): pytest.approx(share)
+        for article_id, country, share in ArticleCountryShare.objects.values_list(
+            "article_id", "country", "share"
+        )
+    }
+
+
+@pytest.fixture
+def corpus():
+    countries = [CountryFactory(code=code) for code in ("CH", "DE", "FR")]
+    affiliations = [AffiliationFactory(country=country) for country in countries]
+    for number in range(7):
+        article = ArticleFactory()
+        for order in range(number % 4):
+            author = AuthorFactory(article_id=article, author_order=order)
+            # Every other article has authors with two affiliations.
+            for offset in range(1 + number % 2):
+                affiliations[(order + offset) % 3].author_id.add(author)
+        # An author without affiliation.
+        AuthorFactory(article_id=article, author_order=9)
+
+
+def test_rebuild_matches_incremental_recompute(corpus, settings):
+    settings.STATISTICS_CHUNK_SIZE = 3
+    recompute_shares(Article.objects.values_list("pk", flat=True))
+    expected = all_shares()
+    ArticleCountryShare.objects.all().delete()
+
+    assert rebuild_shares() == 7
+
+    assert all_shares() == expected
+
+
+def test_rebuild_sees_countries_missing_from_the_reference_cache(corpus):
+    country_names()
+    author = AuthorFactory()
+    AffiliationFactory(country=CountryFactory(code="US")).author_id.add(author)
+
+    rebuild_shares()
+
+    assert all_shares()[(author.article_id_id, "US")] == pytest.approx(1)
+
+
+def test_funder_shares_count_articles_once_per_funder(corpus):
+    rebuild_shares()
+    articles = Article.objects.filter(author__affiliation__isnull=False).distinct()
+    first, second = articles[:2]
+    for award in ("1", "2"):
+        funder = Funder.objects.create(
+            funder_identifier="", funder_name="SNSF", award_number=award
+        )
+        funder.article_id.add(first, second)
+
+    totals = funder_shares()
+
+    assert [funder for funder, _, _ in totals] == ["SNSF"] * len(totals)
+    assert sum(articles for _, _, articles in totals) == pytest.approx(2)
+
+
+def test_benchmark_results_match(corpus):
+    out = StringIO()
+
+    call_command("benchmark_country_shares", stdout=out)
+
+    assert "The results match." in out.getvalue()
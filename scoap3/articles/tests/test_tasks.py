@@ -0,0 +1,98 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from scoap3.articles.models import ArticleIndexQueue
+from scoap3.articles.search import sync_articles
+from scoap3.articles.tasks import FLUSH_SCHEDULED, flush_index_queue
+from scoap3.articles.tests.factories import ArticleFactory
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.tests.factories import AffiliationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_flush_flag():
+    cache.delete(FLUSH_SCHEDULED)
+
+
+class TestQueueForIndexing:
+    def test_many_child_changes_queue_the_article_once(
+        self, apply_async, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                article = ArticleFactory()
+                affiliation = AffiliationFactory()
+                for order in range(50):
+                    author = AuthorFactory(article_id=article, author_order=order)
+                    affiliation.author_id.add(author)
+
+        assert list(ArticleIndexQueue.objects.values_list("article_id", flat=True)) == [
+            article.pk
+        ]
+        apply_async.assert_called_once()
+
+    def test_one_flush_per_latency_window(
+        self, apply_async, django_capture_on_commit_callbacks
+    ):
+        for _ in range(3):
+            with django_capture_on_commit_callbacks(execute=True):
+                ArticleFactory()
+
+        apply_async.assert_called_once()
+
+
+class TestFlushIndexQueue:
+    def test_flushes_queued_articles(self):
+        articles = ArticleFactory.create_batch(3)
+
+        with mock.patch("scoap3.articles.tasks.sync_articles") as sync:
+            assert flush_index_queue() == 3
+
+        assert set(sync.call_args.args[0]) == {article.pk for article in articles}
+        assert not ArticleIndexQueue.objects.exists()
+
+    def test_keeps_articles_queued_again_during_the_flush(self):
+        article = ArticleFactory()
+
+        def touch(article_ids):
+            ArticleIndexQueue.objects.update(queued_at=timezone.now())
+
+        with mock.patch("scoap3.articles.tasks.sync_articles", side_effect=touch):
+            flush_index_queue()
+
+        assert ArticleIndexQueue.objects.get().article_id == article.pk
+
+    def test_runs_again_while_batches_are_full(self, settings):
+        settings.SEARCH_INDEX_BATCH_SIZE = 2
+        ArticleFactory.create_batch(3)
+
+        with mock.patch("scoap3.articles.tasks.sync_articles"), mock.patch.object(
+            flush_index_queue, "delay"
+        ) as delay:
+            assert flush_index_queue() == 2
+
+        delay.assert_called_once()
+        assert ArticleIndexQueue.objects.count() == 1
+
+
+class TestSyncArticles:
+    def test_indexes_and_deletes_in_one_request(self):
+        article = ArticleFactory()
+
+        with mock.patch("scoap3.articles.search.get_client") as get_client, mock.patch(
+            "scoap3.articles.search.helpers.bulk", return_value=(1, [])
+        ) as bulk:
+            get_client.return_value.indices.get_alias.return_value = {"articles-1": {}}
+            sync_articles([article.pk, 0])
+
+        actions = bulk.call_args.args[1]
+        assert [(a.get("_op_type", "index"), a["_id"]) for a in actions] == [
+            ("index", article.pk),
+            ("delete", 0),
+        ]
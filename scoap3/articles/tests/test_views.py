@@ -0,0 +1,192 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.models import Article, ArticleTombstone
+from scoap3.articles.tests.factories import ArticleFactory, ArticleIdentifierFactory
+from scoap3.authors.tests.factories import AuthorFactory, AuthorIdentifierFactory
+from scoap3.misc.reference import country_names
+from scoap3.misc.tests.factories import AffiliationFactory, PublicationInfoFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def create_full_article(authors=3):
+    article = ArticleFactory()
+    ArticleIdentifierFactory(article_id=article)
+    PublicationInfoFactory(article_id=article)
+    for order in reversed(range(authors)):
+        author = AuthorFactory(article_id=article, author_order=order)
+        AuthorIdentifierFactory(author_id=author)
+        AffiliationFactory().author_id.add(author)
+    return article
+
+
+def count_list_queries(client: APIClient, page_size: int) -> int:
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse("api:article-list"), {"page_size": page_size})
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+class TestArticleViewSet:
+    def test_retrieve_is_nested(self, api_client: APIClient):
+        article = create_full_article(authors=3)
+
+        response = api_client.get(reverse("api:article-detail", args=[article.pk]))
+
+        assert response.status_code == 200
+        data = response.data
+        assert [a["author_order"] for a in data["authors"]] == [0, 1, 2]
+        assert data["authors"][0]["identifiers"][0]["identifier_type"] == "ORCID"
+        assert data["authors"][0]["affiliations"][0]["country"]["code"]
+        assert data["publication_info"][0]["publisher"]["name"]
+        assert data["identifiers"][0]["identifier_value"]
+
+    def test_list_query_count_does_not_grow(
+        self, api_client: APIClient, django_capture_on_commit_callbacks
+    ):
+        # Author lists are packed once the articles are committed.
+        with django_capture_on_commit_callbacks(execute=True):
+            create_full_article(authors=1)
+        country_names()  # Loaded once per process, not per request.
+        few = count_list_queries(api_client, page_size=10)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(4):
+                create_full_article(authors=5)
+        country_names()  # Reloaded after the new countries committed.
+        many = count_list_queries(api_client, page_size=10)
+
+        assert few == many
+
+    def test_list_walks_all_pages_by_cursor(self, api_client: APIClient):
+        articles = ArticleFactory.create_batch(5)
+
+        seen = []
+        url = reverse("api:article-list") + "?page_size=2&ordering=updated_at"
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == 200
+            assert "count" not in response.data
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+
+        assert seen == [article.pk for article in articles]
+
+    def test_list_page_size_is_capped(self, api_client: APIClient, settings):
+        settings.API_MAX_PAGE_SIZE = 2
+        ArticleFactory.create_batch(3)
+
+        response = api_client.get(reverse("api:article-list"), {"page_size": 100})
+
+        assert len(response.data["results"]) == 2
+        assert response.data["next"]
+
+    def test_list_rejects_invalid_cursor(self, api_client: APIClient):
+        response = api_client.get(reverse("api:article-list"), {"cursor": "garbage"})
+
+        assert response.status_code == 404
+
+    def test_list_rejects_unknown_ordering(self, api_client: APIClient):
+        response = api_client.get(reverse("api:article-list"), {"ordering": "title"})
+
+        assert response.status_code == 400
+
+    def test_search_ranks_title_matches_first(self, api_client: APIClient):
+        in_abstract = ArticleFactory(
+            title="Dark matter", abstract="Neutrinos oscillate."
+        )
+        in_title = ArticleFactory(title="Neutrino oscillations", abstract="")
+        ArticleFactory(title="Dark energy", abstract="Cosmology.")
+
+        response = api_client.get(reverse("api:article-list"), {"search": "neutrino"})
+
+        assert response.status_code == 200
+        ids = [item["id"] for item in response.data["results"]]
+        assert ids == [in_title.pk, in_abstract.pk]
+
+    def test_search_walks_all_pages_by_cursor(self, api_client: APIClient):
+        articles = ArticleFactory.create_batch(5, title="Higgs boson", abstract="")
+
+        seen = []
+        url = reverse("api:article-list") + "?search=higgs&page_size=2"
+        while url:
+            response = api_client.get(url)
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+
+        assert seen == [article.pk for article in articles]
+
+    def test_search_follows_title_changes(self, api_client: APIClient):
+        article = ArticleFactory(title="Dark matter", abstract="")
+        article.title = "Gravitational waves"
+        article.save()
+        Article.objects.bulk_update([article], ["title"])
+
+        response = api_client.get(reverse("api:article-list"), {"search": "waves"})
+
+        assert [item["id"] for item in response.data["results"]] == [article.pk]
+        assert "search_vector" not in response.data["results"][0]
+
+    def test_rank_ordering_requires_search(self, api_client: APIClient):
+        response = api_client.get(reverse("api:article-list"), {"ordering": "rank"})
+
+        assert response.status_code == 400
+
+
+class TestArticleChangeViewSet:
+    @pytest.fixture(autouse=True)
+    def no_feed_delay(self, settings):
+        settings.API_CHANGE_FEED_DELAY = 0
+
+    def test_list_returns_changes_since(self, api_client: APIClient):
+        old, changed = ArticleFactory.create_batch(2)
+        since = Article.objects.get(pk=changed.pk).updated_at
+        AuthorFactory(article_id=old)
+
+        response = api_client.get(reverse("api:change-list"), {"since": since})
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data["results"]] == [old.pk]
+        assert response.data["results"][0]["authors"]
+
+    def test_list_hides_unsettled_changes(self, api_client: APIClient, settings):
+        settings.API_CHANGE_FEED_DELAY = 60
+        ArticleFactory()
+
+        response = api_client.get(reverse("api:change-list"))
+
+        assert response.data["results"] == []
+
+    def test_changes_are_stamped_on_commit(
+        self, api_client: APIClient, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks() as callbacks:
+            article, deleted = ArticleFactory.create_batch(2)
+            deleted.delete()
+        written = Article.objects.get(pk=article.pk).updated_at
+        (tombstone,) = ArticleTombstone.objects.all()
+
+        for callback in callbacks:
+            callback()
+
+        assert Article.objects.get(pk=article.pk).updated_at > written
+        assert ArticleTombstone.objects.get().deleted_at > tombstone.deleted_at
+
+    def test_list_rejects_invalid_since(self, api_client: APIClient):
+        response = api_client.get(reverse("api:change-list"), {"since": "yesterday"})
+
+        assert response.status_code == 400
+
+    def test_deletions(self, api_client: APIClient):
+        article = ArticleFactory()
+        pk = article.pk
+        article.delete()
+
+        response = api_client.get(reverse("api:change-deletions"))
+
+        assert response.status_code == 200
+        assert response.data["results"][0]["article_id"] == pk
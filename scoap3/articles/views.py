@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from scoap3.articles.oaipmh import OAIError, OAIRequest, render_error
+
+OAI_CONTENT_TYPE = "text/xml; charset=utf-8"
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@transaction.non_atomic_requests
+def oai_pmh_view(request):
+    params = request.GET if request.method == "GET" else request.POST
+    base_url = request.build_absolute_uri(request.path)
+    try:
+        body = OAIRequest(params, base_url).render()
+    except OAIError as error:
+        return HttpResponse(
+            render_error(error, params.dict(), base_url),
+            content_type=OAI_CONTENT_TYPE,
+        )
+    return StreamingHttpResponse(body, content_type=OAI_CONTENT_TYPE)
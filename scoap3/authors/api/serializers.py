@@ -1,15 +1,91 @@
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from scoap3.authors.author_lists import article_authors
 from scoap3.authors.models import Author, AuthorIdentifier
+from scoap3.misc.api.serializers import (
+    AffiliationIngestSerializer,
+    AffiliationNestedSerializer,
+)
+from scoap3.utils.fieldsets import SparseFieldsetMixin
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "article_id": "scoap3.articles.api.serializers.ArticleSerializer"
+    }
+
     class Meta:
         model = Author
         fields = "__all__"
 
 
-class AuthorIdentifierSerializer(serializers.ModelSerializer):
+class AuthorIdentifierSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {"author_id": AuthorSerializer}
+
     class Meta:
         model = AuthorIdentifier
         fields = "__all__"
+
+
+class AuthorIdentifierNestedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuthorIdentifier
+        fields = ["identifier_type", "identifier_value"]
+
+
+class AuthorNestedSerializer(serializers.ModelSerializer):
+    identifiers = AuthorIdentifierNestedSerializer(
+        source="authoridentifier_set", many=True
+    )
+    affiliations = AffiliationNestedSerializer(source="affiliation_set", many=True)
+
+    class Meta:
+        model = Author
+        fields = [
+            "id",
+            "first_name",
+            "last_name",
+            "email",
+            "author_order",
+            "identifiers",
+            "affiliations",
+        ]
+
+
+class AuthorIngestSerializer(serializers.ModelSerializer):
+    identifiers = AuthorIdentifierNestedSerializer(many=True, required=False)
+    affiliations = AffiliationIngestSerializer(many=True, required=False)
+
+    class Meta:
+        model = Author
+        fields = [
+            "first_name",
+            "last_name",
+            "email",
+            "author_order",
+            "identifiers",
+            "affiliations",
+        ]
+
+
+class AuthorListReplaceSerializer(serializers.Serializer):
+    """Response of an author list replacement."""
+
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    deleted = serializers.IntegerField()
+
+
+@extend_schema_field(AuthorNestedSerializer(many=True))
+class PackedAuthorsField(serializers.Field):
+    """
+    The authors of an article, as ``AuthorNestedSerializer`` renders them,
+    read from its packed author list.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(source="*", read_only=True, **kwargs)
+
+    def to_representation(self, article):
+        return article_authors(article)
@@ -9,9 +9,12 @@ from rest_framework.viewsets import GenericViewSet
 
 from scoap3.authors.api.serializers import AuthorIdentifierSerializer, AuthorSerializer
 from scoap3.authors.models import Author, AuthorIdentifier
+from scoap3.utils.cache import CachedResponseMixin
+from scoap3.utils.pagination import IdCursorPagination
 
 
 class AuthorViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -21,9 +24,11 @@ class AuthorViewSet(
 ):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
+    pagination_class = IdCursorPagination
 
 
 class AuthorIdentifierViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -33,3 +38,4 @@ class AuthorIdentifierViewSet(
 ):
     queryset = AuthorIdentifier.objects.all()
     serializer_class = AuthorIdentifierSerializer
+    pagination_class = IdCursorPagination
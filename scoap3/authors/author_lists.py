@@ -0,0 +1,210 @@
+"""
+Author lists packed into one row per article.
+
+Collaboration papers have thousands of authors; loading them as rows, with
+their identifiers and affiliations, takes seconds. The packed list holds the
+same data as JSON arrays, with the affiliations shared by authors stored
+once and referred to by position::
+
+    {
+        "affiliations": [[id, value, organization, country, identifiers]],
+        "authors": [
+            [id, first_name, last_name, email, author_order, identifiers,
+             affiliation positions]
+        ],
+    }
+
+where identifiers are ``[type, value]`` pairs. The lists of the articles a
+transaction changes are dropped as it writes and rebuilt together once it
+commits, see ``schedule_rebuild``; meanwhile they are packed on the fly, so
+they are never stale. Articles created before author lists were have none
+until ``build_author_lists`` is run, once after deploying them: until then
+they are packed on the fly as well, a page of articles at a time.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from scoap3.articles.models import Article
+from scoap3.authors.models import ArticleAuthorList, Author, AuthorIdentifier
+from scoap3.misc.models import Affiliation, InstitutionIdentifier
+from scoap3.misc.reference import country_names
+from scoap3.utils.iterables import chunked
+from scoap3.utils.transactions import CommitBatch
+
+EMPTY = {"affiliations": [], "authors": []}
+
+
+def pack_authors(article_ids):
+    """The packed author lists of ``article_ids``, in four queries."""
+    authors = defaultdict(list)
+    for row in (
+        Author.objects.filter(article_id__in=article_ids)
+        .order_by("author_order", "id")
+        .values_list(
+            "article_id", "id", "first_name", "last_name", "email", "author_order"
+        )
+    ):
+        authors[row[0]].append(list(row[1:]))
+
+    author_identifiers = defaultdict(list)
+    for author, *identifier in AuthorIdentifier.objects.filter(
+        author_id__article_id__in=article_ids
+    ).values_list("author_id", "identifier_type", "identifier_value"):
+        author_identifiers[author].append(identifier)
+
+    links = defaultdict(list)
+    affiliations = {}
+    for author, affiliation, *fields in (
+        Affiliation.author_id.through.objects.filter(author__article_id__in=article_ids)
+        .order_by("affiliation_id")
+        .values_list(
+            "author_id",
+            "affiliation_id",
+            "affiliation__value",
+            "affiliation__organization",
+            "affiliation__country_id",
+        )
+    ):
+        links[author].append(affiliation)
+        affiliations[affiliation] = [affiliation, *fields, []]
+
+    for affiliation, *identifier in InstitutionIdentifier.objects.filter(
+        affiliation_id__in=affiliations
+    ).values_list("affiliation_id", "identifier_type", "identifier_value"):
+        affiliations[affiliation][4].append(identifier)
+
+    packed = {}
+    for article_id, article_authors in authors.items():
+        positions, article_affiliations = {}, []
+        for author in article_authors:
+            for affiliation in links[author[0]]:
+                if affiliation not in positions:
+                    positions[affiliation] = len(article_affiliations)
+                    article_affiliations.append(affiliations[affiliation])
+            author += [
+                author_identifiers[author[0]],
+                [positions[affiliation] for affiliation in links[author[0]]],
+            ]
+        packed[article_id] = {
+            "affiliations": article_affiliations,
+            "authors": article_authors,
+        }
+    return packed
+
+
+def unpack_authors(packed):
+    """The authors of a packed list, as ``AuthorNestedSerializer`` renders them."""
+    countries = country_names()
+    affiliations = [
+        {
+            "id": affiliation_id,
+            "value": value,
+            "organization": organization,
+            "country": {"code": country, "name": countries.get(country, "")},
+            "identifiers": [
+                {"identifier_type": t, "identifier_value": v} for t, v in identifiers
+            ],
+        }
+        for affiliation_id, value, organization, country, identifiers in packed[
+            "affiliations"
+        ]
+    ]
+    return [
+        {
+            "id": author_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "author_order": author_order,
+            "identifiers": [
+                {"identifier_type": t, "identifier_value": v} for t, v in identifiers
+            ],
+            "affiliations": [affiliations[position] for position in positions],
+        }
+        for (
+            author_id,
+            first_name,
+            last_name,
+            email,
+            author_order,
+            identifiers,
+            positions,
+        ) in packed["authors"]
+    ]
+
+
+@transaction.atomic
+def rebuild_author_lists(article_ids):
+    """Replace the packed author lists of ``article_ids``."""
+    for chunk in chunked(sorted(set(article_ids))):
+        # Locked as their writers do: a transaction changing them commits
+        # either before they are packed, or after, and rebuilds them again.
+        existing = list(
+            Article.objects.select_for_update()
+            .filter(pk__in=chunk)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        packed = pack_authors(existing)
+        ArticleAuthorList.objects.bulk_create(
+            [
+                ArticleAuthorList(
+                    article_id_id=article_id,
+                    data=packed.get(article_id, EMPTY),
+                    authors=len(packed.get(article_id, EMPTY)["authors"]),
+                )
+                for article_id in existing
+            ],
+            update_conflicts=True,
+            unique_fields=["article_id"],
+            update_fields=["data", "authors", "updated_at"],
+        )
+
+
+pending_rebuilds = CommitBatch(rebuild_author_lists)
+
+
+def schedule_rebuild(article_ids):
+    """
+    Drop the packed author lists of ``article_ids`` and rebuild them once
+    the transaction commits, together with the others it changed.
+    """
+    ArticleAuthorList.objects.filter(article_id__in=article_ids).delete()
+    pending_rebuilds.add(article_ids)
+
+
+def packed_author_list(article):
+    """
+    The packed author list of ``article``.
+
+    Articles without one yet, those created before author lists were, are
+    packed on the fly.
+    """
+    try:
+        return article.author_list.data
+    except ArticleAuthorList.DoesNotExist:
+        return pack_authors([article.pk]).get(article.pk, EMPTY)
+
+
+def attach_author_lists(articles):
+    """
+    Pack the lists the ``articles``, loaded with their ``author_list``, lack
+    in one batch, and attach them without storing them.
+    """
+    missing = []
+    for article in articles:
+        try:
+            article.author_list
+        except ArticleAuthorList.DoesNotExist:
+            missing.append(article)
+    if not missing:
+        return
+    packed = pack_authors([article.pk for article in missing])
+    for article in missing:
+        data = packed.get(article.pk, EMPTY)
+        article.author_list = ArticleAuthorList(data=data, authors=len(data["authors"]))
+
+
+def article_authors(article):
+    return unpack_authors(packed_author_list(article))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 20:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("articles", "0011_rollups"),
+        ("authors", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleAuthorList",
+            fields=[
+                (
+                    "article_id",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="author_list",
+                        serialize=False,
+                        to="articles.article",
+                    ),
+                ),
+                ("data", models.JSONField()),
+                ("authors", models.PositiveIntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="author",
+            index=models.Index(
+                fields=["article_id", "author_order"],
+                name="authors_aut_article_10a03c_idx",
+            ),
+        ),
+    ]
@@ -16,6 +16,7 @@ class Author(models.Model):
 
     class Meta:
         ordering = ["id"]
+        indexes = [models.Index(fields=["article_id", "author_order"])]
 
 
 class AuthorIdentifier(models.Model):
@@ -36,3 +37,20 @@ class AuthorIdentifier(models.Model):
         indexes = [
             models.Index(fields=["author_id", "identifier_type", "identifier_value"])
         ]
+
+
+class ArticleAuthorList(models.Model):
+    """
+    The authors of an article packed in one row, see
+    ``scoap3.authors.author_lists``.
+    """
+
+    article_id = models.OneToOneField(
+        "articles.Article",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="author_list",
+    )
+    data = models.JSONField()
+    authors = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,24 @@
+from factory import Faker, Sequence, SubFactory
+from factory.django import DjangoModelFactory
+
+from scoap3.authors.models import Author, AuthorIdentifier, AuthorIdentifierType
+
+
+class AuthorFactory(DjangoModelFactory):
+    article_id = SubFactory("scoap3.articles.tests.factories.ArticleFactory")
+    first_name = Faker("first_name")
+    last_name = Faker("last_name")
+    email = Faker("email")
+    author_order = Sequence(lambda n: n)
+
+    class Meta:
+        model = Author
+
+
+class AuthorIdentifierFactory(DjangoModelFactory):
+    author_id = SubFactory(AuthorFactory)
+    identifier_type = AuthorIdentifierType.ORCID
+    identifier_value = Faker("numerify", text="0000-000#-####-####")
+
+    class Meta:
+        model = AuthorIdentifier
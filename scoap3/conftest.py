@@ -1,7 +1,13 @@
+from unittest import mock
+
 import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
 
+from scoap3.articles.tasks import flush_index_queue
 from scoap3.users.models import User
 from scoap3.users.tests.factories import UserFactory
+from scoap3.utils.two_tier import registry
 
 
 @pytest.fixture(autouse=True)
@@ -9,6 +15,29 @@ def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cached responses, versions and reference rows would otherwise outlive
+    # the test database rollback.
+    cache.clear()
+    for two_tier in registry.values():
+        two_tier.discard()
+
+
+@pytest.fixture(autouse=True)
+def apply_async():
+    # Tests running commit hooks would otherwise send flushes to the broker.
+    with mock.patch.object(flush_index_queue, "apply_async") as apply_async:
+        yield apply_async
+
+
 @pytest.fixture
 def user(db) -> User:
     return UserFactory()
+
+
+@pytest.fixture
+def api_client(user: User) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
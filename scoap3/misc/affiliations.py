@@ -0,0 +1,313 @@
+"""
+Canonical affiliations.
+
+Authors of different articles with the same affiliation are linked to a
+single ``Affiliation`` row, its canonical row, which holds the hash of the
+normalized affiliation in ``fingerprint`` and the identifiers given for
+it. Ingestion links authors to the canonical rows through
+``AffiliationResolver``. Rows written otherwise, or
+edited since, have no fingerprint until ``merge_affiliations`` gives them
+one, or merges them into the canonical row of their affiliation.
+"""
+import hashlib
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from scoap3.articles.signals import bulk_changes, touch_articles
+from scoap3.authors.models import Author
+from scoap3.misc.models import (
+    Affiliation,
+    InstitutionIdentifier,
+    InstitutionIdentifierType,
+)
+from scoap3.misc.ror import match_affiliations, ror_index
+from scoap3.utils.cache import invalidate_models
+from scoap3.utils.text import normalize_text
+
+
+def fingerprint(value, organization, country):
+    """Hash of the normalized text and the country of an affiliation."""
+    parts = [normalize_text(value), normalize_text(organization), country]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def affiliation_fingerprint(affiliation):
+    return fingerprint(
+        affiliation.value, affiliation.organization, affiliation.country_id
+    )
+
+
+def document_fingerprint(affiliation):
+    """The fingerprint of an affiliation document of the ingest endpoint."""
+    return fingerprint(
+        affiliation["value"], affiliation["organization"], affiliation["country"]
+    )
+
+
+def document_identifiers(affiliation):
+    return {
+        (i["identifier_type"], i["identifier_value"])
+        for i in affiliation.get("identifiers", [])
+    }
+
+
+class AffiliationResolver:
+    """
+    Find or create the canonical rows of affiliation documents.
+
+    Meant for one ingest batch: the fingerprints resolved are kept, so an
+    affiliation shared by many authors or articles is looked up once. The
+    canonical rows gain the identifiers of the documents they lack, and
+    the rows created their ROR identifier, see ``scoap3.misc.ror``.
+    """
+
+    def __init__(self):
+        self.ids = {}
+
+    def resolve(self, affiliations):
+        """
+        Map the fingerprints of the ``affiliations`` documents to the ids of
+        their canonical rows, in at most five queries.
+        """
+        wanted = defaultdict(list)
+        for affiliation in affiliations:
+            wanted[document_fingerprint(affiliation)].append(affiliation)
+        missing = wanted.keys() - self.ids.keys()
+        if missing:
+            self.ids.update(
+                Affiliation.objects.filter(fingerprint__in=missing).values_list(
+                    "fingerprint", "pk"
+                )
+            )
+            created = [f for f in missing if f not in self.ids]
+            self.create({f: wanted[f][0] for f in created})
+            identifiers = {
+                f: set().union(*map(document_identifiers, wanted[f])) for f in missing
+            }
+            rors = match_affiliations(
+                [
+                    (a["value"], a["organization"], a["country"])
+                    for a in (wanted[f][0] for f in created)
+                ]
+            )
+            for f, ror in zip(created, rors):
+                if ror and not any(
+                    t == InstitutionIdentifierType.ROR for t, _ in identifiers[f]
+                ):
+                    identifiers[f].add((InstitutionIdentifierType.ROR, ror))
+            add_identifiers({self.ids[f]: identifiers[f] for f in missing})
+        return {f: self.ids[f] for f in wanted}
+
+    def create(self, affiliations):
+        if not affiliations:
+            return
+        # Rows a concurrent batch created meanwhile are kept, theirs are
+        # looked up below along with ours.
+        Affiliation.objects.bulk_create(
+            [
+                Affiliation(
+                    fingerprint=f,
+                    value=a["value"],
+                    organization=a["organization"],
+                    country_id=a["country"],
+                )
+                for f, a in affiliations.items()
+            ],
+            ignore_conflicts=True,
+        )
+        invalidate_models([Affiliation])
+        self.ids.update(
+            Affiliation.objects.filter(fingerprint__in=affiliations).values_list(
+                "fingerprint", "pk"
+            )
+        )
+
+
+def linked_article_ids(affiliation_ids):
+    """Articles with an author linked to any of ``affiliation_ids``."""
+    return Author.objects.filter(affiliation__in=affiliation_ids).values_list(
+        "article_id", flat=True
+    )
+
+
+def add_identifiers(wanted):
+    """
+    Give the affiliations of ``wanted``, mapping their ids to ``(type,
+    value)`` identifiers, those they lack, and touch the articles already
+    linked to them.
+    """
+    wanted = {pk: identifiers for pk, identifiers in wanted.items() if identifiers}
+    if not wanted:
+        return
+    existing = set(
+        InstitutionIdentifier.objects.filter(affiliation_id__in=wanted).values_list(
+            "affiliation_id", "identifier_type", "identifier_value"
+        )
+    )
+    added = InstitutionIdentifier.objects.bulk_create(
+        InstitutionIdentifier(
+            affiliation_id_id=pk, identifier_type=t, identifier_value=v
+        )
+        for pk, identifiers in wanted.items()
+        for t, v in sorted(identifiers)
+        if (pk, t, v) not in existing
+    )
+    if added:
+        invalidate_models([InstitutionIdentifier])
+        touch_articles(linked_article_ids({i.affiliation_id_id for i in added}))
+
+
+@transaction.atomic
+def merge_affiliations(batch_size):
+    """
+    Give a batch of affiliations without a fingerprint one, or merge those
+    whose affiliation already has a canonical row into it.
+
+    The author links and the identifiers of the merged rows are moved to
+    the canonical rows, those already there dropped, with one statement
+    each. Returns the number of rows processed.
+    """
+    batch = list(
+        Affiliation.objects.select_for_update(skip_locked=True)
+        .filter(fingerprint__isnull=True)
+        .order_by("pk")[:batch_size]
+    )
+    fingerprints = {a.pk: affiliation_fingerprint(a) for a in batch}
+    canonical = dict(
+        Affiliation.objects.filter(
+            fingerprint__in=set(fingerprints.values())
+        ).values_list("fingerprint", "pk")
+    )
+    duplicates, fresh = {}, []
+    for affiliation in batch:
+        affiliation.fingerprint = fingerprints[affiliation.pk]
+        if affiliation.fingerprint in canonical:
+            duplicates[affiliation.pk] = canonical[affiliation.fingerprint]
+        else:
+            canonical[affiliation.fingerprint] = affiliation.pk
+            fresh.append(affiliation)
+
+    Affiliation.objects.bulk_update(fresh, ["fingerprint"])
+    if fresh:
+        invalidate_models([Affiliation])
+    if duplicates:
+        invalidate_models([Affiliation, InstitutionIdentifier, Author])
+        with bulk_changes():
+            author_ids = move_links(duplicates)
+            gaining = move_identifiers(duplicates)
+            Affiliation.objects.filter(pk__in=duplicates).delete()
+        # The articles already linked to canonical rows gaining identifiers too.
+        touch_articles(
+            {
+                *Author.objects.filter(pk__in=author_ids).values_list(
+                    "article_id", flat=True
+                ),
+                *linked_article_ids(gaining),
+            }
+        )
+    return len(batch)
+
+
+def move_links(targets):
+    """
+    Move the author links of the affiliations in ``targets`` to the
+    affiliations they map to. Returns the ids of the authors linked.
+    """
+    through = Affiliation.author_id.through
+    links = list(
+        through.objects.filter(affiliation_id__in=targets).values_list(
+            "pk", "author_id", "affiliation_id"
+        )
+    )
+    author_ids = {author for _, author, _ in links}
+    existing = set(
+        through.objects.filter(
+            affiliation_id__in=set(targets.values()), author_id__in=author_ids
+        ).values_list("author_id", "affiliation_id")
+    )
+    moved, dropped = [], []
+    for pk, author, affiliation in links:
+        link = (author, targets[affiliation])
+        if link in existing:
+            dropped.append(pk)
+        else:
+            existing.add(link)
+            moved.append(pk)
+
+    through.objects.filter(pk__in=dropped).delete()
+    if moved:
+        through.objects.filter(pk__in=moved).update(
+            affiliation_id=Case(
+                *(
+                    When(affiliation_id=source, then=Value(target))
+                    for source, target in targets.items()
+                )
+            )
+        )
+    return author_ids
+
+
+def move_identifiers(targets):
+    """
+    Move the identifiers of the affiliations in ``targets`` to the
+    affiliations they map to, unless these already have them. Returns the
+    ids of the affiliations gaining identifiers.
+    """
+    rows = InstitutionIdentifier.objects.filter(
+        affiliation_id__in=[*targets, *targets.values()]
+    ).values_list("pk", "affiliation_id", "identifier_type", "identifier_value")
+    existing, moved, moved_from = set(), [], set()
+    for pk, affiliation, *identifier in sorted(rows, key=lambda row: row[1] in targets):
+        key = (targets.get(affiliation, affiliation), *identifier)
+        if key not in existing:
+            existing.add(key)
+            if affiliation in targets:
+                moved.append(pk)
+                moved_from.add(affiliation)
+    if moved:
+        InstitutionIdentifier.objects.filter(pk__in=moved).update(
+            affiliation_id=Case(
+                *(
+                    When(affiliation_id=source, then=Value(target))
+                    for source, target in targets.items()
+                )
+            )
+        )
+    return {targets[affiliation] for affiliation in moved_from}
+
+
+def assign_rors(after, chunk_size):
+    """
+    Match the next ``chunk_size`` affiliations after the id ``after`` that
+    have no ROR identifier, and store the ones found.
+
+    Returns the last id of the chunk, ``None`` past the last affiliation or
+    without a ROR index.
+    """
+    if ror_index() is None:
+        return None
+    rows = list(
+        Affiliation.objects.filter(pk__gt=after)
+        .exclude(institutionidentifier__identifier_type=InstitutionIdentifierType.ROR)
+        .order_by("pk")
+        .values_list("pk", "value", "organization", "country_id")[:chunk_size]
+    )
+    if not rows:
+        return None
+    rors = match_affiliations([row[1:] for row in rows])
+    matched = {pk: ror for (pk, *_), ror in zip(rows, rors) if ror}
+    with transaction.atomic():
+        InstitutionIdentifier.objects.bulk_create(
+            InstitutionIdentifier(
+                affiliation_id_id=pk,
+                identifier_type=InstitutionIdentifierType.ROR,
+                identifier_value=ror,
+            )
+            for pk, ror in matched.items()
+        )
+        if matched:
+            invalidate_models([InstitutionIdentifier])
+        touch_articles(linked_article_ids(matched))
+    return rows[-1][0]
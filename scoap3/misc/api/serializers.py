@@ -13,69 +13,180 @@ from scoap3.misc.models import (
     Publisher,
     RelatedMaterial,
 )
+from scoap3.utils.fieldsets import SparseFieldsetMixin
 
 
-class CountrySerializer(serializers.ModelSerializer):
+class CountrySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Country
         fields = ["code", "name"]
 
 
-class AffiliationSerializer(serializers.ModelSerializer):
+class AffiliationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "country": CountrySerializer,
+        "author_id": "scoap3.authors.api.serializers.AuthorSerializer",
+    }
+
     class Meta:
         model = Affiliation
         fields = "__all__"
 
 
-class InstitutionIdentifierSerializer(serializers.ModelSerializer):
+class InstitutionIdentifierSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {"affiliation_id": AffiliationSerializer}
+
     class Meta:
         model = InstitutionIdentifier
         fields = "__all__"
 
 
-class PublisherSerializer(serializers.ModelSerializer):
+class PublisherSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Publisher
         fields = "__all__"
 
 
-class PublicationInfoSerializer(serializers.ModelSerializer):
+class PublicationInfoSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "article_id": "scoap3.articles.api.serializers.ArticleSerializer",
+        "publisher": PublisherSerializer,
+    }
+
     class Meta:
         model = PublicationInfo
         fields = "__all__"
 
 
-class LicenseSerializer(serializers.ModelSerializer):
+class LicenseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = License
         fields = "__all__"
 
 
-class CopyrightSerializer(serializers.ModelSerializer):
+class CopyrightSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "article_id": "scoap3.articles.api.serializers.ArticleSerializer"
+    }
+
     class Meta:
         model = Copyright
         fields = "__all__"
 
 
-class ArticleArxivCategorySerializer(serializers.ModelSerializer):
+class ArticleArxivCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "article_id": "scoap3.articles.api.serializers.ArticleSerializer"
+    }
+
     class Meta:
         model = ArticleArxivCategory
         fields = "__all__"
 
 
-class ExperimentalCollaborationSerializer(serializers.ModelSerializer):
+class ExperimentalCollaborationSerializer(
+    SparseFieldsetMixin, serializers.ModelSerializer
+):
+    expandable_fields = {
+        "article_id": "scoap3.articles.api.serializers.ArticleSerializer"
+    }
+
     class Meta:
         model = ExperimentalCollaboration
         fields = "__all__"
 
 
-class FunderSerializer(serializers.ModelSerializer):
+class FunderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        "article_id": "scoap3.articles.api.serializers.ArticleSerializer"
+    }
+
     class Meta:
         model = Funder
         fields = "__all__"
 
 
-class RelatedMaterialSerializer(serializers.ModelSerializer):
+class RelatedMaterialSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = RelatedMaterial
         fields = "__all__"
+
+
+class InstitutionIdentifierNestedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InstitutionIdentifier
+        fields = ["identifier_type", "identifier_value"]
+
+
+class AffiliationNestedSerializer(serializers.ModelSerializer):
+    country = CountrySerializer()
+    identifiers = InstitutionIdentifierNestedSerializer(
+        source="institutionidentifier_set", many=True
+    )
+
+    class Meta:
+        model = Affiliation
+        fields = ["id", "value", "organization", "country", "identifiers"]
+
+
+class PublicationInfoNestedSerializer(serializers.ModelSerializer):
+    publisher = PublisherSerializer()
+
+    class Meta:
+        model = PublicationInfo
+        exclude = ["article_id"]
+
+
+class CopyrightNestedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Copyright
+        exclude = ["article_id"]
+
+
+class ArticleArxivCategoryNestedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArticleArxivCategory
+        fields = ["category", "primary"]
+
+
+class ExperimentalCollaborationNestedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExperimentalCollaboration
+        exclude = ["article_id"]
+
+
+class FunderNestedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Funder
+        exclude = ["article_id"]
+
+
+class AffiliationIngestSerializer(serializers.ModelSerializer):
+    #: Inferred from the affiliation when left out, see ``scoap3.misc.countries``.
+    country = serializers.CharField(max_length=2, required=False)
+    identifiers = InstitutionIdentifierNestedSerializer(many=True, required=False)
+
+    class Meta:
+        model = Affiliation
+        fields = ["value", "organization", "country", "identifiers"]
+
+
+class PublicationInfoIngestSerializer(serializers.ModelSerializer):
+    publisher = serializers.CharField(max_length=255)
+
+    class Meta:
+        model = PublicationInfo
+        exclude = ["id", "article_id"]
+
+
+class LicenseIngestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = License
+        fields = ["url", "name"]
+        extra_kwargs = {"url": {"default": ""}}
+
+
+class RelatedMaterialIngestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RelatedMaterial
+        fields = ["title", "doi", "related_material_type"]
@@ -1,3 +1,7 @@
+import os
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
 from rest_framework.mixins import (
     CreateModelMixin,
     DestroyModelMixin,
@@ -5,6 +9,8 @@ from rest_framework.mixins import (
     RetrieveModelMixin,
     UpdateModelMixin,
 )
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from scoap3.misc.api.serializers import (
@@ -33,9 +39,13 @@ from scoap3.misc.models import (
     Publisher,
     RelatedMaterial,
 )
+from scoap3.utils.cache import CachedResponseMixin
+from scoap3.utils.pagination import IdCursorPagination
+from scoap3.utils.two_tier import cache_stats
 
 
 class CountryViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -48,6 +58,7 @@ class CountryViewSet(
 
 
 class AffiliationViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -57,9 +68,11 @@ class AffiliationViewSet(
 ):
     queryset = Affiliation.objects.all()
     serializer_class = AffiliationSerializer
+    pagination_class = IdCursorPagination
 
 
 class InstitutionIdentifierViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -69,9 +82,11 @@ class InstitutionIdentifierViewSet(
 ):
     queryset = InstitutionIdentifier.objects.all()
     serializer_class = InstitutionIdentifierSerializer
+    pagination_class = IdCursorPagination
 
 
 class PublisherViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -84,6 +99,7 @@ class PublisherViewSet(
 
 
 class PublicationInfoViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -96,6 +112,7 @@ class PublicationInfoViewSet(
 
 
 class LicenseViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -108,6 +125,7 @@ class LicenseViewSet(
 
 
 class CopyrightViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -120,6 +138,7 @@ class CopyrightViewSet(
 
 
 class ArticleArxivCategoryViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -132,6 +151,7 @@ class ArticleArxivCategoryViewSet(
 
 
 class ExperimentalCollaborationViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -144,6 +164,7 @@ class ExperimentalCollaborationViewSet(
 
 
 class FunderViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -156,6 +177,7 @@ class FunderViewSet(
 
 
 class RelatedMaterialViewSet(
+    CachedResponseMixin,
     ListModelMixin,
     CreateModelMixin,
     RetrieveModelMixin,
@@ -165,3 +187,17 @@ class RelatedMaterialViewSet(
 ):
     queryset = RelatedMaterial.objects.all()
     serializer_class = RelatedMaterialSerializer
+
+
+class CacheStatsViewSet(GenericViewSet):
+    """
+    Hit and miss counters of the two-tier caches, in the process serving
+    the request; counters start over with each worker.
+    """
+
+    permission_classes = [IsAdminUser]
+    pagination_class = None
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def list(self, request):
+        return Response({"pid": os.getpid(), "caches": cache_stats()})
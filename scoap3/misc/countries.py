@@ -0,0 +1,208 @@
+"""
+Inference of the country of an affiliation from its text.
+
+A ``CountryMatcher`` compiles the country names of the ``Country`` table
+and the patterns of ``scoap3.misc.country_patterns`` into one Aho-Corasick
+automaton over the tokens of the normalized text, which finds every
+pattern in a single pass, however many there are. Overlapping matches
+keep the longest, then each match counts for its country with the weight
+of its kind of pattern, more towards the end of the text where the
+country is usually written. The best country comes with its share of the
+total, its confidence.
+"""
+import re
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+
+from scoap3.misc.country_patterns import ALIASES, CITIES, INSTITUTIONS
+from scoap3.misc.reference import country_names
+from scoap3.utils.iterables import chunked
+from scoap3.utils.text import normalize_text
+
+#: Weight of a match of each kind of pattern.
+NAME_WEIGHT = 1.0
+INSTITUTION_WEIGHT = 0.8
+CITY_WEIGHT = 0.6
+
+_worker = {}
+
+
+def country_patterns(names):
+    """
+    The ``(text, country code, weight)`` patterns of the countries in
+    ``names``, mapping their codes to their names.
+    """
+    patterns = [(name, code, NAME_WEIGHT) for code, name in names.items()]
+    for table, weight in (
+        (ALIASES, NAME_WEIGHT),
+        (INSTITUTIONS, INSTITUTION_WEIGHT),
+        (CITIES, CITY_WEIGHT),
+    ):
+        patterns += [
+            (text, code, weight)
+            for code, texts in table.items()
+            if code in names
+            for text in texts
+        ]
+    return patterns
+
+
+def best_country(matches, length):
+    """
+    The best country of the ``(start, end, code, weight)`` matches of a text
+    of ``length`` tokens, and its confidence. ``(None, 0.0)`` without any.
+    """
+    kept, taken = [], set()
+    # The longest first, then the first, then by country for a stable result.
+    for start, end, code, weight in sorted(
+        matches, key=lambda m: (m[0] - m[1], m[0], m[2], -m[3])
+    ):
+        if taken.isdisjoint(range(start, end)):
+            taken.update(range(start, end))
+            kept.append((end, code, weight))
+    scores = defaultdict(float)
+    for end, code, weight in kept:
+        scores[code] += weight * (0.5 + 0.5 * end / length)
+    if not scores:
+        return None, 0.0
+    code = max(sorted(scores), key=scores.get)
+    return code, scores[code] / sum(scores.values())
+
+
+class CountryMatcher:
+    """Aho-Corasick automaton over the tokens of ``(text, code, weight)`` patterns."""
+
+    def __init__(self, patterns):
+        self.goto, self.fail, self.output = [{}], [0], [[]]
+        for text, code, weight in patterns:
+            tokens = normalize_text(text).split()
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                if token not in self.goto[state]:
+                    self.goto[state][token] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = self.goto[state][token]
+            self.output[state].append((len(tokens), code, weight))
+
+        # Breadth first, the failure state of a state is shallower.
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(token, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def matches(self, tokens):
+        """The ``(start, end, code, weight)`` pattern matches in ``tokens``."""
+        goto, fail, output = self.goto, self.fail, self.output
+        state, found = 0, []
+        for end, token in enumerate(tokens, 1):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, code, weight in output[state]:
+                found.append((end - length, end, code, weight))
+        return found
+
+    def infer(self, text):
+        """The country of ``text`` and the confidence in it."""
+        tokens = normalize_text(text).split()
+        return best_country(self.matches(tokens), len(tokens))
+
+
+class RegexCountryMatcher:
+    """
+    One regular expression per pattern, tried in turn: the baseline the
+    automaton is benchmarked against, see ``benchmark_country_inference``.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = [
+            (re.compile(rf"\b{re.escape(normalize_text(text))}\b"), code, weight)
+            for text, code, weight in patterns
+            if normalize_text(text)
+        ]
+
+    def infer(self, text):
+        normalized = normalize_text(text)
+        matches = []
+        for pattern, code, weight in self.patterns:
+            for match in pattern.finditer(normalized):
+                start = normalized.count(" ", 0, match.start())
+                length = match.group().count(" ") + 1
+                matches.append((start, start + length, code, weight))
+        return best_country(matches, len(normalized.split()))
+
+
+@lru_cache(maxsize=1)
+def build_matcher(names):
+    return CountryMatcher(country_patterns(dict(names)))
+
+
+def country_matcher():
+    """The matcher of the current countries, built once per process."""
+    return build_matcher(tuple(sorted(country_names().items())))
+
+
+def affiliation_text(value, organization):
+    return f"{organization}, {value}" if organization else value
+
+
+def fill_countries(affiliations):
+    """
+    Give the affiliation documents without a country the one inferred from
+    their text, if confident enough. Returns the documents left without.
+    """
+    missing = [a for a in affiliations if not a.get("country")]
+    if not missing:
+        return []
+    matcher = country_matcher()
+    failed = []
+    for affiliation in missing:
+        code, confidence = matcher.infer(
+            affiliation_text(affiliation["value"], affiliation.get("organization"))
+        )
+        if code and confidence >= settings.COUNTRY_INFERENCE_MIN_CONFIDENCE:
+            affiliation["country"] = code
+        else:
+            failed.append(affiliation)
+    return failed
+
+
+def init_worker(matcher):
+    _worker["matcher"] = matcher
+
+
+def infer_chunk(texts):
+    return [_worker["matcher"].infer(text) for text in texts]
+
+
+def infer_countries(texts, processes=1, chunk_size=1000):
+    """
+    The ``(country code, confidence)`` of each of ``texts``, spread over a
+    pool of ``processes`` for large batches.
+    """
+    matcher = country_matcher()
+    if processes <= 1:
+        return [matcher.infer(text) for text in texts]
+    with ProcessPoolExecutor(
+        processes, initializer=init_worker, initargs=(matcher,)
+    ) as pool:
+        return [
+            result
+            for results in pool.map(infer_chunk, chunked(texts, chunk_size))
+            for result in results
+        ]
@@ -0,0 +1,183 @@
+"""
+Patterns naming a country in affiliations, besides the country names of the
+``Country`` table, see ``scoap3.misc.countries``. Keyed by country code.
+"""
+
+#: Other names, local names and abbreviations of countries.
+ALIASES = {
+    "AT": ["Österreich"],
+    "BE": ["Belgique", "België"],
+    "BR": ["Brasil"],
+    "CH": ["Switzerland", "Schweiz", "Suisse", "Svizzera"],
+    "CN": ["P.R. China", "PR China", "People's Republic of China", "China"],
+    "CZ": ["Czechia", "Czech Republic"],
+    "DE": ["Germany", "Deutschland", "FRG"],
+    "ES": ["España"],
+    "FR": ["France"],
+    "GB": [
+        "UK",
+        "U.K.",
+        "United Kingdom",
+        "Great Britain",
+        "England",
+        "Scotland",
+        "Wales",
+        "Northern Ireland",
+    ],
+    "GR": ["Hellas"],
+    "IR": ["Iran"],
+    "IT": ["Italia"],
+    "JP": ["Japan", "Nippon"],
+    "KR": ["Korea", "Republic of Korea", "South Korea"],
+    "MX": ["México"],
+    "NL": ["The Netherlands", "Netherlands", "Holland"],
+    "PL": ["Polska"],
+    "RU": ["Russia", "Russian Federation"],
+    "SE": ["Sverige"],
+    "TR": ["Turkey", "Türkiye"],
+    "TW": ["Taiwan", "Republic of China"],
+    "US": ["USA", "U.S.A.", "United States", "United States of America", "US"],
+    "VN": ["Vietnam", "Viet Nam"],
+}
+
+#: Cities hosting many affiliations, unambiguous ones only.
+CITIES = {
+    "AR": ["Buenos Aires", "La Plata"],
+    "AT": ["Vienna", "Wien", "Innsbruck", "Graz"],
+    "AU": ["Melbourne", "Sydney", "Canberra", "Adelaide"],
+    "BE": ["Brussels", "Bruxelles", "Louvain-la-Neuve", "Leuven", "Gent"],
+    "BR": ["São Paulo", "Rio de Janeiro", "Campinas"],
+    "CA": ["Toronto", "Montreal", "Montréal", "Vancouver", "Waterloo, Ontario"],
+    "CH": [
+        "Geneva",
+        "Genève",
+        "Meyrin",
+        "Zurich",
+        "Zürich",
+        "Lausanne",
+        "Bern",
+        "Basel",
+        "Villigen",
+    ],
+    "CL": ["Santiago de Chile", "Valparaíso"],
+    "CN": [
+        "Beijing",
+        "Shanghai",
+        "Hefei",
+        "Nanjing",
+        "Wuhan",
+        "Guangzhou",
+        "Hangzhou",
+        "Lanzhou",
+    ],
+    "CZ": ["Prague", "Praha"],
+    "DE": [
+        "Berlin",
+        "Hamburg",
+        "Munich",
+        "München",
+        "Heidelberg",
+        "Bonn",
+        "Mainz",
+        "Karlsruhe",
+        "Aachen",
+        "Göttingen",
+        "Dresden",
+        "Garching",
+    ],
+    "DK": ["Copenhagen", "København"],
+    "ES": ["Madrid", "Barcelona", "Valencia", "Santiago de Compostela"],
+    "FI": ["Helsinki", "Jyväskylä"],
+    "FR": [
+        "Paris",
+        "Orsay",
+        "Saclay",
+        "Lyon",
+        "Marseille",
+        "Grenoble",
+        "Annecy",
+        "Strasbourg",
+        "Palaiseau",
+    ],
+    "GR": ["Athens", "Thessaloniki"],
+    "HU": ["Budapest", "Debrecen"],
+    "IL": ["Tel Aviv", "Jerusalem", "Haifa", "Rehovot"],
+    "IN": ["Mumbai", "Kolkata", "Chennai", "Bhubaneswar", "Chandigarh"],
+    "IT": [
+        "Rome",
+        "Roma",
+        "Milan",
+        "Milano",
+        "Pisa",
+        "Padova",
+        "Bologna",
+        "Torino",
+        "Napoli",
+        "Frascati",
+        "Trieste",
+        "Genova",
+        "Firenze",
+    ],
+    "JP": ["Tokyo", "Kyoto", "Osaka", "Tsukuba", "Nagoya", "Sendai"],
+    "KR": ["Seoul", "Daejeon", "Pohang"],
+    "MX": ["Mexico City", "Ciudad de México"],
+    "NL": ["Amsterdam", "Utrecht", "Nijmegen", "Leiden", "Groningen"],
+    "NO": ["Oslo", "Bergen"],
+    "PL": ["Warsaw", "Warszawa", "Kraków", "Cracow"],
+    "PT": ["Lisbon", "Lisboa", "Coimbra"],
+    "RO": ["Bucharest", "Bucharest-Magurele", "Măgurele"],
+    "RU": [
+        "Moscow",
+        "Dubna",
+        "Novosibirsk",
+        "Protvino",
+        "Saint Petersburg",
+        "St. Petersburg",
+        "Gatchina",
+    ],
+    "SE": ["Stockholm", "Uppsala", "Lund"],
+    "TR": ["Istanbul", "Ankara"],
+    "TW": ["Taipei", "Hsinchu"],
+    "UA": ["Kyiv", "Kiev", "Kharkiv"],
+    "US": [
+        "Batavia, Illinois",
+        "Chicago",
+        "Boston",
+        "New York",
+        "Berkeley",
+        "Stanford",
+        "Princeton",
+        "Pasadena",
+        "Upton, New York",
+        "Los Alamos",
+    ],
+}
+
+#: Laboratories and institutions named on their own.
+INSTITUTIONS = {
+    "CA": ["TRIUMF", "Perimeter Institute"],
+    "CH": ["CERN", "ETH Zurich", "EPFL", "Paul Scherrer Institute", "PSI"],
+    "CN": [
+        "IHEP",
+        "Chinese Academy of Sciences",
+        "Tsinghua University",
+        "Peking University",
+    ],
+    "DE": ["DESY", "GSI", "Max Planck", "Max-Planck-Institut", "KIT"],
+    "FR": ["CNRS", "CEA", "IN2P3", "IRFU", "LAPP", "IJCLab"],
+    "IT": ["INFN", "SISSA", "Scuola Normale Superiore"],
+    "JP": ["KEK", "RIKEN", "J-PARC"],
+    "KR": ["KAIST", "IBS"],
+    "RU": ["JINR", "ITEP", "INR RAS", "Budker Institute"],
+    "US": [
+        "Fermilab",
+        "Fermi National Accelerator Laboratory",
+        "SLAC",
+        "Brookhaven National Laboratory",
+        "Argonne",
+        "Lawrence Berkeley",
+        "MIT",
+        "Caltech",
+        "Jefferson Lab",
+    ],
+}
@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from scoap3.misc.countries import (
+    RegexCountryMatcher,
+    affiliation_text,
+    country_matcher,
+    country_patterns,
+    infer_countries,
+)
+from scoap3.misc.models import Affiliation
+from scoap3.misc.reference import country_names
+
+
+def measure(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the country inference automaton with one regular expression "
+        "per pattern, on the first affiliations. Nothing is written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--affiliations",
+            type=int,
+            default=100000,
+            help="Number of affiliations to infer the country of.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Also time the automaton over this many processes.",
+        )
+
+    def handle(self, *args, affiliations, processes, **options):
+        texts = [
+            affiliation_text(value, organization)
+            for value, organization in Affiliation.objects.order_by("pk").values_list(
+                "value", "organization"
+            )[:affiliations]
+        ]
+        if not texts:
+            self.stdout.write("No affiliations.")
+            return
+        patterns = country_patterns(country_names())
+        self.stdout.write(f"{len(texts)} affiliations, {len(patterns)} patterns:")
+
+        automaton, regex = country_matcher(), RegexCountryMatcher(patterns)
+        runs = [
+            ("Regex", lambda: [regex.infer(text) for text in texts]),
+            ("Automaton", lambda: [automaton.infer(text) for text in texts]),
+        ]
+        if processes > 1:
+            runs.append(
+                (
+                    f"{processes} processes",
+                    lambda: infer_countries(texts, processes=processes),
+                )
+            )
+        results = {}
+        for name, run in runs:
+            results[name], elapsed = measure(run)
+            self.stdout.write(
+                f"{name:>12}: {elapsed:8.3f} s, {len(texts) / elapsed:10.0f} /s"
+            )
+
+        if any(result != results["Regex"] for result in results.values()):
+            self.stderr.write(self.style.ERROR("The results differ."))
+        else:
+            self.stdout.write(self.style.SUCCESS("The results match."))
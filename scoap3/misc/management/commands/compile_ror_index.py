@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scoap3.misc.ror import RorIndex, read_dump
+from scoap3.misc.tasks import assign_ror_identifiers
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile the ROR index from a ROR data dump, as released or unzipped. "
+        "Running processes load it again on their next match."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dump")
+        parser.add_argument(
+            "--output",
+            "-o",
+            default=settings.ROR_INDEX_PATH,
+            help="File to write to, ROR_INDEX_PATH by default.",
+        )
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Then queue the matching of the affiliations without a ROR id.",
+        )
+
+    def handle(self, *args, dump, output, backfill, **options):
+        if not output:
+            raise CommandError("Give --output or set ROR_INDEX_PATH.")
+        index = RorIndex.build(read_dump(dump))
+        index.save(output)
+        self.stdout.write(
+            f"Indexed {len(index.ids)} institutions and {len(index.names)} names."
+        )
+        if backfill:
+            assign_ror_identifiers.delay()
+            self.stdout.write("Queued the ROR backfill.")
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from scoap3.articles.signals import bulk_changes, touch_articles
+from scoap3.authors.models import Author
+from scoap3.misc.countries import affiliation_text, infer_countries
+from scoap3.misc.models import Affiliation
+from scoap3.utils.cache import invalidate_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Infer the country of every affiliation from its text and report those "
+        "inferred differently from the stored one. Nothing is written without "
+        "--update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of processes to infer the countries with.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100000,
+            help="Number of affiliations loaded at a time.",
+        )
+        parser.add_argument(
+            "--min-confidence",
+            type=float,
+            default=settings.COUNTRY_INFERENCE_MIN_CONFIDENCE,
+            help="Confidence below which inferred countries are ignored.",
+        )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help="Store the countries inferred differently.",
+        )
+
+    def handle(self, *args, processes, chunk_size, min_confidence, update, **options):
+        after, inferred, differing = 0, 0, 0
+        while True:
+            rows = list(
+                Affiliation.objects.filter(pk__gt=after)
+                .order_by("pk")
+                .values_list("pk", "value", "organization", "country_id")[:chunk_size]
+            )
+            if not rows:
+                break
+            after = rows[-1][0]
+            results = infer_countries(
+                [
+                    affiliation_text(value, organization)
+                    for _, value, organization, _ in rows
+                ],
+                processes=processes,
+            )
+            changes = {}
+            for (pk, value, _, country), (code, confidence) in zip(rows, results):
+                if code is None or confidence < min_confidence:
+                    continue
+                inferred += 1
+                if code != country:
+                    changes[pk] = code
+                    self.stdout.write(
+                        f"{pk}: {country} -> {code} ({confidence:.2f}) {value}"
+                    )
+            differing += len(changes)
+            if update and changes:
+                self.update(changes)
+        self.stdout.write(
+            f"Inferred {inferred} countries, {differing} differing from the stored one."
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def update(changes):
+        with bulk_changes():
+            affiliations = list(Affiliation.objects.filter(pk__in=changes))
+            for affiliation in affiliations:
+                affiliation.country_id = changes[affiliation.pk]
+                # Merged into the canonical row of their new country, if any.
+                affiliation.fingerprint = None
+            Affiliation.objects.bulk_update(affiliations, ["country", "fingerprint"])
+        invalidate_models([Affiliation])
+        touch_articles(
+            Author.objects.filter(affiliation__in=changes).values_list(
+                "article_id", flat=True
+            )
+        )
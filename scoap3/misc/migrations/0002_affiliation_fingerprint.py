@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("misc", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="affiliation",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True, unique=True
+            ),
+        ),
+    ]
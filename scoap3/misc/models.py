@@ -18,6 +18,11 @@ class Affiliation(models.Model):
     country = models.ForeignKey("misc.Country", on_delete=models.CASCADE)
     value = models.CharField(max_length=255)
     organization = models.CharField(max_length=255)
+    #: Hash of the normalized affiliation, set on the canonical row of each
+    #: distinct affiliation, see ``scoap3.misc.affiliations``.
+    fingerprint = models.CharField(
+        max_length=64, null=True, blank=True, unique=True, editable=False
+    )
 
     class Meta:
         ordering = ["id"]
@@ -0,0 +1,35 @@
+"""
+Reference tables, read from the two-tier cache instead of Postgres.
+
+Countries, publishers, licenses and related materials are small and rarely
+written: each table is cached whole, as a list of rows, and invalidated in
+every process when one of its rows is written. A row missing from the
+cached table may just have been created; callers look it up in the database
+before assuming it does not exist.
+"""
+from scoap3.misc.models import Country, License, Publisher, RelatedMaterial
+from scoap3.utils.two_tier import TwoTierCache
+
+REFERENCE_MODELS = (Country, Publisher, License, RelatedMaterial)
+
+reference_cache = TwoTierCache("reference")
+
+
+def reference_key(model):
+    return model._meta.label_lower
+
+
+def reference_rows(model):
+    """The rows of the reference ``model``, as dicts of their field values."""
+    return reference_cache.get(
+        reference_key(model), lambda: list(model.objects.order_by("pk").values())
+    )
+
+
+def country_names():
+    """The name of each country, by code."""
+    return {row["code"]: row["name"] for row in reference_rows(Country)}
+
+
+def invalidate_references(models):
+    reference_cache.invalidate_on_commit(reference_key(model) for model in models)
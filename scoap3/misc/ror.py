@@ -0,0 +1,205 @@
+"""
+Matching of affiliations to ROR institutions, without network access.
+
+Affiliations are matched against a ``RorIndex`` compiled from a ROR data
+dump by the ``compile_ror_index`` command and stored at
+``settings.ROR_INDEX_PATH``. The index holds:
+
+* the exact names: every normalized name, alias, label and acronym mapped
+  to the institutions bearing it;
+* the token index: every name of two tokens or more filed under its
+  rarest token, which a text containing the whole name contains too;
+* the country of every institution, which candidates must share with the
+  affiliation when both are known.
+
+An affiliation is matched segment by segment, its organization first and
+then the comma separated parts of its value. A segment matches the
+institution with exactly its name or, failing that, the one whose longest
+name it wholly contains. Ambiguous segments match nothing.
+"""
+import json
+import os
+import pickle
+import threading
+import zipfile
+from collections import Counter, OrderedDict, defaultdict
+
+from django.conf import settings
+
+from scoap3.utils.text import normalize_text
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def read_dump(path):
+    """The records of a ROR data dump, as JSON or as the zip it is released in."""
+    if not zipfile.is_zipfile(path):
+        with open(path, encoding="utf-8") as dump:
+            return json.load(dump)
+    with zipfile.ZipFile(path) as archive:
+        names = [name for name in archive.namelist() if name.endswith(".json")]
+        # Releases carry the dump in both schemas, the newest sorts last.
+        with archive.open(sorted(names)[-1]) as dump:
+            return json.load(dump)
+
+
+def record_names(record):
+    """The ``(name, is_acronym)`` of a ROR record, in schema v1 or v2."""
+    if "names" in record:
+        for name in record["names"]:
+            yield name["value"], "acronym" in name.get("types", [])
+        return
+    yield record["name"], False
+    for alias in record.get("aliases", []):
+        yield alias, False
+    for label in record.get("labels", []):
+        yield label["label"], False
+    for acronym in record.get("acronyms", []):
+        yield acronym, True
+
+
+def record_country(record):
+    """The country code of a ROR record, in schema v1 or v2."""
+    if "locations" in record:
+        for location in record["locations"]:
+            return location.get("geonames_details", {}).get("country_code")
+        return None
+    return record.get("country", {}).get("country_code")
+
+
+class RorIndex:
+    """
+    The lookup tables of a ROR dump, see the module docstring.
+
+    Matches are kept in an LRU of ``cache_size`` entries keyed by the
+    normalized affiliation, re-delivered affiliations are not matched again.
+    """
+
+    def __init__(self, tables, cache_size=None):
+        self.tables = tables
+        self.ids = tables["ids"]
+        self.countries = tables["countries"]
+        self.names = tables["names"]
+        self.entries = tables["entries"]
+        self.postings = tables["postings"]
+        self.cache_size = cache_size or settings.ROR_MATCH_CACHE_SIZE
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, records, **kwargs):
+        ids, countries, names, entries = [], [], defaultdict(set), []
+        for record in records:
+            if record.get("status") == "withdrawn":
+                continue
+            position = len(ids)
+            ids.append(record["id"])
+            countries.append(record_country(record))
+            for name, acronym in record_names(record):
+                normalized = normalize_text(name)
+                if not normalized:
+                    continue
+                names[normalized].add(position)
+                tokens = frozenset(normalized.split())
+                if not acronym and len(tokens) > 1:
+                    entries.append((position, tokens))
+
+        frequency = Counter(token for _, tokens in entries for token in tokens)
+        postings = defaultdict(list)
+        for entry, (_, tokens) in enumerate(entries):
+            postings[min(tokens, key=lambda t: (frequency[t], t))].append(entry)
+        tables = {
+            "ids": ids,
+            "countries": countries,
+            "names": {name: tuple(sorted(found)) for name, found in names.items()},
+            "entries": entries,
+            "postings": dict(postings),
+        }
+        return cls(tables, **kwargs)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with open(path, "rb") as index:
+            return cls(pickle.load(index), **kwargs)
+
+    def save(self, path):
+        with open(path, "wb") as index:
+            pickle.dump(self.tables, index, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def match(self, value, organization="", country=None):
+        """The ROR id of an affiliation, ``None`` if it matches no institution."""
+        key = (normalize_text(value), normalize_text(organization), country)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        segments = [organization, *value.replace(";", ",").split(",")]
+        ror_id = None
+        for segment in segments:
+            found = self.match_segment(normalize_text(segment), country)
+            if len(found) == 1:
+                ror_id = self.ids[found.pop()]
+                break
+        with self._lock:
+            self._cache[key] = ror_id
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return ror_id
+
+    def match_many(self, affiliations):
+        """The ROR ids of ``(value, organization, country)`` affiliations."""
+        return [self.match(*affiliation) for affiliation in affiliations]
+
+    def in_country(self, position, country):
+        return not country or self.countries[position] in (None, country)
+
+    def match_segment(self, segment, country):
+        """The institutions a normalized segment of an affiliation names."""
+        if not segment:
+            return set()
+        exact = {p for p in self.names.get(segment, ()) if self.in_country(p, country)}
+        if exact:
+            return exact
+        tokens = set(segment.split())
+        longest, found = 0, set()
+        for token in tokens:
+            for entry in self.postings.get(token, ()):
+                position, name_tokens = self.entries[entry]
+                if len(name_tokens) < longest or not name_tokens <= tokens:
+                    continue
+                if not self.in_country(position, country):
+                    continue
+                if len(name_tokens) > longest:
+                    longest, found = len(name_tokens), set()
+                found.add(position)
+        return found
+
+
+def ror_index():
+    """
+    The index at ``settings.ROR_INDEX_PATH``, loaded once per process and
+    again when the file changes. ``None`` without one.
+    """
+    path = settings.ROR_INDEX_PATH
+    try:
+        version = (path, os.stat(path).st_mtime) if path else None
+    except OSError:
+        version = None
+    if version is None:
+        return None
+    with _lock:
+        if _loaded.get("version") != version:
+            _loaded.update(version=version, index=RorIndex.load(path))
+        return _loaded["index"]
+
+
+def match_affiliations(affiliations):
+    """
+    The ROR ids of ``(value, organization, country)`` affiliations, all
+    ``None`` without an index.
+    """
+    index = ror_index()
+    if index is None:
+        return [None] * len(affiliations)
+    return index.match_many(affiliations)
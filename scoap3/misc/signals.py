@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from scoap3.misc.models import Affiliation
+from scoap3.misc.reference import REFERENCE_MODELS, invalidate_references
+
+
+def reference_written(sender, **kwargs):
+    invalidate_references([sender])
+
+
+for model in REFERENCE_MODELS:
+    post_save.connect(reference_written, sender=model)
+    post_delete.connect(reference_written, sender=model)
+
+
+@receiver(pre_save, sender=Affiliation)
+def affiliation_saving(sender, instance, **kwargs):
+    # Once edited, it is no longer the canonical row of what it was; the
+    # merge job fingerprints it again, see ``scoap3.misc.affiliations``.
+    if not instance._state.adding:
+        instance.fingerprint = None
@@ -0,0 +1,30 @@
+from django.conf import settings
+
+from config import celery_app
+from scoap3.misc.affiliations import assign_rors, merge_affiliations
+
+
+@celery_app.task(soft_time_limit=30 * 60, time_limit=35 * 60)
+def merge_duplicate_affiliations():
+    """
+    Merge a batch of duplicate affiliations into their canonical rows.
+
+    Runs again right away while full batches are found.
+    """
+    merged = merge_affiliations(settings.AFFILIATION_MERGE_BATCH_SIZE)
+    if merged == settings.AFFILIATION_MERGE_BATCH_SIZE:
+        merge_duplicate_affiliations.delay()
+    return merged
+
+
+# Loading the ROR index alone can take minutes.
+@celery_app.task(soft_time_limit=30 * 60, time_limit=35 * 60)
+def assign_ror_identifiers(after=0):
+    """
+    Match a chunk of the affiliations without a ROR identifier, from the id
+    ``after`` on, then queue the next chunk.
+    """
+    last = assign_rors(after, settings.ROR_BACKFILL_CHUNK_SIZE)
+    if last is not None:
+        assign_ror_identifiers.delay(last)
+    return last
@@ -0,0 +1,61 @@
+from factory import Faker, LazyAttribute, Sequence, SubFactory
+from factory.django import DjangoModelFactory
+
+from scoap3.misc.models import (
+    Affiliation,
+    Country,
+    InstitutionIdentifier,
+    InstitutionIdentifierType,
+    PublicationInfo,
+    Publisher,
+)
+
+
+class CountryFactory(DjangoModelFactory):
+    code = Sequence(lambda n: f"{chr(65 + n // 26 % 26)}{chr(65 + n % 26)}")
+    name = LazyAttribute(lambda o: f"Country {o.code}")
+
+    class Meta:
+        model = Country
+        django_get_or_create = ["code"]
+
+
+class AffiliationFactory(DjangoModelFactory):
+    country = SubFactory(CountryFactory)
+    value = Faker("company")
+    organization = Faker("company")
+
+    class Meta:
+        model = Affiliation
+
+
+class InstitutionIdentifierFactory(DjangoModelFactory):
+    affiliation_id = SubFactory(AffiliationFactory)
+    identifier_type = InstitutionIdentifierType.ROR
+    identifier_value = Faker("bothify", text="https://ror.org/0#??##?##")
+
+    class Meta:
+        model = InstitutionIdentifier
+
+
+class PublisherFactory(DjangoModelFactory):
+    name = Sequence(lambda n: f"Publisher {n}")
+
+    class Meta:
+        model = Publisher
+        django_get_or_create = ["name"]
+
+
+class PublicationInfoFactory(DjangoModelFactory):
+    article_id = SubFactory("scoap3.articles.tests.factories.ArticleFactory")
+    journal_title = "Physics Letters B"
+    journal_volume = Faker("numerify", text="###")
+    page_start = 1
+    page_end = 10
+    artid = Faker("numerify", text="######")
+    volume_year = "2023"
+    journal_issue_date = Faker("date_object")
+    publisher = SubFactory(PublisherFactory)
+
+    class Meta:
+        model = PublicationInfo
@@ -0,0 +1,151 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from scoap3.articles.ingest import ingest_batch
+from scoap3.articles.models import Article
+from scoap3.articles.tests.test_ingest import article_document
+from scoap3.authors.author_lists import article_authors
+from scoap3.authors.models import ArticleAuthorList
+from scoap3.authors.tests.factories import AuthorFactory
+from scoap3.misc.affiliations import (
+    AffiliationResolver,
+    affiliation_fingerprint,
+    merge_affiliations,
+)
+from scoap3.misc.models import Affiliation
+from scoap3.misc.tests.factories import (
+    AffiliationFactory,
+    CountryFactory,
+    InstitutionIdentifierFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def country(db):
+    return CountryFactory(code="CH", name="Switzerland")
+
+
+def affiliation_document(value="CERN, Geneva"):
+    return {"value": value, "organization": "CERN", "country": "CH"}
+
+
+def test_ingested_articles_share_canonical_affiliations(country):
+    first, second = article_document(doi="a"), article_document(doi="b")
+    for author in second["authors"]:
+        author["affiliations"] = [affiliation_document("cern  GENEVA")]
+
+    ingest_batch([first])
+    ingest_batch([second])
+
+    affiliation = Affiliation.objects.get()
+    assert affiliation.value == "CERN, Geneva"
+    assert affiliation.fingerprint
+    assert affiliation.author_id.count() == 4
+
+
+def test_identifiers_added_to_shared_rows_reach_their_articles(
+    country, django_capture_on_commit_callbacks
+):
+    first, second = article_document(doi="a", authors=1), article_document(doi="b")
+    ror = {"identifier_type": "ROR", "identifier_value": "https://ror.org/01ggx4157"}
+    second["authors"][0]["affiliations"][0]["identifiers"] = [ror]
+    with django_capture_on_commit_callbacks(execute=True):
+        (result,) = ingest_batch([first])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ingest_batch([second])
+
+    packed = ArticleAuthorList.objects.get(article_id=result["id"]).data
+    assert packed["affiliations"][0][4] == [["ROR", ror["identifier_value"]]]
+
+
+def test_resolver_keeps_the_batch_lookups(country):
+    resolver = AffiliationResolver()
+    (created,) = resolver.resolve([affiliation_document()]).values()
+
+    with CaptureQueriesContext(connection) as context:
+        ids = resolver.resolve([affiliation_document(), affiliation_document()])
+
+    assert list(ids.values()) == [created]
+    assert context.captured_queries == []
+    assert AffiliationResolver().resolve([affiliation_document()]) == ids
+
+
+def test_merge_moves_the_links_to_the_canonical_row(country):
+    canonical = AffiliationResolver().resolve([affiliation_document()])
+    (canonical_id,) = canonical.values()
+    duplicates = [
+        AffiliationFactory(country=country, value=value, organization="CERN")
+        for value in ("CERN, Geneva", "Cern Geneva", "CERN; Geneva")
+    ]
+    other = AffiliationFactory(country=country, value="EPFL", organization="EPFL")
+    author, shared = AuthorFactory(), AuthorFactory()
+    duplicates[0].author_id.add(author, shared)
+    duplicates[1].author_id.add(shared)
+    Affiliation.objects.get(pk=canonical_id).author_id.add(shared)
+
+    assert merge_affiliations(batch_size=10) == 4
+
+    assert set(Affiliation.objects.values_list("pk", flat=True)) == {
+        canonical_id,
+        other.pk,
+    }
+    merged = Affiliation.objects.get(pk=canonical_id)
+    assert set(merged.author_id.values_list("pk", flat=True)) == {
+        author.pk,
+        shared.pk,
+    }
+    assert Affiliation.objects.get(pk=other.pk).fingerprint
+    # The articles of the relinked authors are rebuilt.
+    affiliations = article_authors(author.article_id)[0]["affiliations"]
+    assert [a["id"] for a in affiliations] == [canonical_id]
+
+
+def test_merge_keeps_the_identifiers_of_merged_rows(country):
+    canonical = AffiliationFactory(country=country, value="CERN", organization="CERN")
+    duplicate = AffiliationFactory(country=country, value="cern", organization="CERN")
+    for affiliation, value in ((canonical, "a"), (duplicate, "a"), (duplicate, "b")):
+        InstitutionIdentifierFactory(affiliation_id=affiliation, identifier_value=value)
+
+    merge_affiliations(batch_size=10)
+
+    assert Affiliation.objects.get().pk == canonical.pk
+    assert sorted(
+        canonical.institutionidentifier_set.values_list("identifier_value", flat=True)
+    ) == ["a", "b"]
+
+
+def test_merge_touches_the_articles_of_canonical_rows_gaining_identifiers(country):
+    canonical = AffiliationFactory(country=country, value="CERN", organization="CERN")
+    duplicate = AffiliationFactory(country=country, value="cern", organization="CERN")
+    canonical.fingerprint = affiliation_fingerprint(canonical)
+    canonical.save()
+    author = AuthorFactory()
+    canonical.author_id.add(author)
+    InstitutionIdentifierFactory(affiliation_id=duplicate, identifier_value="a")
+    touched = Article.objects.get(pk=author.article_id_id).updated_at
+
+    merge_affiliations(batch_size=10)
+
+    assert Article.objects.get(pk=author.article_id_id).updated_at > touched
+
+
+def test_merge_works_in_batches(country):
+    AffiliationFactory.create_batch(3, country=country)
+
+    assert merge_affiliations(batch_size=2) == 2
+    assert merge_affiliations(batch_size=2) == 1
+    assert merge_affiliations(batch_size=2) == 0
+
+
+def test_edited_rows_lose_their_fingerprint(country):
+    (pk,) = AffiliationResolver().resolve([affiliation_document()]).values()
+    affiliation = Affiliation.objects.get(pk=pk)
+
+    affiliation.value = "CERN, Meyrin"
+    affiliation.save()
+
+    assert Affiliation.objects.get(pk=pk).fingerprint is None
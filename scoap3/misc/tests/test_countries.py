@@ -0,0 +1,115 @@
+import pytest
+from django.core.management import call_command
+
+from scoap3.articles.ingest import ingest_batch
+from scoap3.articles.tests.test_ingest import article_document
+from scoap3.misc.countries import (
+    CountryMatcher,
+    RegexCountryMatcher,
+    country_patterns,
+    infer_countries,
+)
+from scoap3.misc.models import Affiliation
+from scoap3.misc.tests.factories import AffiliationFactory, CountryFactory
+
+NAMES = {"CH": "Switzerland", "FR": "France", "US": "United States", "GE": "Georgia"}
+PATTERNS = country_patterns(NAMES)
+
+
+@pytest.fixture
+def countries(db):
+    return {code: CountryFactory(code=code, name=name) for code, name in NAMES.items()}
+
+
+class TestCountryMatcher:
+    @pytest.mark.parametrize("matcher_class", [CountryMatcher, RegexCountryMatcher])
+    @pytest.mark.parametrize(
+        "text, code",
+        [
+            ("Department of Physics, University of Zürich, Switzerland", "CH"),
+            ("LAPP, Université Savoie Mont Blanc, CNRS/IN2P3, Annecy", "FR"),
+            ("Fermi National Accelerator Laboratory, Batavia, IL, USA", "US"),
+            ("Tbilisi State University, Tbilisi, GEORGIA", "GE"),
+        ],
+    )
+    def test_infers_the_country(self, matcher_class, text, code):
+        assert matcher_class(PATTERNS).infer(text)[0] == code
+
+    def test_unknown_affiliations_have_no_country(self):
+        assert CountryMatcher(PATTERNS).infer("Institute of Physics") == (None, 0.0)
+
+    def test_confidence_is_the_share_of_the_best_country(self):
+        matcher = CountryMatcher(PATTERNS)
+
+        assert matcher.infer("CERN, Meyrin, Switzerland") == ("CH", 1.0)
+        code, confidence = matcher.infer("CERN, Geneva, Switzerland and Paris, France")
+        assert code == "CH"
+        assert 0.5 < confidence < 1
+
+    def test_longest_overlapping_pattern_wins(self):
+        matcher = CountryMatcher(
+            [("New York", "US", 0.6), ("York", "GB", 1.0), ("New", "XX", 1.0)]
+        )
+
+        assert matcher.infer("New York University") == ("US", 1.0)
+        assert matcher.infer("University of York") == ("GB", 1.0)
+
+    def test_patterns_ending_inside_others_are_found(self):
+        matcher = CountryMatcher([("a b c d", "AA", 1.0), ("b c", "BB", 1.0)])
+
+        assert matcher.matches("a b c e".split()) == [(1, 3, "BB", 1.0)]
+
+    def test_agrees_with_the_regex_baseline(self):
+        texts = [
+            "CERN, Geneva, Switzerland",
+            "Paris and Zurich",
+            "SLAC, Stanford, CA, United States of America",
+            "IJCLab, Orsay, France; CERN",
+            "Nowhere",
+        ]
+        automaton, regex = CountryMatcher(PATTERNS), RegexCountryMatcher(PATTERNS)
+
+        assert [automaton.infer(t) for t in texts] == [regex.infer(t) for t in texts]
+
+
+def test_batches_over_processes_infer_alike(countries):
+    texts = ["CERN, Geneva", "Fermilab, Batavia, USA", "Nowhere"] * 5
+
+    assert infer_countries(texts, processes=2, chunk_size=4) == infer_countries(texts)
+
+
+def test_ingest_infers_missing_countries(countries, settings):
+    settings.COUNTRY_INFERENCE_MIN_CONFIDENCE = 0.6
+    inferred, uninferable = article_document(doi="a"), article_document(doi="b")
+    for document in (inferred, uninferable):
+        del document["authors"][0]["affiliations"][0]["country"]
+    uninferable["authors"][0]["affiliations"][0].update(
+        value="Department of Physics", organization="Institute of Physics"
+    )
+
+    results = ingest_batch([inferred, uninferable])
+
+    assert [r["status"] for r in results] == ["created", "invalid"]
+    assert results[1]["errors"] == {
+        "country": ["Cannot infer the country of: Department of Physics"]
+    }
+    assert set(Affiliation.objects.values_list("country_id", flat=True)) == {"CH"}
+
+
+def test_backfill_command_updates_differing_countries(countries, capsys):
+    wrong = AffiliationFactory(
+        country=countries["US"], value="CERN, Geneva, Switzerland", organization=""
+    )
+    right = AffiliationFactory(
+        country=countries["FR"], value="IJCLab, Orsay, France", organization=""
+    )
+
+    call_command("infer_affiliation_countries", "--chunk-size=1")
+    wrong.refresh_from_db()
+    assert wrong.country_id == "US"
+
+    call_command("infer_affiliation_countries", "--update")
+    wrong.refresh_from_db()
+    right.refresh_from_db()
+    assert (wrong.country_id, right.country_id) == ("CH", "FR")
+    assert "1 differing" in capsys.readouterr().out
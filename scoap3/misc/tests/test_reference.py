@@ -0,0 +1,130 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from scoap3.articles.ingest import resolve, validate_documents
+from scoap3.articles.tests.test_ingest import article_document
+from scoap3.misc.models import Country, Publisher
+from scoap3.misc.reference import country_names, reference_cache, reference_rows
+from scoap3.misc.tests.factories import CountryFactory, PublisherFactory
+from scoap3.utils.two_tier import TwoTierCache, handle_message
+
+pytestmark = pytest.mark.django_db
+
+
+def table_queries(context, table):
+    return [q for q in context.captured_queries if f'"{table}"' in q["sql"]]
+
+
+def test_country_codes_are_resolved_without_queries():
+    CountryFactory(code="CH")
+    CountryFactory(code="FR")
+    document = article_document(authors=300)
+    for author in document["authors"]:
+        author["affiliations"] = [
+            {"value": f"Institute {i}", "organization": "CERN", "country": "CH"}
+            for i in range(10)
+        ]
+    country_names()
+
+    with CaptureQueriesContext(connection) as context:
+        valid, errors = validate_documents([document])
+
+    assert (len(valid), errors) == (1, {})
+    assert table_queries(context, "misc_country") == []
+
+
+def test_codes_missing_from_the_cache_are_looked_up():
+    country_names()
+    CountryFactory(code="CH")
+
+    valid, errors = validate_documents([article_document(country="CH")])
+
+    assert (len(valid), errors) == (1, {})
+
+
+def test_resolve_finds_cached_reference_rows():
+    publisher = PublisherFactory(name="Elsevier")
+    reference_rows(Publisher)
+
+    with CaptureQueriesContext(connection) as context:
+        ids = resolve(Publisher, ("name",), [{"name": "Elsevier"}])
+
+    assert ids == {("Elsevier",): publisher.pk}
+    assert table_queries(context, "misc_publisher") == []
+
+
+def test_writes_invalidate_on_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        country = CountryFactory(code="CH", name="Switzerland")
+    assert country_names()["CH"] == "Switzerland"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        country.name = "Confoederatio Helvetica"
+        country.save()
+
+    assert country_names()["CH"] == "Confoederatio Helvetica"
+
+
+def test_invalidates_at_once_outside_transactions():
+    two_tier = TwoTierCache("test-autocommit")
+    two_tier.get("key", lambda: 1)
+
+    # A thread of its own, whose connection is in autocommit mode.
+    with ThreadPoolExecutor(1) as executor:
+        executor.submit(two_tier.invalidate_on_commit, ["key"]).result()
+
+    assert two_tier.get("key", lambda: 2) == 2
+
+
+def test_values_loaded_during_an_invalidation_are_not_kept():
+    two_tier = TwoTierCache("test-race")
+
+    def load_stale():
+        # Another process commits and invalidates the key meanwhile.
+        two_tier.invalidate(["key"])
+        return "stale"
+
+    assert two_tier.get("key", load_stale) == "stale"
+    assert two_tier.get("key", lambda: "fresh") == "fresh"
+
+
+def test_counts_hits_and_misses():
+    two_tier = TwoTierCache("test-counters")
+    two_tier.get("key", lambda: 1)
+    two_tier.get("key", lambda: 1)
+    two_tier.discard("key")
+    two_tier.get("key", lambda: 1)
+
+    assert two_tier.counters == {"misses": 1, "local_hits": 1, "shared_hits": 1}
+
+
+def test_evicts_least_recently_used():
+    two_tier = TwoTierCache("test-lru", maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        two_tier.get(key, lambda: key)
+
+    assert list(two_tier._entries) == ["a", "c"]
+
+
+def test_invalidation_messages_drop_local_entries():
+    reference_rows(Country)
+
+    handle_message(json.dumps({"cache": "reference", "keys": ["misc.country"]}))
+
+    assert "misc.country" not in reference_cache._entries
+
+
+def test_stats_are_admin_only(api_client: APIClient, admin_client):
+    url = reverse("api:cache-stats-list")
+    country_names()
+
+    assert api_client.get(url).status_code == 403
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    assert response.json()["caches"]["reference"]["misses"]
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from scoap3.articles.ingest import ingest_batch
+from scoap3.articles.tests.test_ingest import article_document
+from scoap3.misc.affiliations import assign_rors
+from scoap3.misc.models import Affiliation, InstitutionIdentifier
+from scoap3.misc.ror import RorIndex
+from scoap3.misc.tests.factories import AffiliationFactory, CountryFactory
+
+pytestmark = pytest.mark.django_db
+
+GENEVA = "https://ror.org/01swzsf04"
+CERN = "https://ror.org/01ggx4157"
+RECORDS = [
+    {
+        "id": GENEVA,
+        "status": "active",
+        "names": [
+            {"value": "University of Geneva", "types": ["ror_display", "label"]},
+            {"value": "Université de Genève", "types": ["label"]},
+            {"value": "UNIGE", "types": ["acronym"]},
+        ],
+        "locations": [{"geonames_details": {"country_code": "CH"}}],
+    },
+    {
+        "id": CERN,
+        "status": "active",
+        "name": "European Organization for Nuclear Research",
+        "aliases": ["CERN"],
+        "acronyms": [],
+        "labels": [],
+        "country": {"country_code": "CH"},
+    },
+    {
+        "id": "https://ror.org/00w8dqq56",
+        "status": "active",
+        "name": "University of Geneva Medical School",
+        "country": {"country_code": "US"},
+    },
+    {
+        "id": "https://ror.org/withdrawn",
+        "status": "withdrawn",
+        "name": "Geneva Institute",
+        "country": {"country_code": "CH"},
+    },
+]
+
+
+@pytest.fixture
+def index():
+    return RorIndex.build(RECORDS, cache_size=10)
+
+
+@pytest.fixture
+def compiled(tmp_path, settings):
+    dump = tmp_path / "ror.json"
+    dump.write_text(json.dumps(RECORDS))
+    settings.ROR_INDEX_PATH = str(tmp_path / "ror.pickle")
+    call_command("compile_ror_index", str(dump))
+    return settings.ROR_INDEX_PATH
+
+
+class TestRorIndex:
+    def test_exact_names_aliases_and_acronyms(self, index):
+        assert index.match("University of Geneva") == GENEVA
+        assert index.match("UNIVERSITE DE GENEVE") == GENEVA
+        assert index.match("Meyrin", organization="CERN") == CERN
+        assert index.match("UNIGE", country="CH") == GENEVA
+
+    def test_names_contained_in_a_segment(self, index):
+        value = "Department of Physics, University of Geneva, 1211 Geneva"
+
+        assert index.match(value, country="CH") == GENEVA
+
+    def test_longest_contained_name_wins_in_its_country(self, index):
+        value = "University of Geneva Medical School, Geneva"
+
+        assert index.match(value, country="US") == "https://ror.org/00w8dqq56"
+        assert index.match(value, country="CH") == GENEVA
+
+    def test_unknown_and_withdrawn_institutions(self, index):
+        assert index.match("Geneva Institute") is None
+        assert index.match("Department of Physics", country="CH") is None
+
+    def test_matches_are_cached_by_normalized_affiliation(self, index):
+        index.match("University of Geneva", country="CH")
+        index.match("university of GENEVA", country="CH")
+
+        assert len(index._cache) == 1
+
+    def test_saved_index_matches_alike(self, index, tmp_path):
+        index.save(tmp_path / "ror.pickle")
+
+        loaded = RorIndex.load(tmp_path / "ror.pickle", cache_size=10)
+
+        assert loaded.match("CERN") == CERN
+
+
+def test_ingested_affiliations_get_their_ror(compiled):
+    CountryFactory(code="CH")
+    document = article_document(authors=1)
+    document["authors"][0]["affiliations"][0]["value"] = "CERN, Geneva"
+
+    ingest_batch([document])
+
+    identifier = InstitutionIdentifier.objects.get()
+    assert (identifier.identifier_type, identifier.identifier_value) == ("ROR", CERN)
+
+
+def test_backfill_matches_affiliations_by_chunks(compiled):
+    country = CountryFactory(code="CH")
+    first, second, _ = (
+        AffiliationFactory(country=country, value=value, organization="")
+        for value in ("University of Geneva", "CERN", "Unknown Institute")
+    )
+
+    assert assign_rors(0, chunk_size=2) == second.pk
+    assert assign_rors(second.pk, chunk_size=2) == Affiliation.objects.last().pk
+    assert assign_rors(Affiliation.objects.last().pk, chunk_size=2) is None
+
+    rors = InstitutionIdentifier.objects.values_list(
+        "affiliation_id", "identifier_value"
+    )
+    assert set(rors) == {(first.pk, GENEVA), (second.pk, CERN)}
+
+
+def test_backfill_needs_an_index(settings):
+    settings.ROR_INDEX_PATH = None
+    AffiliationFactory()
+
+    assert assign_rors(0, chunk_size=10) is None
@@ -0,0 +1,35 @@
+import hashlib
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+from scoap3.utils.two_tier import TwoTierCache
+
+#: Users and tokens by hashed token key, see ``scoap3.users.signals`` for the
+#: invalidation.
+token_cache = TwoTierCache(
+    "tokens",
+    maxsize=1024,
+    timeout=settings.API_TOKEN_CACHE_TIMEOUT,
+    local_timeout=settings.API_TOKEN_CACHE_TIMEOUT,
+)
+
+
+def token_cache_key(key):
+    # Token keys are credentials, they are not stored as such.
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication without a query per request.
+
+    The user and token of a key are kept in the two-tier cache for
+    ``API_TOKEN_CACHE_TIMEOUT`` seconds. Deleting the token or saving its
+    user, to deactivate them for instance, invalidates them in every
+    process. Invalid keys are not cached.
+    """
+
+    def authenticate_credentials(self, key):
+        load = super().authenticate_credentials
+        return token_cache.get(token_cache_key(key), lambda: load(key))
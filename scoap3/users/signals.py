@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from scoap3.users.authentication import token_cache, token_cache_key
+from scoap3.users.models import User
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    token_cache.invalidate_on_commit([token_cache_key(instance.key)])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    # Deactivated users, and changed permissions, take effect at once.
+    keys = Token.objects.filter(user=instance).values_list("key", flat=True)
+    if keys:
+        token_cache.invalidate_on_commit(token_cache_key(key) for key in keys)
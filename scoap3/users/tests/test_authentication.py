@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from scoap3.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def token(user: User, django_capture_on_commit_callbacks) -> Token:
+    with django_capture_on_commit_callbacks(execute=True):
+        return Token.objects.create(user=user)
+
+
+@pytest.fixture
+def token_client(token: Token) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def test_cached_token_skips_the_query(token_client: APIClient):
+    url = reverse("api:country-list")
+    assert token_client.get(url).status_code == 200
+
+    with CaptureQueriesContext(connection) as context:
+        assert token_client.get(url).status_code == 200
+
+    assert not any("authtoken_token" in q["sql"] for q in context.captured_queries)
+
+
+def test_deleted_token_is_rejected(
+    token_client: APIClient, token: Token, django_capture_on_commit_callbacks
+):
+    url = reverse("api:country-list")
+    token_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        token.delete()
+
+    assert token_client.get(url).status_code == 403
+
+
+def test_deactivated_user_is_rejected(
+    token_client: APIClient, user: User, django_capture_on_commit_callbacks
+):
+    url = reverse("api:country-list")
+    token_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+
+    assert token_client.get(url).status_code == 403
+
+
+def test_invalid_token_is_rejected():
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+    assert client.get(reverse("api:country-list")).status_code == 403
@@ -0,0 +1,235 @@
+"""
+Response cache of the read endpoints, invalidated by version keys.
+
+Each model, and each article, has a version stored in the cache. A cached
+response is keyed by the versions of the models it was rendered from, so
+bumping a version makes the responses depending on it unreachable, and
+they expire on their own. Writes bump the versions of the models, and of
+the articles, they touched: the other cached responses stay valid.
+
+Responses of models with a modification time also carry an ETag and
+Last-Modified, so that clients polling unchanged objects are answered
+``304 Not Modified``.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from scoap3.utils.fieldsets import model_field, requested_names
+from scoap3.utils.transactions import CommitBatch
+
+VERSION_KEY = "api:version:{}"
+RESPONSE_KEY = "api:response:{}:{}"
+VALIDATORS_KEY = "api:validators:{}"
+
+
+def model_scope(model):
+    return f"model:{model._meta.label_lower}"
+
+
+def article_scope(article_id):
+    return f"article:{article_id}"
+
+
+def get_versions(scopes):
+    """The current versions of ``scopes``, created for those without one."""
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, "") for key in keys]
+
+
+def bump_versions(scopes):
+    cache.set_many(
+        {VERSION_KEY.format(scope): uuid.uuid4().hex for scope in scopes},
+        timeout=None,
+    )
+
+
+pending_bumps = CommitBatch(bump_versions)
+
+
+def invalidate(scopes):
+    """
+    Bump the versions of ``scopes`` now and once the transaction commits.
+
+    The second bump drops the responses cached from the old rows while the
+    transaction was in flight. The scopes touched by a transaction are
+    bumped together, however many rows it wrote.
+    """
+    scopes = set(scopes)
+    if scopes and connection.in_atomic_block:
+        bump_versions(scopes)
+    pending_bumps.add(scopes)
+
+
+def invalidate_models(models):
+    invalidate(model_scope(model) for model in models)
+
+
+def invalidate_articles(article_ids):
+    invalidate(article_scope(article_id) for article_id in article_ids)
+
+
+def scope_validators(scopes, salt=""):
+    """
+    An ETag and the last modification time of a response rendered from
+    ``scopes``, without a query.
+
+    The ETag comes from their versions and ``salt``. The modification time
+    is when those versions were first served, cached along: any write bumps
+    the versions, and so moves both.
+    """
+    versions = ":".join(get_versions(scopes))
+    digest = hashlib.md5(f"{versions}:{salt}".encode()).hexdigest()
+    key = VALIDATORS_KEY.format(digest)
+    validators = quote_etag(digest), timezone.now()
+    cache.add(key, validators, timeout=settings.API_CACHE_TIMEOUT)
+    return cache.get(key, validators)
+
+
+def served_validators(objects, field, salt=""):
+    """
+    An ETag and the last modification time of the ``objects`` served.
+
+    Both come from their keys and ``field`` values, without a query, and
+    ``salt`` is mixed into the ETag. ``None`` without objects.
+    """
+    stamps = [(obj.pk, getattr(obj, field)) for obj in objects]
+    if not stamps:
+        return None
+    listed = ",".join(f"{pk}@{stamp.isoformat()}" for pk, stamp in stamps)
+    digest = hashlib.md5(f"{listed}:{salt}".encode()).hexdigest()
+    return quote_etag(digest), max(stamp for _, stamp in stamps)
+
+
+def conditional_response(request, response=None, validators=None):
+    """
+    Answer a conditional request from ``validators``, as returned by
+    ``scope_validators`` or ``served_validators``.
+
+    Without ``response``, returns the ``304 Not Modified`` response if the
+    client's copy is current, ``None`` otherwise. With it, returns it with
+    the validators set.
+    """
+    if validators is None:
+        return response
+    etag, last_modified = validators
+    if response is None:
+        return get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp())
+        )
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Serve the ``list`` and ``retrieve`` actions from the cache.
+
+    Responses are keyed by the full path and by the versions of the view's
+    model, of ``cache_models``, the other models it renders, and of the
+    models of the relations expanded. With
+    ``cache_article_scoped``, objects are articles and a retrieved one is
+    keyed by its own version instead of the model's. Only JSON responses
+    are cached, the browsable API renders per user forms.
+
+    With ``validators_field``, responses carry an ETag and Last-Modified
+    from the keys and the latest value of that field of the objects served,
+    cached under the same versions as the response: conditional requests
+    for unchanged objects are answered ``304 Not Modified`` without a
+    query. Actions other than ``list`` and ``retrieve`` set ``served``.
+    """
+
+    cache_models = ()
+    cache_article_scoped = False
+    validators_field = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def lookup_value(self):
+        return self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+
+    def expanded_models(self, model):
+        """The models of the relations ``?expand=`` renders in full."""
+        fields = (
+            model_field(model, name) for name in requested_names(self.request, "expand")
+        )
+        return {
+            field.related_model for field in fields if field and field.related_model
+        }
+
+    def cache_scopes(self):
+        model = self.get_queryset().model
+        related = {*self.cache_models, *self.expanded_models(model)}
+        scopes = sorted(model_scope(other) for other in related)
+        lookup = self.lookup_value()
+        if self.cache_article_scoped and lookup is not None:
+            scopes.append(article_scope(lookup))
+        else:
+            scopes.append(model_scope(model))
+        return scopes
+
+    def response_cache_key(self, request, versions):
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return RESPONSE_KEY.format(path, versions)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if isinstance(queryset, QuerySet):
+            self.served = page
+        return page
+
+    def get_object(self):
+        obj = super().get_object()
+        self.served = [obj]
+        return obj
+
+    def cached_response(self, action, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return action(request, *args, **kwargs)
+        versions = ":".join(get_versions(self.cache_scopes()))
+        versions = hashlib.md5(versions.encode()).hexdigest()
+        key = self.response_cache_key(request, versions)
+        validators = None
+        if self.validators_field is not None:
+            validators = cache.get(VALIDATORS_KEY.format(key))
+            not_modified = conditional_response(request, validators=validators)
+            if not_modified is not None:
+                return not_modified
+        data = cache.get(key)
+        if data is not None:
+            return conditional_response(request, Response(data), validators)
+        self.served = None
+        response = action(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        cache.set(key, response.data, timeout=settings.API_CACHE_TIMEOUT)
+        if self.validators_field is None or self.served is None:
+            return response
+        # Rows of ``cache_models`` change the response but not the field.
+        validators = served_validators(self.served, self.validators_field, versions)
+        cache.set(
+            VALIDATORS_KEY.format(key), validators, timeout=settings.API_CACHE_TIMEOUT
+        )
+        not_modified = conditional_response(request, validators=validators)
+        if not_modified is not None:
+            return not_modified
+        return conditional_response(request, response, validators)
@@ -0,0 +1,169 @@
+"""
+Sparse fieldsets: ``?fields=``, ``?omit=`` and ``?expand=`` on read endpoints.
+
+``SparseFieldsetMixin`` trims the fields of a serializer to those a GET
+request asks for, and replaces the ids of ``expandable_fields`` with the
+related objects. ``SparseFieldsetFilter`` loads only what these fields
+need: the columns they read, through ``only()``, and the relations they
+render, prefetched. Each parameter takes comma separated field names and
+can be repeated.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+FIELDSET_PARAMS = {
+    "fields": "Only return these fields.",
+    "omit": "Leave these fields out.",
+    "expand": "Return these related objects instead of their ids.",
+}
+
+
+def requested_names(request, param):
+    return {
+        name.strip()
+        for value in request.query_params.getlist(param)
+        for name in value.split(",")
+        if name.strip()
+    }
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin reading the fieldset parameters of the request.
+
+    ``expandable_fields`` maps related fields to the serializer, or its
+    dotted path, rendering them when expanded. Only the outermost serializer
+    reads the parameters; ``prefetch_plan``, if any, lists the lookups of
+    each nested field.
+    """
+
+    expandable_fields = {}
+    prefetch_plan = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+        if self.parent is not None and not (
+            isinstance(self.parent, ListSerializer) and self.parent.parent is None
+        ):
+            return fields
+
+        for name in requested_names(request, "expand"):
+            if name not in self.expandable_fields or name not in fields:
+                raise ValidationError({"expand": [f"Cannot expand: {name}."]})
+            serializer_class = self.expandable_fields[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            fields[name] = serializer_class(
+                source=fields[name].source,
+                many=isinstance(fields[name], ManyRelatedField),
+                read_only=True,
+            )
+        selected = requested_names(request, "fields") or set(fields)
+        omitted = requested_names(request, "omit")
+        unknown = (selected | omitted) - set(fields)
+        if unknown:
+            raise ValidationError(
+                {"fields": [f"Unknown field: {name}." for name in sorted(unknown)]}
+            )
+        return {
+            name: field
+            for name, field in fields.items()
+            if name in selected and name not in omitted
+        }
+
+    def load_only(self, queryset, columns=()):
+        """
+        Restrict ``queryset`` to the columns and relations of the fields,
+        with ``columns`` loaded as well.
+        """
+        model = queryset.model
+        columns, lookups = {model._meta.pk.name, *columns}, []
+        for name, field in self.fields.items():
+            if name in self.prefetch_plan:
+                lookups += self.prefetch_plan[name]
+                continue
+            field_columns, field_lookups = related_loads(model, field)
+            columns.update(field_columns)
+            lookups += field_lookups
+        return queryset.only(*columns).prefetch_related(*lookups)
+
+
+def model_field(model, source):
+    """The model field, or reverse relation, read by ``source``."""
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        pass
+    for relation in model._meta.related_objects:
+        if relation.get_accessor_name() == source:
+            return relation
+    return None
+
+
+def related_loads(model, field, prefix=""):
+    """The columns of ``model`` read by ``field`` and the lookups to prefetch."""
+    source = field.source
+    if isinstance(field, ListSerializer):
+        field = field.child
+    target = model_field(model, source) if "." not in source else None
+    if target is None:
+        return set(), []
+    columns = {target.name} if target.concrete and not target.many_to_many else set()
+    if not target.is_relation:
+        return columns, []
+    many = target.many_to_many or target.one_to_many
+    lookups = [prefix + source] if many or isinstance(field, BaseSerializer) else []
+    if isinstance(field, BaseSerializer):
+        # Relations rendered by an expanded or nested serializer.
+        for child in field.fields.values():
+            lookups += related_loads(
+                target.related_model, child, prefix=f"{prefix}{source}__"
+            )[1]
+    return columns, lookups
+
+
+class SparseFieldsetFilter(BaseFilterBackend):
+    """
+    Load only the columns and relations of the fields a GET request asks for,
+    see ``SparseFieldsetMixin``. Columns the paginator reads from the page,
+    and the view's ``validators_field``, are loaded too.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if request.method not in SAFE_METHODS:
+            return queryset
+        serializer = view.get_serializer()
+        if not isinstance(serializer, SparseFieldsetMixin):
+            return queryset
+        columns = set()
+        get_ordering = getattr(view.paginator, "get_ordering", None)
+        if get_ordering is not None:
+            columns = {
+                name.lstrip("-")
+                for name in get_ordering(request)
+                if model_field(queryset.model, name.lstrip("-")) is not None
+            }
+        validators_field = getattr(view, "validators_field", None)
+        if validators_field is not None:
+            columns.add(validators_field)
+        return serializer.load_only(queryset, columns)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": param,
+                "required": False,
+                "in": "query",
+                "description": description,
+                "schema": {"type": "string"},
+            }
+            for param, description in FIELDSET_PARAMS.items()
+        ]
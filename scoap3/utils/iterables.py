@@ -0,0 +1,8 @@
+from itertools import islice
+
+
+def chunked(values, size=1000):
+    """Lists of ``size`` consecutive items of ``values``, the last one shorter."""
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,204 @@
+import base64
+import binascii
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime.date) else v for v in values]
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise NotFound("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != length:
+        raise NotFound("Invalid cursor.")
+    return values
+
+
+def keyset_filter(fields, values):
+    """
+    Build the ``(f1, f2, ...) > (v1, v2, ...)`` row comparison as a ``Q``.
+
+    Expanded into ``f1 > v1 OR (f1 = v1 AND f2 > v2) OR ...`` so that the
+    leading column can be served by a composite index. Fields prefixed with
+    ``-`` are in descending order and compared with ``<`` instead.
+    """
+    names = [field.lstrip("-") for field in fields]
+    clauses = []
+    for position, field in enumerate(fields):
+        equal = {f: v for f, v in zip(names[:position], values[:position])}
+        lookup = "lt" if field.startswith("-") else "gt"
+        clauses.append(Q(**equal, **{f"{names[position]}__{lookup}": values[position]}))
+    return reduce(or_, clauses)
+
+
+class IdCursorPagination(BasePagination):
+    """
+    Forward-only keyset pagination.
+
+    Each page is fetched with ``WHERE (keys) > (last keys) ORDER BY keys
+    LIMIT n``, so there is no ``COUNT(*)`` and no ``OFFSET`` scan and the
+    cost of a page does not depend on how deep into the table it is.
+    """
+
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    page_size_query_param = "page_size"
+    #: Orderings a client may pick from, each a tuple of unique-together keys.
+    orderings = {"id": ("id",)}
+    default_ordering = "id"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = self.get_ordering(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            values = decode_cursor(cursor, len(self.fields))
+            queryset = queryset.filter(keyset_filter(self.fields, values))
+
+        results = list(queryset.order_by(*self.fields)[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=settings.API_MAX_PAGE_SIZE,
+            )
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+
+    def get_ordering(self, request):
+        name = request.query_params.get(self.ordering_query_param)
+        if name is None:
+            name = self.default_ordering
+        if name not in self.orderings:
+            raise ValidationError(
+                {
+                    self.ordering_query_param: [
+                        f"Must be one of: {', '.join(sorted(self.orderings))}."
+                    ]
+                }
+            )
+        return self.orderings[name]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        cursor = encode_cursor(
+            [getattr(last, field.lstrip("-")) for field in self.fields]
+        )
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Keys the pages are ordered and keyed on.",
+                "schema": {"type": "string", "enum": sorted(self.orderings)},
+            },
+        ]
+
+
+class UpdatedAtCursorPagination(IdCursorPagination):
+    orderings = {"id": ("id",), "updated_at": ("updated_at", "id")}
+
+
+class RankCursorPagination(UpdatedAtCursorPagination):
+    """
+    Adds a ``rank`` ordering, best match first, for the querysets a search
+    filter annotated with a ``rank``. It is the default while searching.
+    """
+
+    search_query_param = "search"
+    orderings = {**UpdatedAtCursorPagination.orderings, "rank": ("-rank", "id")}
+
+    def get_ordering(self, request):
+        searching = bool(request.query_params.get(self.search_query_param))
+        name = request.query_params.get(self.ordering_query_param)
+        if searching and name is None:
+            return self.orderings["rank"]
+        if not searching and name == "rank":
+            raise ValidationError(
+                {
+                    self.ordering_query_param: [
+                        f"Only available with the {self.search_query_param} parameter."
+                    ]
+                }
+            )
+        return super().get_ordering(request)
+
+
+class UpdatedAtFeedPagination(IdCursorPagination):
+    orderings = {"updated_at": ("updated_at", "id")}
+    default_ordering = "updated_at"
+
+
+class DeletedAtFeedPagination(IdCursorPagination):
+    orderings = {"deleted_at": ("deleted_at", "id")}
+    default_ordering = "deleted_at"
+
+
+class AuthorListPagination(LimitOffsetPagination):
+    """
+    Pages of an author list, which is read whole from its packed row: the
+    offset is a list slice, not a scan.
+    """
+
+    default_limit = 100
+    max_limit = settings.API_MAX_PAGE_SIZE
@@ -0,0 +1,15 @@
+import unicodedata
+
+
+def normalize_text(text):
+    """``text`` folded for matching: no accents, case or punctuation."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return " ".join(
+        "".join(
+            c if c.isalnum() else " "
+            for c in decomposed
+            if not unicodedata.combining(c)
+        )
+        .casefold()
+        .split()
+    )
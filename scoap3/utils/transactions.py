@@ -0,0 +1,55 @@
+"""
+Work deferred to the commit of the current transaction, and coalesced.
+"""
+import threading
+
+from django.db import connection, transaction
+from django.db.models import DateTimeField, Func
+
+
+class CommitBatch:
+    """
+    Items collected until the transaction commits, then passed to ``flush``
+    together: a transaction writing many rows costs one call.
+
+    Outside a transaction items are flushed at once, as Django runs commit
+    hooks then. Items of a transaction rolled back are dropped with its hook.
+    """
+
+    def __init__(self, flush):
+        self.flush = flush
+        self._local = threading.local()
+
+    def add(self, items):
+        items = set(items)
+        if not items:
+            return
+        if not connection.in_atomic_block:
+            self.flush(items)
+            return
+        pending = getattr(self._local, "items", None)
+        if pending is not None and self.scheduled():
+            pending.update(items)
+            return
+        # A new batch: the previous one was flushed, or rolled back.
+        self._local.items = items
+        transaction.on_commit(self.run)
+
+    def scheduled(self):
+        return any(hook[1] == self.run for hook in connection.run_on_commit)
+
+    def run(self):
+        items, self._local.items = self._local.items, None
+        if items:
+            self.flush(items)
+
+
+class ClockTimestamp(Func):
+    """
+    The current time of the database clock, unlike ``Now()`` which is the
+    start of the transaction.
+    """
+
+    function = "clock_timestamp"
+    template = "%(function)s()"
+    output_field = DateTimeField()
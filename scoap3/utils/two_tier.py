@@ -0,0 +1,199 @@
+"""
+Two-tier cache: an LRU in each process in front of the shared cache.
+
+Values are kept in the process for ``TWO_TIER_CACHE_LOCAL_TIMEOUT`` seconds
+and in the shared cache (Redis in production) for ``TWO_TIER_CACHE_TIMEOUT``
+seconds. Invalidating a key deletes it from the shared cache and publishes
+it on the ``TWO_TIER_CACHE_CHANNEL`` Redis channel, which every gunicorn and
+Celery process listens to from a background thread to drop its own copy.
+Without Redis, as in development and tests, only the invalidating process
+drops it at once, the others after the local timeout.
+
+Each key also has a generation in the shared cache, which invalidating it
+bumps. Values are stored along with the generation read before loading
+them, and ignored once it moved on: a value loaded while an invalidation
+went through, from the rows it replaced, is never served.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from scoap3.utils.transactions import CommitBatch
+
+#: Two-tier caches by name, see ``cache_stats``.
+registry = {}
+
+_missing = object()
+_listener_lock = threading.Lock()
+_listener_pid = None
+
+
+def redis_client():
+    """The Redis client of the default cache, if it is a django-redis cache."""
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+    except (ImportError, NotImplementedError):
+        return None
+
+
+class TwoTierCache:
+    """
+    LRU of at most ``maxsize`` values in front of the shared cache.
+
+    ``timeout`` and ``local_timeout`` default to the settings. ``counters``
+    counts the values found in the process (``local_hits``), in the shared
+    cache (``shared_hits``) or loaded (``misses``), and the keys invalidated.
+    """
+
+    def __init__(self, name, maxsize=128, timeout=None, local_timeout=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.local_timeout = local_timeout
+        self.counters = Counter()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = CommitBatch(self.invalidate)
+        registry[name] = self
+
+    def shared_key(self, key):
+        # Values are stored with their generation, unlike under "two-tier:".
+        return f"two-tier-entry:{self.name}:{key}"
+
+    def generation_key(self, key):
+        return f"two-tier-generation:{self.name}:{key}"
+
+    def get(self, key, load):
+        """The value of ``key``, from ``load()`` if neither tier has it."""
+        start_listener()
+        with self._lock:
+            expires, value = self._entries.get(key, (0, None))
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.counters["local_hits"] += 1
+                return value
+        shared_key, generation_key = self.shared_key(key), self.generation_key(key)
+        found = cache.get_many([shared_key, generation_key])
+        generation = found.get(generation_key, 0)
+        stored_generation, value = found.get(shared_key, (None, _missing))
+        if stored_generation != generation:
+            self.counters["misses"] += 1
+            value = load()
+            if cache.get(generation_key, 0) != generation:
+                # Invalidated meanwhile, the rows loaded may be the old ones.
+                return value
+            timeout = self.timeout or settings.TWO_TIER_CACHE_TIMEOUT
+            cache.set(shared_key, (generation, value), timeout=timeout)
+        else:
+            self.counters["shared_hits"] += 1
+        with self._lock:
+            local_timeout = self.local_timeout or settings.TWO_TIER_CACHE_LOCAL_TIMEOUT
+            self._entries[key] = (time.monotonic() + local_timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def discard(self, key=None):
+        """Drop ``key``, or every key, from this process."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate(self, keys):
+        """Drop ``keys`` from both tiers, in every process."""
+        keys = set(keys)
+        # Outliving the values stored under the previous generation.
+        timeout = 2 * (self.timeout or settings.TWO_TIER_CACHE_TIMEOUT)
+        for key in keys:
+            generation_key = self.generation_key(key)
+            cache.add(generation_key, 0, timeout=timeout)
+            cache.incr(generation_key)
+            cache.touch(generation_key, timeout=timeout)
+        cache.delete_many([self.shared_key(key) for key in keys])
+        for key in keys:
+            self.discard(key)
+        self.counters["invalidations"] += len(keys)
+        publish(self.name, keys)
+
+    def invalidate_on_commit(self, keys):
+        """
+        Invalidate ``keys`` once the transaction commits.
+
+        Until then other processes could only load the committed rows again.
+        The keys of a transaction are invalidated together.
+        """
+        self._pending.add(keys)
+
+
+def cache_stats():
+    """The counters of the two-tier caches of this process."""
+    return {name: dict(two_tier.counters) for name, two_tier in registry.items()}
+
+
+def publish(name, keys):
+    client = redis_client()
+    if client is None:
+        return
+    from redis.exceptions import RedisError
+
+    message = json.dumps({"cache": name, "keys": sorted(map(str, keys))})
+    try:
+        client.publish(settings.TWO_TIER_CACHE_CHANNEL, message)
+    except RedisError:
+        # The other processes drop the keys after the local timeout.
+        pass
+
+
+def handle_message(data):
+    """Drop the keys of an invalidation message from this process."""
+    message = json.loads(data)
+    two_tier = registry.get(message["cache"])
+    if two_tier is not None:
+        for key in message["keys"]:
+            two_tier.discard(key)
+
+
+def listen(client):
+    from redis.exceptions import RedisError
+
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(settings.TWO_TIER_CACHE_CHANNEL)
+            # Messages published while unsubscribed are lost.
+            for two_tier in registry.values():
+                two_tier.discard()
+            for message in pubsub.listen():
+                handle_message(message["data"])
+        except RedisError:
+            time.sleep(1)
+
+
+def start_listener():
+    """Start listening to invalidations, once per process."""
+    global _listener_pid
+    # Forked workers do not inherit the thread of their parent.
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        client = redis_client()
+        if client is not None:
+            threading.Thread(
+                target=listen,
+                args=(client,),
+                name="two-tier-cache-invalidation",
+                daemon=True,
+            ).start()
+        _listener_pid = os.getpid()